@@ -34,6 +34,11 @@ from os.path import dirname, join
 
 import psycopg2.extensions
 
+# Defaults for settings that may be overridden in settings_private
+DB_CONN_MAX_AGE = 600
+DB_CONN_HEALTH_CHECKS = True
+SESSION_STORE = 'cached_db'
+
 from FPIDjango.private.settings_private import *
 
 """
@@ -83,6 +88,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+
+    # Serve the static files (compressed, with far-future cache headers)
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -93,6 +102,17 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'FPIDjango.urls'
 
+# Template loaders.  Outside of development the compiled templates are kept
+# in memory (cached loader) instead of being read and parsed per request.
+template_loaders = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not DEBUG:
+    template_loaders = [
+        ('django.template.loaders.cached.Loader', template_loaders),
+    ]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -102,8 +122,8 @@ TEMPLATES = [
             os.path.join(BASE_DIR, 'fpiweb/')
         ],
 
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': template_loaders,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -120,6 +140,16 @@ WSGI_APPLICATION = 'FPIDjango.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.1/ref/settings/#databases
 
+# FPI_DB_CONN_MAX_AGE in the environment overrides the value from
+# settings_private, e.g. when comparing load test results.
+if 'FPI_DB_CONN_MAX_AGE' in os.environ:
+    DB_CONN_MAX_AGE = int(os.environ['FPI_DB_CONN_MAX_AGE'])
+
+# The PostgreSQL backend is extended to test reused connections before
+# their first use in a request (see fpiweb/db_connections.py).
+if DB_ENGINE == 'django.db.backends.postgresql':
+    DB_ENGINE = 'fpiweb.db_backend'
+
 DATABASES = {
     # 'default': {
     #     'ENGINE': 'django.db.backends.sqlite3',
@@ -132,10 +162,70 @@ DATABASES = {
             'PASSWORD': DB_PSWD,
             'HOST': DB_HOST,
             'PORT': DB_PORT,
+
+            # Keep connections open between requests (seconds, 0 closes the
+            # connection at the end of each request, None keeps it forever).
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+
+            # Check that a reused connection still works before a request
+            # first uses it (see fpiweb/db_connections.py).
+            'CONN_HEALTH_CHECKS': DB_CONN_HEALTH_CHECKS,
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/2.1/topics/cache/
+
+# Each worker keeps the entries it uses in memory, in front of a file
+# cache shared by all the workers of this server.  A change made by one
+# worker is seen by the others within VERSION_CHECK_INTERVAL seconds (see
+# fpiweb/tiered_cache.py).
+CACHE_DIR = join(BASE_DIR, 'cache')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'fpiweb.tiered_cache.TieredCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            # entries kept in the memory of each worker
+            'MAX_ENTRIES': 1000,
+
+            # seconds an entry is kept in memory
+            'LOCAL_TIMEOUT': 300,
+
+            # seconds between reads of the version counters
+            'VERSION_CHECK_INTERVAL': 1.0,
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+# The tests get a shared cache of their own, in a temporary directory
+TEST_RUNNER = 'FPIDjango.test_runner.TempCacheTestRunner'
+
+
+# Sessions
+# https://docs.djangoproject.com/en/2.1/topics/http/sessions/
+
+# Every scan reads the session of the volunteer's phone.  With "cached_db"
+# the session is read from the cache and only written to the database when
+# it changes (e.g. at login); "signed_cookies" keeps it in the browser
+# instead (it then cannot be ended from the server before it expires).
+# Expired sessions are removed with "manage.py prune_sessions".
+# FPI_SESSION_STORE in the environment overrides the value from
+# settings_private.
+if 'FPI_SESSION_STORE' in os.environ:
+    SESSION_STORE = os.environ['FPI_SESSION_STORE']
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_STORE}'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
 
@@ -179,59 +269,47 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+# Where collectstatic gathers the static files to be served
+STATIC_ROOT = join(BASE_DIR, 'staticfiles')
+
+# Outside of development, collectstatic stores every file under a name
+# that includes a hash of its contents (e.g. bootstrap.min.3f2a1c.css)
+# along with pre-compressed gzip and brotli copies (brotli needs the
+# Brotli package).  WhiteNoise serves the hashed files with a cache
+# lifetime of ten years, so phones download each version only once.
+if not DEBUG:
+    STATICFILES_STORAGE = \
+        'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+# Cache lifetime (seconds) for static files requested without the hash
+WHITENOISE_MAX_AGE = 60 * 60
+
 # django-bootstrap4 settings
 # Default settings
 BOOTSTRAP4 = {
 
+    # All of these files are served from our own static files (see
+    # fpiweb/templates/fpiweb/base.html) rather than from public CDNs.
+    # jQuery comes with the Django admin and the Bootstrap bundle includes
+    # Popper.js.
+
     # The complete URL to the Bootstrap CSS file
-    # Note that a URL can be either a string,
-    # e.g. "https://stackpath.bootstrapcdn.com/bootstrap/4.1.1/css/bootstrap
-    # .min.css",
-    # or a dict like the default value below.
-    "css_url": {
-        "href": "https://stackpath.bootstrapcdn.com/bootstrap/4.1.1/css"
-                "/bootstrap.min.css",
-        "integrity": "sha384-WskhaSGFgHYWDcbwN70/dfYBj47jz9qbsMId"
-                     "/iRN3ewGhXQFZCSftd1LZCfmhktB",
-        "crossorigin": "anonymous",
-    },
+    "css_url": STATIC_URL + "bootstrap/css/bootstrap.min.css",
 
     # The complete URL to the Bootstrap JavaScript file
-    "javascript_url": {
-        "url": "https://stackpath.bootstrapcdn.com/bootstrap/4.1.1/js"
-               "/bootstrap.min.js",
-        "integrity": "sha384-smHYKdLADwkXOn1EmN1qk/HfnUcbVRZyYmZ4qpPea6sjB"
-                     "/pTJ0euyQp0Mk8ck+5T",
-        "crossorigin": "anonymous",
-    },
+    "javascript_url": STATIC_URL + "bootstrap/js/bootstrap.bundle.min.js",
 
     # The complete URL to the Bootstrap CSS file (None means no theme)
     "theme_url": None,
 
     # The URL to the jQuery JavaScript file (full)
-    "jquery_url": {"url": "https://code.jquery.com/jquery-3.3.1.min.js",
-        "integrity": "sha384-tsQFqpEReu7ZLhBV2VZlAu7zcOV+rXbYlF2cqB8txI"
-                     "/8aZajjp4Bqd+V6D5IgvKT",
-        "crossorigin": "anonymous",
-                   },
+    "jquery_url": STATIC_URL + "admin/js/vendor/jquery/jquery.min.js",
 
     # The URL to the jQuery JavaScript file (slim)
-    "jquery_slim_url": {
-        "url": "https://code.jquery.com/jquery-3.3.1.slim.min.js",
-        "integrity":
-            "sha384-q8i/X+965DzO0rT7abK41JStQIAqVgRVzpbzo5smXKp4YfRvH"
-            "+8abtTE1Pi6jizo",
-        "crossorigin": "anonymous", },
-
-    # The URL to the Popper.js JavaScript file (slim)
-    "popper_url": {
-        "url": "https://cdnjs.cloudflare.com/ajax/libs/popper.js/1.14.3/umd"
-               "/popper.min.js",
-        "integrity":
-            "sha384-ZMP7rVo3mIykV+2+9J3UJ46jBk0WLaUAdn689aCwoqbBJiSnjAK"
-            "/l8WvCWPIPm49",
-        "crossorigin": "anonymous",
-    },
+    "jquery_slim_url": STATIC_URL + "admin/js/vendor/jquery/jquery.min.js",
+
+    # The URL to the Popper.js JavaScript file (included in the bundle)
+    "popper_url": None,
 
     # Put JavaScript in the HEAD section of the HTML document (only relevant
     # if you use bootstrap4.html)
@@ -277,6 +355,32 @@ BOOTSTRAP4 = {
 }
 
 
+# Box event (audit) log settings
+BOX_EVENT_LOG = {
+
+    # Write the queued events from a background thread (True) or at the
+    # end of each request (False)
+    'ASYNC': True,
+
+    # Number of queued events that forces an immediate write
+    'BATCH_SIZE': 100,
+
+    # Seconds the background thread waits between writes
+    'FLUSH_INTERVAL': 2.0,
+}
+
+
+# Suggested locations for newly filled boxes (fpiweb/slotting.py)
+SLOTTING = {
+
+    # Number of boxes that fit in one Row/Bin/Tier slot (one pallet)
+    'SLOT_CAPACITY': 30,
+
+    # A slot one level up counts as this many bins farther away
+    'LEVEL_COST': 2,
+}
+
+
 LOG_DIR = join(BASE_DIR, 'log')
 
 LOGGING = {
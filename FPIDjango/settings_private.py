@@ -35,6 +35,15 @@ DB_HOST = 'localhost'   # can also be '127.0.0.1'
 # The port used by the database server
 DB_PORT = '5432'
 
+# How many seconds Django keeps a database connection open for reuse
+DB_CONN_MAX_AGE = 600
+
+# Verify a reused database connection is still alive before using it
+DB_CONN_HEALTH_CHECKS = True
+
+# Where sessions are kept: cached_db, db, cache or signed_cookies
+SESSION_STORE = 'cached_db'
+
 
 # Specify any additonal private parameters here.
 MY_SECRET_KEY = '<specify your own random  string of 50 characters>'
@@ -0,0 +1,44 @@
+"""
+test_runner.py - Run the tests with a shared cache of their own.
+
+The shared cache of the workers is a directory of this server (CACHE_DIR in
+settings).  The tests clear and fill the cache, so they get an empty
+temporary directory instead, removed once they are done.  The tests never
+touch the cache of a running server and never see entries left by an
+earlier run.
+"""
+
+from copy import deepcopy
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+
+class TempCacheTestRunner(DiscoverRunner):
+    """
+    Test runner pointing the file caches at a temporary directory.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_dir = mkdtemp(prefix='fpi_test_cache_')
+        caches = deepcopy(settings.CACHES)
+        for alias, cache in caches.items():
+            if cache['BACKEND'].endswith('FileBasedCache'):
+                cache['LOCATION'] = f'{self.cache_dir}/{alias}'
+        self.cache_settings = override_settings(CACHES=caches)
+        self.cache_settings.enable()
+        return
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_settings.disable()
+        rmtree(self.cache_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
+        return
@@ -0,0 +1,304 @@
+"""
+LabelLayout.py - Where the box labels go on the page (or roll).
+
+A layout describes one kind of label stock: the size of the page, the size
+of each label and its margin, and how many labels fit across and down.
+The layouts are loaded from label_layouts.yaml (next to this file); each
+entry looks like:
+
+    letter-3x4:
+        description: US letter, 3 x 4 labels of 2 in (the original layout)
+        units: in                 # in, mm or pt (the default)
+        page_size: letter         # reportlab page size, [width, height]
+                                  # or omitted for a continuous roll
+        label_size: [2, 2]        # printed QR code
+        label_margin: [0.25, 0.25]
+        page_offset: [0.5, 0.5]   # lower left corner of the lower left label
+        pitch: [2.5, 2.5]         # distance between labels (default: label
+                                  # plus margins, i.e. no gap)
+        columns: 3
+        rows: 4
+
+A continuous roll (thermal printer) has no page size: every label is a
+page of its own, the size of the label and its margins, and is finished
+as soon as it is drawn.
+
+The geometry (LabelPosition) of every label of a layout is computed once
+and cached.
+"""
+
+from dataclasses import dataclass, InitVar
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from reportlab.lib import pagesizes
+from reportlab.lib.units import inch, mm
+import yaml  # from PyYAML library
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+# layouts shipped with the tools
+LAYOUT_FILE: Path = Path(__file__).with_name('label_layouts.yaml')
+
+# layout used when none is asked for
+DEFAULT_LAYOUT: str = 'letter-3x4'
+
+# points per unit of the sizes in the layout file
+UNITS = {
+    'pt': 1,
+    'in': inch,
+    'mm': mm,
+}
+
+
+@dataclass(frozen=True)
+class Point:
+    """
+    Horizontal (x) and vertical (y) coordinate.
+
+    Frozen, so the points of the cached label positions are never changed.
+    """
+    x: float
+    y: float
+
+
+LABEL_SIZE: Point = Point(144, 144)  # 2 in x 2 in
+LABEL_MARGIN: Point = Point(18, 18)  # 1/4 in x 1/4 in
+BACKGROUND_SIZE: Point = Point(
+    LABEL_SIZE.x + (LABEL_MARGIN.x * 2),
+    LABEL_SIZE.y + (LABEL_MARGIN.y * 2))
+PAGE_OFFSET: Point = Point(36, 36)  # 1/2 in x 1/2 in
+TITLE_ADJUSTMENT: Point = Point(+20, -9)
+
+
+@dataclass
+class LabelPosition:
+    """
+    Container for measurements for one label.
+
+    All measurements are in points.
+    x denotes horizontal measurement
+    y denotes vertical
+    origin is in lower left corner
+    label is 2 in x 2 in ( 144 pt x 144 pt) unless label_size says otherwise
+    """
+    page_offset: InitVar[Point]
+    lower_left_offset: Point = Point(0, 0)
+    lower_right_offset: Point = Point(0, 0)
+    upper_left_offset: Point = Point(0, 0)
+    upper_right_offset: Point = Point(0, 0)
+    offset_on_page: Point = Point(0, 0)
+    image_start: Point = Point(0, 0)
+    title_start: Point = Point(0, 0)
+    label_size: InitVar[Point] = LABEL_SIZE
+    label_margin: InitVar[Point] = LABEL_MARGIN
+
+    def __post_init__(self, page_offset: Point, label_size: Point,
+                      label_margin: Point):
+        """
+        Adjust offsets based on offset_on_page.
+
+        :param page_offset: offset (in points) from the lower left corner
+        :param label_size: size of the printed label
+        :param label_margin: blank space around the label
+        :return:
+        """
+        background_size = Point(
+            label_size.x + (label_margin.x * 2),
+            label_size.y + (label_margin.y * 2))
+        self.offset_on_page = page_offset
+
+        x = page_offset.x
+        y = page_offset.y
+        self.lower_left_offset = Point(x, y)
+
+        x = page_offset.x + background_size.x
+        y = page_offset.y
+        self.lower_right_offset = Point(x, y)
+
+        x = page_offset.x
+        y = page_offset.y + background_size.y
+        self.upper_left_offset = Point(x, y)
+
+        x = page_offset.x + background_size.x
+        y = page_offset.y + background_size.y
+        self.upper_right_offset = Point(x, y)
+
+        x = self.lower_left_offset.x + label_margin.x
+        y = self.lower_left_offset.y + label_margin.y
+        self.image_start = Point(x, y)
+
+        # title placement calculation
+        x = self.upper_left_offset.x + (label_size.x // 2)
+        y = self.upper_left_offset.y - label_margin.y
+        self.title_start = Point(x, y)
+        return
+
+
+@dataclass(frozen=True)
+class LabelLayout:
+    """
+    One kind of label stock.  All sizes are in points.
+    """
+    name: str
+    description: str
+    page_size: Optional[Tuple[float, float]]
+    label_size: Tuple[float, float]
+    label_margin: Tuple[float, float]
+    page_offset: Tuple[float, float]
+    pitch: Tuple[float, float]
+    columns: int
+    rows: int
+    title_adjustment: Tuple[float, float] = (
+        TITLE_ADJUSTMENT.x, TITLE_ADJUSTMENT.y)
+
+    @property
+    def continuous(self) -> bool:
+        """ True for a roll, where each label is a page of its own. """
+        return self.page_size is None
+
+    @property
+    def background_size(self) -> Tuple[float, float]:
+        """ Size of a label with its margins. """
+        return (
+            self.label_size[0] + self.label_margin[0] * 2,
+            self.label_size[1] + self.label_margin[1] * 2,
+        )
+
+    @property
+    def sheet_size(self) -> Tuple[float, float]:
+        """ Size of the pages to print on. """
+        if self.continuous:
+            return self.background_size
+        return self.page_size
+
+    @property
+    def positions(self) -> Tuple[LabelPosition, ...]:
+        """ Geometry of each label of a page, top left first. """
+        return label_positions(self)
+
+
+@lru_cache(maxsize=None)
+def label_positions(layout: LabelLayout) -> Tuple[LabelPosition, ...]:
+    """
+    Compute the dimensions and bounding boxes of each label on the page.
+
+    Computed once per layout.
+
+    :param layout: the label stock
+    :return: positions across then down, starting at the top left
+    """
+    if layout.continuous:
+        offsets = [(0, 0)]
+    else:
+        offsets = [
+            (layout.page_offset[0] + layout.pitch[0] * column,
+             layout.page_offset[1] + layout.pitch[1] * row)
+            for row in reversed(range(layout.rows))
+            for column in range(layout.columns)
+        ]
+    return tuple(
+        LabelPosition(
+            Point(x, y),
+            label_size=Point(*layout.label_size),
+            label_margin=Point(*layout.label_margin),
+        )
+        for x, y in offsets
+    )
+
+
+def parse_layout(name: str, entry: dict) -> LabelLayout:
+    """
+    Convert an entry of the layout file to a LabelLayout.
+
+    :param name: name of the layout
+    :param entry: dictionary read from the layout file
+    :return: the layout, in points
+    """
+    units = entry.get('units', 'pt')
+    if units not in UNITS:
+        raise ValueError(f'Layout {name}: unknown units {units}')
+    scale = UNITS[units]
+
+    def size(key: str, default=None) -> Optional[Tuple[float, float]]:
+        value = entry.get(key, default)
+        if value is None:
+            return None
+        if len(value) != 2:
+            raise ValueError(f'Layout {name}: {key} needs two values')
+        return float(value[0]) * scale, float(value[1]) * scale
+
+    page_size = entry.get('page_size')
+    if isinstance(page_size, str):
+        try:
+            page_size = getattr(pagesizes, page_size)
+        except AttributeError:
+            raise ValueError(f'Layout {name}: unknown page size {page_size}')
+    elif page_size is not None:
+        page_size = size('page_size')
+
+    label_size = size('label_size')
+    label_margin = size('label_margin', (0, 0))
+    if label_size is None:
+        raise ValueError(f'Layout {name}: label_size is required')
+    background = (
+        label_size[0] + label_margin[0] * 2,
+        label_size[1] + label_margin[1] * 2,
+    )
+
+    layout = LabelLayout(
+        name=name,
+        description=entry.get('description', ''),
+        page_size=page_size,
+        label_size=label_size,
+        label_margin=label_margin,
+        page_offset=size('page_offset', (0, 0)),
+        pitch=size('pitch') or background,
+        columns=1 if page_size is None else int(entry.get('columns', 1)),
+        rows=1 if page_size is None else int(entry.get('rows', 1)),
+    )
+    if 'title_adjustment' in entry:
+        layout = LabelLayout(**dict(
+            layout.__dict__,
+            title_adjustment=tuple(
+                float(value) for value in entry['title_adjustment']),
+        ))
+    return layout
+
+
+@lru_cache(maxsize=None)
+def load_layouts(path: Path = LAYOUT_FILE) -> Dict[str, LabelLayout]:
+    """
+    Read the layouts of a layout file (once per file).
+
+    :param path: YAML file of layouts
+    :return: dictionary of layout name to layout
+    """
+    with open(path, 'r') as layout_file:
+        entries = yaml.load(layout_file, Loader=yaml.SafeLoader) or {}
+    return {
+        name: parse_layout(name, entry) for name, entry in entries.items()
+    }
+
+
+def get_layout(name: str = DEFAULT_LAYOUT,
+               path: Path = LAYOUT_FILE) -> LabelLayout:
+    """
+    Find a layout by name.
+
+    :param name: e.g. "letter-3x4"
+    :param path: YAML file of layouts
+    :return: the layout
+    """
+    layouts = load_layouts(path)
+    try:
+        return layouts[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown label layout '{name}', choose one of "
+            f"{', '.join(sorted(layouts))}")
+
+# EOF
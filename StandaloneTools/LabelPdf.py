@@ -0,0 +1,542 @@
+"""
+LabelPdf.py - Draw box labels (QR code and box number) into a PDF.
+
+This is the drawing half of QRCodePrinter.py, kept free of any database
+access so it can also be used by the web application.  A LabelPdf is given
+the URL and title of each label, one at a time, and places them on the
+pages of a label layout (see LabelLayout.py).
+
+The QR code is drawn as vector shapes: the dark modules of each row are
+merged into runs, and runs repeated on the following rows into taller
+rectangles, all filled as one path.  Compared with a PNG image per label
+the PDF is smaller and quicker to draw, and prints sharp at any
+resolution.  The PNG images (raster=True) are kept for comparison (see
+bench/labelbench.py).
+
+Only the QR code and the title differ from one label to the next.  The
+frame around a label is drawn once, as a form XObject referenced by every
+label, and the titles of a page share one text object, so the title font
+is set once per page instead of once per label.
+
+A reportlab Canvas keeps every page in memory until it is saved and only
+then writes the whole document.  In streaming mode a StreamingCanvas is
+used instead: the objects of each page (content, images, fonts) are
+written out as soon as the page is finished, and only the few objects that
+keep growing until the end (the page tree, the fonts dictionary and the
+catalog) are written when the document is saved.  A long run then needs
+the memory of a single page, and a printer (or a browser) reading from a
+pipe or an HTTP response can start on the first page right away.
+"""
+
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple, \
+    Union
+
+import pyqrcode
+from reportlab.pdfbase.pdfdoc import PDFCrossReferenceTable, \
+    PDFImageXObject, PDFIndirectObject, PDFPage, PDFStream, PDFTrailer
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.pdfgen.textobject import PDFTextObject
+from reportlab.platypus import Image
+
+from StandaloneTools.LabelLayout import DEFAULT_LAYOUT, LabelLayout, \
+    LabelPosition, get_layout
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+# size of each module (dot) of the QR code image in pixels
+QR_SCALE: int = 5
+
+# blank modules around the QR code (as in the PNG images)
+QR_QUIET_ZONE: int = 4
+
+# column, row (from the bottom), width and height, in modules
+Rectangle = Tuple[int, int, int, int]
+
+# form XObject holding the frame drawn around each label
+FRAME_FORM: str = 'LabelFrame'
+
+# font of the title printed above each QR code
+TITLE_FONT: str = 'Helvetica-Bold'
+TITLE_FONT_SIZE: int = 12
+
+# a file name or a binary file object
+Output = Union[str, Path, BinaryIO]
+
+
+class StreamingCanvas(Canvas):
+    """
+    Canvas writing each page to its file as soon as the page is finished.
+
+    The output must be a binary file object (e.g. sys.stdout.buffer, a
+    named pipe or a PageBuffer); it is flushed after every page.
+    """
+
+    def __init__(self, output: BinaryIO, *args, **kwargs):
+        super().__init__(output, *args, **kwargs)
+        self._output = output
+        self._offset = 0
+        self._next_number = 1
+        self._deferred: List[int] = list()
+
+    def showPage(self):
+        """
+        Finish the current page and write it out.
+        """
+        super().showPage()
+        self._write_objects(final=False)
+        if hasattr(self._output, 'flush'):
+            self._output.flush()
+        return
+
+    def save(self):
+        """
+        Write the objects left and the cross reference table.
+        """
+        if len(self._code):
+            self.showPage()
+        doc = self._doc
+        # GetPDFData prepares the catalog, info and outlines and then calls
+        # format to produce the whole document
+        doc.format = self._finish
+        doc.GetPDFData(self)
+        if hasattr(self._output, 'flush'):
+            self._output.flush()
+        return
+
+    def _write(self, data: bytes) -> int:
+        offset = self._offset
+        self._output.write(data)
+        self._offset += len(data)
+        return offset
+
+    def _growing(self, obj) -> bool:
+        """ Is an object still changing until the document is saved? """
+        doc = self._doc
+        return obj is doc.idToObject['BasicFonts'] or any(
+            obj is getattr(doc, name, None)
+            for name in ('Pages', 'Catalog', 'info', 'Outlines'))
+
+    def _write_objects(self, final: bool):
+        """
+        Write the objects registered since the last call.
+
+        :param final: also write the objects still growing
+        :return:
+        """
+        doc = self._doc
+        if self._next_number == 1:
+            doc.encrypt.prepare(doc)
+            self._write(self._header())
+        numbers = list()
+        if final:
+            numbers, self._deferred = self._deferred, list()
+        # formatting an object may register more (e.g. a page its content)
+        while True:
+            if numbers:
+                number = numbers.pop(0)
+            elif self._next_number in doc.numberToId:
+                number = self._next_number
+                self._next_number += 1
+            else:
+                break
+            name = doc.numberToId[number]
+            obj = doc.idToObject[name]
+            if not final and self._growing(obj):
+                self._deferred.append(number)
+                continue
+            data = PDFIndirectObject(name, obj).format(doc)
+            doc.idToOffset[name] = self._write(data)
+            self._release(obj)
+        return
+
+    def _header(self) -> bytes:
+        version = '%d.%d' % tuple(self._doc._pdfVersion)
+        return (
+            f'%PDF-{version}\n'.encode('latin-1') +
+            b'%\223\214\213\236 ReportLab Generated PDF document\n'
+        )
+
+    @staticmethod
+    def _release(obj):
+        """ Drop the content of an object once it has been written. """
+        if isinstance(obj, PDFPage):
+            obj.stream = obj.Contents = obj.Resources = None
+        elif isinstance(obj, PDFStream):
+            obj.content = None
+        elif isinstance(obj, PDFImageXObject):
+            obj.streamContent = None
+        return
+
+    def _finish(self) -> bytes:
+        """
+        Write the rest of the document (in place of PDFDocument.format).
+
+        :return: nothing more to write
+        """
+        doc = self._doc
+        self._write_objects(final=True)
+        count = len(doc.numberToId)
+        xref = PDFCrossReferenceTable()
+        xref.addsection(
+            0, [doc.numberToId[number] for number in range(1, count + 1)])
+        offset = self._write(xref.format(doc))
+        trailer = PDFTrailer(
+            startxref=offset,
+            Size=count + 1,
+            Root=doc.Reference(doc.Catalog),
+            Info=doc.Reference(doc.info),
+            ID=doc.ID(),
+        )
+        self._write(trailer.format(doc))
+        return b''
+
+
+class PageBuffer:
+    """
+    Binary file collecting the output of a StreamingCanvas until taken.
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = list()
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        """
+        Everything written since the last call.
+
+        :return: the bytes written
+        """
+        data = b''.join(self.chunks)
+        self.chunks = list()
+        return data
+
+
+def qr_image(url: str) -> BytesIO:
+    """
+    PNG image of the QR code of a URL, in memory.
+
+    :param url: URL the label points to
+    :return: file object holding the image
+    """
+    image = BytesIO()
+    pyqrcode.create(url).png(image, scale=QR_SCALE)
+    image.seek(0)
+    return image
+
+
+def qr_rectangles(url: str) -> Tuple[int, List[Rectangle]]:
+    """
+    Dark modules of the QR code of a URL, merged into rectangles.
+
+    The dark modules of each row are merged into runs, and a run found in
+    the same place on the following rows is stretched down over them.
+
+    :param url: URL the label points to
+    :return: width of the code in modules (quiet zone included) and the
+        rectangles to fill
+    """
+    matrix = pyqrcode.create(url).code
+    size = len(matrix) + QR_QUIET_ZONE * 2
+    rectangles: List[Rectangle] = list()
+    # runs of the rows above, by (first, last column): [top row, height]
+    open_runs = dict()
+    for row_number, row in enumerate(matrix):
+        runs = set()
+        column = 0
+        while column < len(row):
+            if row[column]:
+                first = column
+                while column < len(row) and row[column]:
+                    column += 1
+                runs.add((first, column))
+            column += 1
+        for run in list(open_runs):
+            if run not in runs:
+                top, height = open_runs.pop(run)
+                rectangles.append(_module_rectangle(size, run, top, height))
+        for run in runs:
+            if run in open_runs:
+                open_runs[run][1] += 1
+            else:
+                open_runs[run] = [row_number, 1]
+    for run, (top, height) in open_runs.items():
+        rectangles.append(_module_rectangle(size, run, top, height))
+    return size, rectangles
+
+
+def _module_rectangle(size: int, run: Tuple[int, int], top: int,
+                      height: int) -> Rectangle:
+    """ Rectangle of a run of modules, measured from the lower left. """
+    first, last = run
+    return (
+        first + QR_QUIET_ZONE,
+        size - QR_QUIET_ZONE - top - height,
+        last - first,
+        height,
+    )
+
+
+class LabelPdf:
+    """
+    LabelPdf - Place box labels on the pages of a label layout.
+    """
+
+    def __init__(self, output: Output, layout: Optional[LabelLayout] = None,
+                 stream: bool = False, raster: bool = False):
+        """
+        Prepare a PDF of labels.
+
+        :param output: file name or binary file object
+        :param layout: label stock (the default layout if not given)
+        :param stream: write each page as soon as it is finished (the
+            output must then be a file object)
+        :param raster: place the QR codes as PNG images instead of drawing
+            them
+        """
+        self.output: Output = output
+        self.stream: bool = stream
+        self.raster: bool = raster
+        self.pdf: Canvas = None
+        self.layout: LabelLayout = layout or get_layout(DEFAULT_LAYOUT)
+
+        # width and height are in points (1/72 inch)
+        self.width, self.height = self.layout.sheet_size
+
+        # label locations on the page (computed once per layout)
+        self.label_locations: Tuple[LabelPosition, ...] = \
+            self.layout.positions
+
+        # set this to the last position in the list to force a new page
+        self.next_pos: int = len(self.label_locations)
+
+        # use the page number to control first page handling
+        self.page_number: int = 0
+
+        # titles of the labels on the current page, drawn with the page
+        self.titles: Optional[PDFTextObject] = None
+        return
+
+    def initialize_pdf_file(self):
+        """
+        Setup the pdf to receive labels.
+
+        :return:
+        """
+        if isinstance(self.output, Path):
+            self.output = str(self.output)
+        canvas_class = StreamingCanvas if self.stream else Canvas
+        self.pdf = canvas_class(
+            self.output, pagesize=(self.width, self.height))
+        self.define_frame()
+        return
+
+    def define_frame(self):
+        """
+        Draw the frame of a label once, as a form used by every label.
+
+        :return:
+        """
+        frame_width, frame_height = self.layout.background_size
+        self.pdf.beginForm(FRAME_FORM, 0, 0, frame_width, frame_height)
+        self.pdf.rect(0, 0, frame_width, frame_height, stroke=1, fill=0)
+        self.pdf.endForm()
+        return
+
+    def fill_pdf_pages(self, labels: Iterable[Tuple[str, str]]):
+        """
+        Fill one or more pages with labels.
+
+        :param labels: (URL, title) of each label
+        :return:
+        """
+        for url, label_name in labels:
+            self.add_label(url, label_name)
+        self.finish_page()
+        return
+
+    def add_label(self, url: str, label_name: str):
+        """
+        Draw the next label, starting a new page when needed.
+
+        On a continuous roll the label is a page of its own and is
+        finished right away.
+
+        :param url: URL encoded in the QR code
+        :param label_name: title printed above the QR code
+        :return:
+        """
+        if self.layout.continuous:
+            self.place_label(url, label_name, 0)
+            self.show_page()
+            self.page_number += 1
+            return
+
+        if self.next_pos >= len(self.label_locations) - 1:
+            self.finish_page()
+            self.next_pos = 0
+        else:
+            self.next_pos += 1
+        self.draw_bounding_box(self.next_pos)
+        self.place_label(url, label_name, self.next_pos)
+        return
+
+    def place_label(self, url: str, label_name: str, pos: int):
+        """
+        Place the label in the appropriate location on the page.
+
+        :param url: URL encoded in the QR code
+        :param label_name:
+        :param pos:
+        :return:
+        """
+        box_info = self.label_locations[pos]
+
+        # place QR code on page
+        label_width, label_height = self.layout.label_size
+        if self.raster:
+            im = Image(qr_image(url), label_width, label_height)
+            im.drawOn(
+                self.pdf, box_info.image_start.x, box_info.image_start.y)
+        else:
+            self.draw_qr_code(url, box_info.image_start.x,
+                              box_info.image_start.y, label_width,
+                              label_height)
+
+        # place title above image, in the text object of the page
+        if self.titles is None:
+            self.titles = self.pdf.beginText()
+            self.titles.setFont(TITLE_FONT, TITLE_FONT_SIZE)
+        title_adjustment_x, title_adjustment_y = self.layout.title_adjustment
+        title_width = stringWidth(label_name, TITLE_FONT, TITLE_FONT_SIZE)
+        self.titles.setTextOrigin(
+            box_info.title_start.x + title_adjustment_x - title_width / 2,
+            box_info.title_start.y + title_adjustment_y,
+        )
+        self.titles.textOut(label_name)
+        return
+
+    def draw_qr_code(self, url: str, x: float, y: float, width: float,
+                     height: float):
+        """
+        Draw a QR code as filled rectangles.
+
+        :param url: URL encoded in the QR code
+        :param x: left edge
+        :param y: bottom edge
+        :param width: width of the code, quiet zone included
+        :param height: height of the code, quiet zone included
+        :return:
+        """
+        size, rectangles = qr_rectangles(url)
+        module_width = width / size
+        module_height = height / size
+        path = self.pdf.beginPath()
+        for column, row, columns, rows in rectangles:
+            path.rect(x + column * module_width, y + row * module_height,
+                      columns * module_width, rows * module_height)
+        self.pdf.drawPath(path, stroke=0, fill=1)
+        return
+
+    def finish_page(self):
+        """
+        Finish off the prefious page before starting a new one
+        """
+        if self.layout.continuous:
+            # every label finished its own page
+            return
+        if self.page_number > 0:
+            self.show_page()
+        self.page_number += 1
+        return
+
+    def show_page(self):
+        """
+        Draw the titles of the page and finish it.
+
+        :return:
+        """
+        if self.titles is not None:
+            self.pdf.drawText(self.titles)
+            self.titles = None
+        self.pdf.showPage()
+        return
+
+    def draw_bounding_box(self, label_pos: int):
+        """
+        Draw a bounding box around the specified label.
+
+        :param label_pos: position in the labels locations list.
+        :return:
+        """
+        box_info = self.label_locations[label_pos]
+        self.pdf.saveState()
+        self.pdf.translate(box_info.lower_left_offset.x,
+                           box_info.lower_left_offset.y)
+        self.pdf.doForm(FRAME_FORM)
+        self.pdf.restoreState()
+        return
+
+    def finalize_pdf_file(self):
+        """
+        All pages have been generated so flush all buffers and close.
+
+        :return:
+        """
+        if self.titles is not None:
+            self.pdf.drawText(self.titles)
+            self.titles = None
+        self.pdf.save()
+        return
+
+
+def write_label_pdf(output: Output, labels: Iterable[Tuple[str, str]],
+                    layout: Optional[LabelLayout] = None,
+                    stream: bool = False, raster: bool = False):
+    """
+    Write a PDF of labels.
+
+    :param output: file name or binary file object
+    :param labels: (URL, title) of each label
+    :param layout: label stock (the default layout if not given)
+    :param stream: write each page as soon as it is finished
+    :param raster: place the QR codes as PNG images
+    :return:
+    """
+    label_pdf = LabelPdf(output, layout=layout, stream=stream, raster=raster)
+    label_pdf.initialize_pdf_file()
+    label_pdf.fill_pdf_pages(labels)
+    label_pdf.finalize_pdf_file()
+    return
+
+
+def iter_label_pdf(labels: Iterable[Tuple[str, str]],
+                   layout: Optional[LabelLayout] = None) -> Iterator[bytes]:
+    """
+    Produce a PDF of labels a page at a time (e.g. for an HTTP response).
+
+    :param labels: (URL, title) of each label
+    :param layout: label stock (the default layout if not given)
+    :return: the bytes of the PDF, in pieces ending on a finished page
+    """
+    buffer = PageBuffer()
+    label_pdf = LabelPdf(buffer, layout=layout, stream=True)
+    label_pdf.initialize_pdf_file()
+    for url, label_name in labels:
+        label_pdf.add_label(url, label_name)
+        data = buffer.take()
+        if data:
+            yield data
+    label_pdf.finish_page()
+    label_pdf.finalize_pdf_file()
+    yield buffer.take()
+    return
+
+# EOF
@@ -0,0 +1,124 @@
+"""Benchmark of the box label PDFs: QR codes as images or vector shapes.
+
+Usage:
+    labelbench.py [options]
+    labelbench.py -h | --help
+    labelbench.py --version
+
+Options:
+    -c <nnn>, --count=<nnn>         Labels in each PDF [default: 1000]
+    -r <nnn>, --repeat=<nnn>        Runs of each renderer, the best is
+                                    reported [default: 3]
+    -l <layout>, --layout=<layout>  Label stock, one of the layouts in
+                                    label_layouts.yaml [default: letter-3x4]
+    -p <URL>, --prefix=<URL>        URL prefix of the labels
+                                    [default: http://localhost:8765/fpiweb/box/box]
+    -j <file>, --json=<file>        Also append the results to this JSON lines file
+    -h --help             Show this help and quit.
+    -v --version          Show the version of this program and quit.
+
+Run it from the top of the repository, e.g.
+
+    PYTHONPATH=. python bench/labelbench.py -c 1000
+
+The same labels are drawn into an in-memory PDF twice, once with each QR
+code placed as a PNG image (the way the labels used to be printed) and
+once with the QR code drawn as filled rectangles, and the time taken and
+the size of each PDF are reported.  No database is needed.  Encoding the
+QR codes (pyqrcode) takes the same time with either renderer and is most
+of the total, so the difference in time is the cost of the PNG images.
+"""
+
+import json
+from datetime import datetime
+from io import BytesIO
+from time import perf_counter
+from typing import Dict
+
+from docopt import docopt
+
+from StandaloneTools.LabelLayout import get_layout
+from StandaloneTools.LabelPdf import write_label_pdf
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+# renderers compared, by name
+RENDERERS = {
+    'raster': True,
+    'vector': False,
+}
+
+
+def time_renderer(raster: bool, count: int, repeat: int, layout_name: str,
+                  prefix: str) -> Dict[str, float]:
+    """
+    Draw the labels with one renderer, several times.
+
+    :param raster: place the QR codes as PNG images
+    :param count: labels in each PDF
+    :param repeat: runs, the fastest is kept
+    :param layout_name: label stock
+    :param prefix: URL prefix of the labels
+    :return: best time in seconds, and size of the PDF in bytes
+    """
+    layout = get_layout(layout_name)
+    best = None
+    size = 0
+    for _ in range(repeat):
+        labels = (
+            (f'{prefix}{number:05}', f'BOX{number:05}')
+            for number in range(1, count + 1)
+        )
+        pdf = BytesIO()
+        start = perf_counter()
+        write_label_pdf(pdf, labels, layout, raster=raster)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        size = len(pdf.getvalue())
+    return {'seconds': round(best, 3), 'bytes': size}
+
+
+def run_label_bench(arguments: dict):
+    """
+    Time each renderer and report the results.
+
+    :param arguments: dictionary of command line arguments
+    :return:
+    """
+    count = int(arguments['--count'])
+    repeat = int(arguments['--repeat'])
+    results = {
+        name: time_renderer(raster, count, repeat, arguments['--layout'],
+                            arguments['--prefix'])
+        for name, raster in RENDERERS.items()
+    }
+
+    print(f'Label PDF: {count} labels, layout {arguments["--layout"]}')
+    print(f'{"renderer":<10} {"seconds":>8} {"labels/s":>9} {"KiB":>9} '
+          f'{"bytes/label":>12}')
+    for name, stats in results.items():
+        print(
+            f'{name:<10} {stats["seconds"]:>8.3f} '
+            f'{count / stats["seconds"]:>9.0f} '
+            f'{stats["bytes"] / 1024:>9.1f} '
+            f'{stats["bytes"] / count:>12.0f}'
+        )
+
+    if arguments['--json']:
+        result = {
+            'run_at': datetime.now().isoformat(timespec='seconds'),
+            'count': count,
+            'layout': arguments['--layout'],
+            'renderers': results,
+        }
+        with open(arguments['--json'], 'a') as json_file:
+            json_file.write(json.dumps(result) + '\n')
+    return
+
+
+if __name__ == "__main__":
+    run_label_bench(docopt(__doc__, version='labelbench 1.0'))
+
+# EOF
@@ -0,0 +1,385 @@
+"""Load test for the box scanning workflow.
+
+Usage:
+    loadtest.py -u <URL> -n <user> -w <pswd> [options]
+    loadtest.py -h | --help
+    loadtest.py --version
+
+Options:
+    -u <URL>, --url=<URL>           Base URL of a running server
+    -n <user>, --user=<user>        Username to log in with
+    -w <pswd>, --password=<pswd>    Password for the user
+    -c <nnn>, --clients=<nnn>       Concurrent clients [default: 8]
+    -r <nnn>, --requests=<nnn>      Operations run by each client [default: 200]
+    -b <nnn>, --boxes=<nnn>         Existing box numbers (1..nnn) to use [default: 1000]
+    -s <nnn>, --new-start=<nnn>     First box number for new boxes [default: 50000]
+    -m <mix>, --mix=<mix>           Weight of each operation
+                                    [default: box_scanned=50,box_details=25,box_edit=15,box_new=10]
+    -l <label>, --label=<label>     Label for this run in the report [default: run]
+    -j <file>, --json=<file>        Also append the results to this JSON lines file
+    -h --help             Show this help and quit.
+    -v --version          Show the version of this program and quit.
+
+Prepare the database first with the seed_boxes management command, e.g.
+
+    python manage.py seed_boxes --count 1000 --user bench --password ...
+
+then start a server and point the load test at it.  Each client logs in
+through the login page and then runs a random mix of the operations a
+volunteer performs:
+
+    box_scanned   GET  /fpiweb/box/box<nnnnn>/ (redirects are not followed)
+    box_details   GET  /fpiweb/box/<pk>/
+    box_edit      GET  /fpiweb/box/<pk>/edit/ and POST the form back
+    box_new       GET  /fpiweb/box/new/BOX<nnnnn>/ and POST a new box
+
+New boxes are numbered from --new-start, so use a fresh --new-start (or a
+freshly seeded database) for each run.  Throughput and latency percentiles
+(in milliseconds) are reported for every endpoint.  With --json the same
+numbers are appended to a file, so results can be compared release over
+release.
+
+To see the effect of persistent database connections, run the server once
+with connections closed after every request and once with the default:
+
+    FPI_DB_CONN_MAX_AGE=0 python manage.py runserver --noreload
+    python bench/loadtest.py -u http://localhost:8000 -n ... -w ... -l conn_max_age_0
+
+    python manage.py runserver --noreload
+    python bench/loadtest.py -u http://localhost:8000 -n ... -w ... -l conn_max_age_600
+
+and compare the p95 column of the box_scanned lines.
+"""
+
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from random import Random
+from re import compile as re_compile
+from threading import Thread
+from time import perf_counter
+from typing import Dict, List
+
+from docopt import docopt
+import requests
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+# pk of the box in the redirect from a scan, e.g. /fpiweb/box/12/edit/
+BOX_PK_REGEX = re_compile(r'/fpiweb/box/(\d+)/')
+
+# box types offered by the box forms
+BOX_TYPE_REGEX = re_compile(r'<option value="(\d+)"')
+
+
+@dataclass
+class Timings:
+    """
+    Latencies (in seconds) and error counts gathered by one client.
+    """
+    latencies: Dict[str, List[float]] = field(
+        default_factory=lambda: defaultdict(list))
+    errors: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+def login(base_url: str, username: str, password: str) -> requests.Session:
+    """
+    Log in through the login page, as a volunteer's browser would.
+
+    :param base_url: e.g. http://localhost:8000
+    :param username:
+    :param password:
+    :return: a session carrying the session and CSRF cookies
+    """
+    session = requests.Session()
+    login_url = f'{base_url}/fpiweb/login/'
+    session.get(login_url)
+    response = session.post(
+        login_url,
+        data={
+            'username': username,
+            'password': password,
+            'csrfmiddlewaretoken': session.cookies.get('csrftoken'),
+        },
+        headers={'Referer': login_url},
+        allow_redirects=False,
+    )
+    if response.status_code != 302:
+        raise ValueError(f'Unable to log in as {username}')
+    return session
+
+
+class Client:
+    """
+    One volunteer running a random mix of operations against the server.
+    """
+
+    def __init__(self, session: requests.Session, base_url: str,
+                 box_count: int, new_numbers: range, mix: Dict[str, int],
+                 seed: int):
+        self.session: requests.Session = session
+        self.base_url: str = base_url
+        self.box_count: int = box_count
+        self.new_numbers = iter(new_numbers)
+        self.operations: List[str] = list(mix.keys())
+        self.weights: List[int] = list(mix.values())
+        self.choose: Random = Random(seed)
+        self.timings: Timings = Timings()
+
+        # pk of each box number seen so far (learned from scans)
+        self.box_pks: Dict[int, int] = dict()
+
+    def run(self, request_count: int):
+        """
+        Run the requested number of randomly chosen operations.
+
+        :param request_count:
+        :return:
+        """
+        for _ in range(request_count):
+            operation = self.choose.choices(self.operations, self.weights)[0]
+            getattr(self, operation)()
+        return
+
+    def timed(self, endpoint: str, expected_status: int, method: str,
+              url: str, **kwargs) -> requests.Response:
+        """
+        Send one request and record its latency under the endpoint name.
+
+        :param endpoint: name used in the report
+        :param expected_status: any other status is counted as an error
+        :param method: 'get' or 'post'
+        :param url: path below the base URL
+        :param kwargs: passed on to requests
+        :return: the response
+        """
+        start = perf_counter()
+        response = self.session.request(
+            method, f'{self.base_url}{url}', allow_redirects=False, **kwargs)
+        self.timings.latencies[endpoint].append(perf_counter() - start)
+        if response.status_code != expected_status:
+            self.timings.errors[endpoint] += 1
+        return response
+
+    def post_form(self, endpoint: str, url: str, form_html: str):
+        """
+        Post a box form back with the first box type it offers.
+
+        :param endpoint: name used in the report
+        :param url: path below the base URL
+        :param form_html: page containing the form
+        :return:
+        """
+        match = BOX_TYPE_REGEX.search(form_html)
+        data = {
+            'box_type': match.group(1) if match else '',
+            'csrfmiddlewaretoken': self.session.cookies.get('csrftoken'),
+        }
+        self.timed(f'{endpoint} (post)', 302, 'post', url, data=data)
+        return
+
+    def box_scanned(self) -> int:
+        """
+        Scan a random existing box.
+
+        :return: the pk of the box, if the server revealed it
+        """
+        box_number = self.choose.randint(1, self.box_count)
+        response = self.timed(
+            'box_scanned', 302, 'get', f'/fpiweb/box/box{box_number}/')
+        match = BOX_PK_REGEX.search(response.headers.get('Location', ''))
+        if match:
+            self.box_pks[box_number] = int(match.group(1))
+            return self.box_pks[box_number]
+        return None
+
+    def known_box_pk(self) -> int:
+        """
+        Pick a box whose pk is known, scanning one first if need be.
+
+        :return: pk of a box (or None if the scan failed)
+        """
+        if self.box_pks and self.choose.random() < 0.8:
+            return self.choose.choice(list(self.box_pks.values()))
+        return self.box_scanned()
+
+    def box_details(self):
+        """
+        Look at the details of a box.
+        """
+        pk = self.known_box_pk()
+        if pk is not None:
+            self.timed('box_details', 200, 'get', f'/fpiweb/box/{pk}/')
+        return
+
+    def box_edit(self):
+        """
+        Open the edit page of a box and submit it.
+        """
+        pk = self.known_box_pk()
+        if pk is None:
+            return
+        url = f'/fpiweb/box/{pk}/edit/'
+        response = self.timed('box_edit', 200, 'get', url)
+        self.post_form('box_edit', url, response.text)
+        return
+
+    def box_new(self):
+        """
+        Scan a label that has no box yet and add the box.
+        """
+        box_number = next(self.new_numbers, None)
+        if box_number is None:
+            return
+        url = f'/fpiweb/box/new/BOX{box_number:05}/'
+        response = self.timed('box_new', 200, 'get', url)
+        self.post_form('box_new', url, response.text)
+        return
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    """
+    Nearest rank percentile of an already sorted list.
+
+    :param ordered: sorted values
+    :param pct: percentile wanted (0 - 100)
+    :return: the value at that percentile
+    """
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize(elapsed: float, clients: List[Client]) -> Dict[str, dict]:
+    """
+    Combine the timings from every client, endpoint by endpoint.
+
+    :param elapsed: wall clock seconds for the whole run
+    :param clients: the clients that ran
+    :return: dictionary of endpoint name to statistics (latency in ms)
+    """
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    for client in clients:
+        for endpoint, values in client.timings.latencies.items():
+            latencies[endpoint].extend(values)
+        for endpoint, count in client.timings.errors.items():
+            errors[endpoint] += count
+
+    summary = dict()
+    for endpoint in sorted(latencies):
+        ordered = sorted(latencies[endpoint])
+        summary[endpoint] = {
+            'requests': len(ordered),
+            'errors': errors[endpoint],
+            'per_second': round(len(ordered) / elapsed, 1),
+            'p50': round(percentile(ordered, 50) * 1000, 1),
+            'p90': round(percentile(ordered, 90) * 1000, 1),
+            'p95': round(percentile(ordered, 95) * 1000, 1),
+            'p99': round(percentile(ordered, 99) * 1000, 1),
+            'max': round(ordered[-1] * 1000, 1),
+        }
+    return summary
+
+
+def report(label: str, summary: Dict[str, dict]):
+    """
+    Print throughput and latency percentiles (in milliseconds).
+
+    :param label: name of this run
+    :param summary: statistics by endpoint
+    :return:
+    """
+    print(f'Load test: {label}')
+    print(
+        f'{"endpoint":<20} {"requests":>8} {"errors":>6} {"req/s":>8} '
+        f'{"p50":>7} {"p90":>7} {"p95":>7} {"p99":>7} {"max":>7}'
+    )
+    for endpoint, stats in summary.items():
+        print(
+            f'{endpoint:<20} {stats["requests"]:>8} {stats["errors"]:>6} '
+            f'{stats["per_second"]:>8.1f} {stats["p50"]:>7.1f} '
+            f'{stats["p90"]:>7.1f} {stats["p95"]:>7.1f} '
+            f'{stats["p99"]:>7.1f} {stats["max"]:>7.1f}'
+        )
+    return
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """
+    Parse the operation mix, e.g. "box_scanned=50,box_details=25".
+
+    :param mix: comma separated operation=weight pairs
+    :return: dictionary of operation name to weight
+    """
+    weights = dict()
+    for piece in mix.split(','):
+        operation, weight = piece.split('=')
+        operation = operation.strip()
+        if not hasattr(Client, operation) or not operation.startswith('box_'):
+            raise ValueError(f'Unknown operation {operation}')
+        weights[operation] = int(weight)
+    return weights
+
+
+def run_load_test(arguments: dict):
+    """
+    Log in the clients, run them concurrently and report the results.
+
+    :param arguments: dictionary of command line arguments
+    :return:
+    """
+    base_url = arguments['--url'].rstrip('/')
+    client_count = int(arguments['--clients'])
+    request_count = int(arguments['--requests'])
+    box_count = int(arguments['--boxes'])
+    new_start = int(arguments['--new-start'])
+    mix = parse_mix(arguments['--mix'])
+
+    clients = list()
+    for number in range(client_count):
+        session = login(base_url, arguments['--user'], arguments['--password'])
+        first_new = new_start + number * request_count
+        clients.append(Client(
+            session=session,
+            base_url=base_url,
+            box_count=box_count,
+            new_numbers=range(first_new, first_new + request_count),
+            mix=mix,
+            seed=number,
+        ))
+    threads = [
+        Thread(target=client.run, args=(request_count,))
+        for client in clients
+    ]
+
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - start
+
+    summary = summarize(elapsed, clients)
+    report(arguments['--label'], summary)
+
+    if arguments['--json']:
+        result = {
+            'label': arguments['--label'],
+            'run_at': datetime.now().isoformat(timespec='seconds'),
+            'clients': client_count,
+            'requests_per_client': request_count,
+            'elapsed': round(elapsed, 3),
+            'endpoints': summary,
+        }
+        with open(arguments['--json'], 'a') as json_file:
+            json_file.write(json.dumps(result) + '\n')
+    return
+
+
+if __name__ == "__main__":
+    run_load_test(docopt(__doc__, version='loadtest 1.1'))
+
+# EOF
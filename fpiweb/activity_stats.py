@@ -0,0 +1,333 @@
+"""
+activity_stats.py - Turnover of products and categories from running totals.
+
+Every consumed box is recorded as an Activity, with the number of days it
+sat in storage (duration).  Rather than scanning that whole history for
+every report, two small tables of running totals are kept up to date as
+activities are added, changed or deleted:
+
+    ActivityWeek        boxes, items and days stored per product per week
+    ActivityDuration    boxes per product per number of days stored
+
+The totals are changed in the same transaction as the activity, with one
+INSERT ... ON CONFLICT DO UPDATE per table.  The report reads only these
+tables: the mean and 90th percentile of days on the shelf come from the
+duration histogram, the boxes consumed per week from the weekly totals.
+
+Activities written without signals (bulk_create, loaddata) are not
+counted; run "manage.py activity_stats" to rebuild the totals from the
+full history after loading them.
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from math import ceil
+from typing import Dict, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncWeek
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from fpiweb.models import Activity, ActivityDuration, ActivityWeek
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+# weeks of history used for the boxes consumed per week
+REPORT_WEEKS = 12
+
+# percentile of days on the shelf shown in the report
+SHELF_PERCENTILE = 90
+
+# (week start, category, product, duration, quantity) of an activity
+ActivityKey = Tuple[date, str, str, int, int]
+
+
+def week_start(day: date) -> date:
+    """
+    Monday of the week of a day.
+
+    :param day: any day
+    :return: the Monday on or before it
+    """
+    return day - timedelta(days=day.weekday())
+
+
+def activity_key(activity: Activity) -> Optional[ActivityKey]:
+    """
+    What an activity contributes to the totals.
+
+    :param activity: activity, saved or not
+    :return: the key, or None for an incomplete activity
+    """
+    if activity.date_consumed is None or activity.duration is None:
+        return None
+    return (
+        week_start(activity.date_consumed),
+        activity.prod_cat_name,
+        activity.prod_name,
+        activity.duration,
+        activity.quantity or 0,
+    )
+
+
+def increment(model, key: dict, **amounts):
+    """
+    Add to the totals of one row, creating it if need be.
+
+    Written as one INSERT ... ON CONFLICT DO UPDATE, so concurrent
+    activities never race to create the same row.
+
+    :param model: ActivityWeek or ActivityDuration
+    :param key: values of the unique fields of the row
+    :param amounts: amount to add to each total
+    :return:
+    """
+    if amounts['boxes'] < 0:
+        # a row missing here was never counted (see the module notes)
+        model.objects.filter(**key).update(**{
+            name: F(name) + amount for name, amount in amounts.items()
+        })
+        return
+
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    key_columns = [quote(model._meta.get_field(name).column) for name in key]
+    total_columns = [
+        quote(model._meta.get_field(name).column) for name in amounts
+    ]
+    columns = ', '.join(key_columns + total_columns)
+    placeholders = ', '.join(['%s'] * (len(key) + len(amounts)))
+    updates = ', '.join(
+        f'{column} = {table}.{column} + EXCLUDED.{column}'
+        for column in total_columns
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({columns}) VALUES ({placeholders}) '
+            f'ON CONFLICT ({", ".join(key_columns)}) DO UPDATE SET {updates}',
+            list(key.values()) + list(amounts.values()),
+        )
+    return
+
+
+def count_activity(key: ActivityKey, sign: int = 1):
+    """
+    Add an activity to (sign 1) or remove it from (sign -1) the totals.
+
+    :param key: activity_key of the activity
+    :param sign: 1 or -1
+    :return:
+    """
+    week, prod_cat_name, prod_name, duration, quantity = key
+    increment(
+        ActivityWeek,
+        dict(week_start=week, prod_cat_name=prod_cat_name,
+             prod_name=prod_name),
+        boxes=sign,
+        quantity=sign * quantity,
+        duration_total=sign * duration,
+    )
+    increment(
+        ActivityDuration,
+        dict(prod_cat_name=prod_cat_name, prod_name=prod_name,
+             duration=duration),
+        boxes=sign,
+    )
+    return
+
+
+def rebuild_activity_stats() -> int:
+    """
+    Recompute the totals from the full activity history.
+
+    :return: number of activities counted
+    """
+    weeks = Activity.objects \
+        .order_by() \
+        .annotate(week=TruncWeek('date_consumed')) \
+        .values_list('week', 'prod_cat_name', 'prod_name') \
+        .annotate(
+            boxes=Count('id'),
+            quantity=Sum('quantity'),
+            duration_total=Sum('duration'),
+        )
+    durations = Activity.objects \
+        .order_by() \
+        .values_list('prod_cat_name', 'prod_name', 'duration') \
+        .annotate(boxes=Count('id'))
+
+    with transaction.atomic():
+        ActivityWeek.objects.all().delete()
+        ActivityDuration.objects.all().delete()
+        ActivityWeek.objects.bulk_create([
+            ActivityWeek(
+                week_start=week,
+                prod_cat_name=prod_cat_name,
+                prod_name=prod_name,
+                boxes=boxes,
+                quantity=quantity,
+                duration_total=duration_total,
+            )
+            for week, prod_cat_name, prod_name, boxes, quantity,
+            duration_total in weeks
+        ])
+        durations = ActivityDuration.objects.bulk_create([
+            ActivityDuration(
+                prod_cat_name=prod_cat_name,
+                prod_name=prod_name,
+                duration=duration,
+                boxes=boxes,
+            )
+            for prod_cat_name, prod_name, duration, boxes in durations
+        ])
+    return sum(row.boxes for row in durations)
+
+
+def percentile(histogram: Counter, percent: float) -> Optional[int]:
+    """
+    Nearest rank percentile of a histogram.
+
+    :param histogram: number of boxes for each number of days
+    :param percent: e.g. 90
+    :return: the days within which that percent of the boxes were used
+    """
+    total = sum(histogram.values())
+    if total <= 0:
+        return None
+    rank = ceil(total * percent / 100)
+    seen = 0
+    for days in sorted(histogram):
+        seen += histogram[days]
+        if seen >= rank:
+            return days
+    return max(histogram)
+
+
+@dataclass
+class Turnover:
+    """
+    How quickly a product (or category) goes out of the warehouse.
+    """
+    name: str
+    prod_cat_name: str
+    boxes: int
+    mean_days: Optional[float]
+    shelf_days: Optional[int]
+    boxes_per_week: float
+
+
+def turnover_report(weeks: int = REPORT_WEEKS,
+                    today: Optional[date] = None
+                    ) -> Tuple[List[Turnover], List[Turnover]]:
+    """
+    Turnover of every product and category (two queries).
+
+    :param weeks: number of full weeks averaged for boxes_per_week
+    :param today: day of the report (today by default)
+    :return: (products, categories), busiest first
+    """
+    today = today or timezone.localdate()
+    first_week = week_start(today) - timedelta(weeks=weeks)
+    last_week = week_start(today) - timedelta(weeks=1)
+
+    histograms: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+    for prod_cat_name, prod_name, duration, boxes in ActivityDuration.objects \
+            .filter(boxes__gt=0) \
+            .order_by() \
+            .values_list('prod_cat_name', 'prod_name', 'duration', 'boxes'):
+        histograms[(prod_cat_name, prod_name)][duration] += boxes
+
+    recent: Counter = Counter()
+    for prod_cat_name, prod_name, boxes in ActivityWeek.objects \
+            .filter(week_start__gte=first_week, week_start__lte=last_week) \
+            .order_by() \
+            .values_list('prod_cat_name', 'prod_name') \
+            .annotate(boxes=Sum('boxes')):
+        recent[(prod_cat_name, prod_name)] += boxes
+
+    category_histograms: Dict[str, Counter] = defaultdict(Counter)
+    category_recent: Counter = Counter()
+    for (prod_cat_name, _), histogram in histograms.items():
+        category_histograms[prod_cat_name].update(histogram)
+    for (prod_cat_name, _), boxes in recent.items():
+        category_recent[prod_cat_name] += boxes
+
+    def turnover(name, prod_cat_name, histogram, recent_boxes) -> Turnover:
+        boxes = sum(histogram.values())
+        days = sum(duration * count for duration, count in histogram.items())
+        return Turnover(
+            name=name,
+            prod_cat_name=prod_cat_name,
+            boxes=boxes,
+            mean_days=round(days / boxes, 1) if boxes else None,
+            shelf_days=percentile(histogram, SHELF_PERCENTILE),
+            boxes_per_week=round(recent_boxes / weeks, 1) if weeks else 0.0,
+        )
+
+    def busiest_first(turnover: Turnover):
+        return -turnover.boxes_per_week, -turnover.boxes, turnover.name
+
+    products = sorted(
+        (
+            turnover(prod_name, prod_cat_name, histogram,
+                     recent[(prod_cat_name, prod_name)])
+            for (prod_cat_name, prod_name), histogram in histograms.items()
+        ),
+        key=busiest_first,
+    )
+    categories = sorted(
+        (
+            turnover(prod_cat_name, prod_cat_name, histogram,
+                     category_recent[prod_cat_name])
+            for prod_cat_name, histogram in category_histograms.items()
+        ),
+        key=busiest_first,
+    )
+    return products, categories
+
+
+@receiver(post_init, sender=Activity)
+def remember_activity_key(sender, instance: Activity, **kwargs):
+    """
+    Remember what the activity contributed to the totals when loaded.
+    """
+    instance._stats_key = activity_key(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=Activity)
+def count_saved_activity(sender, instance: Activity, created: bool,
+                         raw: bool, **kwargs):
+    """
+    Move a new or changed activity into the totals.
+    """
+    if raw:
+        # loading fixtures, see the module notes
+        return
+    previous = None if created else getattr(instance, '_stats_key', None)
+    current = activity_key(instance)
+    if previous != current:
+        if previous:
+            count_activity(previous, -1)
+        if current:
+            count_activity(current)
+    instance._stats_key = current
+
+
+@receiver(post_delete, sender=Activity)
+def count_deleted_activity(sender, instance: Activity, **kwargs):
+    """
+    Take a deleted activity out of the totals.
+    """
+    previous = getattr(instance, '_stats_key', None)
+    if previous:
+        count_activity(previous, -1)
+    instance._stats_key = None
+
+
+# EOF
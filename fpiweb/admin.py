@@ -5,7 +5,7 @@ Admin.py - Identify what can be mangaged by administrators.
 from django.contrib import admin
 
 from .models import BoxType, Box, Activity, Product, ProductCategory, \
-    Constraints, ProductExample
+    Constraints, ProductExample, BoxEvent, LabelJob
 
 __author__ = '(Multiple)'
 __project__ = "Food-Pantry-Inventory"
@@ -14,13 +14,37 @@ __creation_date__ = "04/01/2019"
 # Register the models for which we want default admin pages to be built.
 admin.site.register(BoxType)
 admin.site.register(ProductCategory)
-admin.site.register(Product)
-admin.site.register(ProductExample)
 admin.site.register(Activity)
 
 
+class ProductChoiceMixin:
+    """
+    Product choices are displayed with their category, so fetch both in one
+    query instead of one query per product.
+    """
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.related_model is Product:
+            kwargs['queryset'] = Product.objects.select_related('prod_cat')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    list_select_related = ('prod_cat', )
+
+
+@admin.register(ProductExample)
+class ProductExampleAdmin(ProductChoiceMixin, admin.ModelAdmin):
+
+    def get_queryset(self, request):
+        # each example is displayed with its product and category
+        return super().get_queryset(request) \
+            .select_related('prod_id__prod_cat')
+
+
 @admin.register(Box)
-class BoxAdmin(admin.ModelAdmin):
+class BoxAdmin(ProductChoiceMixin, admin.ModelAdmin):
     list_display = (
         'box_number',
         'box_type',
@@ -32,6 +56,11 @@ class BoxAdmin(admin.ModelAdmin):
     )
     list_filter = ('box_type', )
 
+    def get_queryset(self, request):
+        # each box is displayed with its box type, product and category
+        return super().get_queryset(request) \
+            .select_related('box_type', 'product__prod_cat')
+
 
 @admin.register(Constraints)
 class ConstraintsAdmin(admin.ModelAdmin):
@@ -44,4 +73,42 @@ class ConstraintsAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(BoxEvent)
+class BoxEventAdmin(admin.ModelAdmin):
+    list_display = (
+        'event_time',
+        'box_number',
+        'event_type',
+        'loc_row',
+        'loc_bin',
+        'loc_tier',
+        'prod_name',
+        'quantity',
+    )
+    list_filter = ('event_type', 'event_date', )
+    search_fields = ('box_number', )
+    date_hierarchy = 'event_date'
+
+
+@admin.register(LabelJob)
+class LabelJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'created',
+        'requested_by',
+        'label_count',
+        'first_box_number',
+        'last_box_number',
+        'layout',
+        'status',
+    )
+    list_filter = ('status', )
+    # the PDF is downloaded from the label jobs page
+    exclude = ('pdf', )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request) \
+            .select_related('requested_by') \
+            .defer('pdf')
+
+
 # EOF
@@ -0,0 +1,366 @@
+"""
+api.py - JSON API used by the scanner app.
+
+The pages in views.py render a full Bootstrap page for every scan.  The
+views below answer the same questions with a few hundred bytes of JSON:
+
+    GET  /fpiweb/api/box/<box_number>/          box lookup
+    POST /fpiweb/api/box/<box_number>/fill/     fill (and place) an empty box
+    POST /fpiweb/api/box/<box_number>/move/     move a filled box
+    POST /fpiweb/api/box/<box_number>/empty/    consume the product in a box
+    GET  /fpiweb/api/products/?q=<text>         product search
+    GET  /fpiweb/api/examples/?q=<text>         product of an item
+    GET  /fpiweb/api/slots/?product=<id>        where to put a filled box
+    POST /fpiweb/api/pallet/move/               move many boxes at once
+    GET  /fpiweb/api/constraints/               valid values of constraints
+
+POST data is validated with the same forms as the pages (FillBoxForm,
+MoveBoxForm and PalletMoveForm) and may be sent either form encoded or as
+a JSON object.
+Every response carries an ETag, so a client that sends If-None-Match gets
+an empty 304 response when nothing changed.  Errors are returned as
+
+    {"errors": {"<field or __all__>": ["message", ...]}}
+"""
+
+import json
+from dataclasses import asdict
+from hashlib import md5
+from typing import Optional
+
+from django.http import HttpRequest, HttpResponse, JsonResponse, QueryDict
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.views import View
+
+from fpiweb.example_lookup import example_lookup
+from fpiweb.forms import FillBoxForm, MoveBoxForm, PalletMoveForm
+from fpiweb.models import Box, BoxNumber, Constraints
+from fpiweb.pallet import move_pallet
+from fpiweb.product_search import search_products
+from fpiweb.slotting import slot_suggester
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+# box fields returned by the box lookup
+BOX_FIELDS = (
+    'id',
+    'box_number',
+    'quantity',
+    'loc_row',
+    'loc_bin',
+    'loc_tier',
+    'exp_year',
+    'exp_month_start',
+    'exp_month_end',
+    'date_filled',
+)
+
+
+def api_response(request: HttpRequest, data: dict,
+                 status: int = 200) -> HttpResponse:
+    """
+    Compact JSON response with an ETag of its content.
+
+    Only reads get an ETag: the response to a POST is built after its
+    change was saved, so a precondition failing then could not stop it.
+
+    :param request: request being answered
+    :param data: content of the response
+    :param status: HTTP status code
+    :return: the response (or a 304 if the client already has it)
+    """
+    response = JsonResponse(
+        data,
+        status=status,
+        json_dumps_params={'separators': (',', ':')},
+    )
+    if status == 200 and request.method in ('GET', 'HEAD'):
+        etag = f'"{md5(response.content).hexdigest()}"'
+        conditional = get_conditional_response(request, etag=etag)
+        if conditional is not None:
+            return conditional
+        response['ETag'] = etag
+    return response
+
+
+def api_error(request: HttpRequest, errors, status: int = 400) -> HttpResponse:
+    """
+    Report errors in the form {"errors": {"<field>": ["message", ...]}}.
+
+    :param request: request being answered
+    :param errors: form errors, or a message that applies to the request
+    :param status: HTTP status code
+    :return: the response
+    """
+    if isinstance(errors, str):
+        errors = {'__all__': [errors]}
+    return api_response(request, {'errors': errors}, status=status)
+
+
+def box_data(box: Box) -> dict:
+    """
+    Contents of a box as sent to the scanner app.
+
+    :param box: box with its box type and product loaded
+    :return: dictionary of field names to values
+    """
+    data = {field: getattr(box, field) for field in BOX_FIELDS}
+    data['box_type'] = box.box_type.box_type_code
+    if box.product_id:
+        data['product'] = box.product_id
+        data['prod_name'] = box.product.prod_name
+    else:
+        data['product'] = None
+        data['prod_name'] = None
+    return data
+
+
+class ApiView(View):
+    """
+    Base of the API views - requires a logged in user.
+
+    Unlike the pages, an anonymous request is answered with a 401 error
+    rather than a redirect to the login page.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return api_error(request, 'Authentication required', status=401)
+        return super().dispatch(request, *args, **kwargs)
+
+    def request_data(self) -> QueryDict:
+        """
+        Data sent with a POST, either form encoded or as a JSON object.
+
+        :return: the data in a form the Django forms accept
+        """
+        if self.request.content_type != 'application/json':
+            return self.request.POST
+
+        data = QueryDict(mutable=True)
+        try:
+            values = json.loads(self.request.body or b'{}')
+        except ValueError:
+            values = None
+        if not isinstance(values, dict):
+            raise ValueError('Expected a JSON object')
+        for name, value in values.items():
+            if isinstance(value, list):
+                # e.g. the box numbers of a pallet move
+                value = ' '.join(str(item) for item in value)
+            data[name] = '' if value is None else str(value)
+        return data
+
+
+class ApiBoxView(ApiView):
+    """
+    Base of the views working on one box, given by its box number.
+    """
+
+    def get_box(self, box_number: str) -> Optional[Box]:
+        """
+        Find the box with the given number.
+
+        :param box_number: e.g. BOX00012
+        :return: the box, with its box type and product, or None
+        """
+        return Box.objects \
+            .select_related('box_type', 'product') \
+            .filter(box_number=box_number.upper()) \
+            .first()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated and \
+                not BoxNumber.validate(kwargs['box_number'].upper()):
+            return api_error(
+                request, f"Invalid box_number '{kwargs['box_number']}'")
+        return super().dispatch(request, *args, **kwargs)
+
+    def box_response(self, box: Box) -> HttpResponse:
+        return api_response(self.request, {'box': box_data(box)})
+
+
+class ApiBoxLookupView(ApiBoxView):
+    """
+    Look up a box by its number.
+    """
+
+    def get(self, request, box_number):
+        box = self.get_box(box_number)
+        if box is None:
+            return api_error(
+                request, f'{box_number} does not exist', status=404)
+        return self.box_response(box)
+
+
+class ApiBoxFillView(ApiBoxView):
+    """
+    Fill an empty box and put it in a location.
+
+    Takes the fields of FillBoxForm and MoveBoxForm.
+    """
+
+    def post(self, request, box_number):
+        box = self.get_box(box_number)
+        if box is None:
+            return api_error(
+                request, f'{box_number} does not exist', status=404)
+        if box.product_id:
+            return api_error(request, f'{box.box_number} is already filled')
+
+        try:
+            data = self.request_data()
+        except ValueError as exc:
+            return api_error(request, str(exc))
+        fill_form = FillBoxForm(data, instance=box)
+        move_form = MoveBoxForm(data, instance=box)
+        if not (fill_form.is_valid() & move_form.is_valid()):
+            errors = dict(fill_form.errors)
+            errors.update(move_form.errors)
+            return api_error(request, errors)
+
+        box = fill_form.save(commit=False)
+        if box.date_filled is None:
+            box.date_filled = timezone.now()
+        if box.quantity is None:
+            box.quantity = box.box_type.box_type_qty
+        box = move_form.save()
+        return self.box_response(box)
+
+
+class ApiBoxMoveView(ApiBoxView):
+    """
+    Move a filled box to a new location.
+
+    Takes the fields of MoveBoxForm.
+    """
+
+    def post(self, request, box_number):
+        box = self.get_box(box_number)
+        if box is None:
+            return api_error(
+                request, f'{box_number} does not exist', status=404)
+        if not box.product_id:
+            return api_error(request, f'{box.box_number} is empty')
+
+        try:
+            data = self.request_data()
+        except ValueError as exc:
+            return api_error(request, str(exc))
+        move_form = MoveBoxForm(data, instance=box)
+        if not move_form.is_valid():
+            return api_error(request, move_form.errors)
+
+        box = move_form.save()
+        return self.box_response(box)
+
+
+class ApiBoxEmptyView(ApiBoxView):
+    """
+    Consume the product in a box (recording it as an activity).
+    """
+
+    def get_box(self, box_number: str) -> Optional[Box]:
+        # the activity record includes the product category
+        return Box.objects \
+            .select_related('box_type', 'product__prod_cat') \
+            .filter(box_number=box_number.upper()) \
+            .first()
+
+    def post(self, request, box_number):
+        box = self.get_box(box_number)
+        if box is None:
+            return api_error(
+                request, f'{box_number} does not exist', status=404)
+        if not box.product_id:
+            return api_error(request, f'{box.box_number} is already empty')
+
+        box.empty()
+        return self.box_response(box)
+
+
+class ApiProductSearchView(ApiView):
+    """
+    Products best matching the text typed so far (?q=...).
+    """
+
+    def get(self, request):
+        products = [
+            {'id': pk, 'name': name}
+            for pk, name in search_products(request.GET.get('q', ''))
+            .values_list('id', 'prod_name')
+        ]
+        return api_response(request, {'products': products})
+
+
+class ApiProductExampleView(ApiView):
+    """
+    Product examples (and their products) matching an item name (?q=...).
+    """
+
+    def get(self, request):
+        examples = [
+            {
+                'name': example.prod_example_name,
+                'product': example.prod_id,
+                'prod_name': example.prod_name,
+            }
+            for example in example_lookup.lookup(request.GET.get('q', ''))
+        ]
+        return api_response(request, {'examples': examples})
+
+
+class ApiSlotSuggestionView(ApiView):
+    """
+    Suggested locations for a box of the given product (?product=<id>).
+    """
+
+    def get(self, request):
+        product_id = request.GET.get('product', '')
+        if not product_id.isdigit():
+            return api_error(request, 'product must be a product id')
+        slots = [
+            asdict(suggestion)
+            for suggestion in slot_suggester.suggest(int(product_id))
+        ]
+        return api_response(request, {'slots': slots})
+
+
+class ApiPalletMoveView(ApiView):
+    """
+    Move every box of a slot (or a list of boxes) to a new location.
+
+    Takes the fields of PalletMoveForm and answers with the number of
+    boxes moved, already there and empty, and the box numbers not found.
+    """
+
+    def post(self, request):
+        try:
+            data = self.request_data()
+        except ValueError as exc:
+            return api_error(request, str(exc))
+        form = PalletMoveForm(data)
+        if not form.is_valid():
+            return api_error(request, form.errors)
+
+        result = move_pallet(form.cleaned_data)
+        return api_response(request, {'pallet': asdict(result)})
+
+
+class ApiConstraintsView(ApiView):
+    """
+    Valid values of every constraint, e.g. {"Row": [1, 4], ...}.
+    """
+
+    def get(self, request):
+        constraints = {
+            constraint.constraint_name: constraint.valid_values()
+            for constraint in Constraints.objects.all()
+        }
+        return api_response(request, {'constraints': constraints})
+
+
+# EOF
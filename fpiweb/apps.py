@@ -7,3 +7,35 @@ __creation_date__ = "04/01/2019"
 
 class FpiwebConfig(AppConfig):
     name = 'fpiweb'
+
+    def ready(self):
+        # connect the signal receivers that log box changes
+        from fpiweb import box_events  # noqa: F401
+
+        # connect the health checks for persistent database connections
+        from fpiweb import db_connections  # noqa: F401
+
+        # connect the invalidation of cached template fragments
+        from fpiweb import fragment_cache  # noqa: F401
+
+        # connect the refresh of the product example lookup
+        from fpiweb import example_lookup  # noqa: F401
+
+        # connect the invalidation of the cached occupancy map
+        from fpiweb import occupancy  # noqa: F401
+
+        # connect the updates of the slot index used for suggestions
+        from fpiweb import slotting  # noqa: F401
+
+        # connect the running totals of the activity statistics
+        from fpiweb import activity_stats  # noqa: F401
+
+        # connect the invalidation of the cached demand forecast
+        from fpiweb import forecast  # noqa: F401
+
+        # connect the recompiling of the constraint validators
+        from fpiweb import constraint_validators  # noqa: F401
+
+        # connect the updates of the CHECK constraints on boxes and
+        # activities
+        from fpiweb import constraint_checks  # noqa: F401
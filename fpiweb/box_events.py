@@ -0,0 +1,333 @@
+"""
+box_events.py - Capture box changes from model signals and log them.
+
+Every save or delete of a Box is turned into a BoxEvent.  The events are
+not written while the box is being saved.  Instead they are handed to the
+BoxEventWriter once the surrounding transaction commits and written in
+batches, either by a background thread or at the end of the request.
+
+The behavior is controlled by the BOX_EVENT_LOG dictionary in settings.
+"""
+
+import atexit
+from logging import getLogger
+from threading import Event, Lock, Thread
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from fpiweb.models import Box, BoxEvent, Product
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+
+logger = getLogger('fpiweb')
+
+# Box fields whose changes are recorded in a box event
+TRACKED_FIELDS = (
+    'box_number',
+    'box_type_id',
+    'loc_row',
+    'loc_bin',
+    'loc_tier',
+    'product_id',
+    'exp_year',
+    'exp_month_start',
+    'exp_month_end',
+    'date_filled',
+    'quantity',
+)
+
+LOCATION_FIELDS = ('loc_row', 'loc_bin', 'loc_tier')
+
+DEFAULT_BOX_EVENT_LOG = {
+    # write events from a background thread (True) or at the end of the
+    # request (False)
+    'ASYNC': True,
+
+    # number of queued events that triggers an immediate flush
+    'BATCH_SIZE': 100,
+
+    # seconds the background thread waits between flushes
+    'FLUSH_INTERVAL': 2.0,
+}
+
+
+def get_box_event_settings() -> dict:
+    """
+    Combine the BOX_EVENT_LOG setting with the defaults.
+
+    :return: dictionary of box event log settings
+    """
+    config = dict(DEFAULT_BOX_EVENT_LOG)
+    config.update(getattr(settings, 'BOX_EVENT_LOG', {}))
+    return config
+
+
+class BoxEventWriter:
+    """
+    Queue box events in memory and write them to the database in batches.
+    """
+
+    def __init__(self):
+        self.queue: list = list()
+        self.lock: Lock = Lock()
+        # held while writing, so a flush waits for one already running
+        self.flush_lock: Lock = Lock()
+        self.wakeup: Event = Event()
+        self.thread: Thread = None
+
+    def record(self, event: BoxEvent):
+        """
+        Queue an event once the current transaction commits.
+
+        Events recorded inside a transaction that is rolled back are
+        discarded along with it.
+
+        :param event: unsaved box event
+        :return:
+        """
+        transaction.on_commit(lambda: self.enqueue(event))
+
+    def enqueue(self, event: BoxEvent):
+        """
+        Add an event to the queue and flush if the batch is full.
+
+        :param event: unsaved box event
+        :return:
+        """
+        config = get_box_event_settings()
+        with self.lock:
+            self.queue.append(event)
+            batch_full = len(self.queue) >= config['BATCH_SIZE']
+
+        if config['ASYNC']:
+            self.start_thread()
+            if batch_full:
+                self.wakeup.set()
+        elif batch_full:
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write all queued events to the database.
+
+        If they cannot be written (e.g. the database restarted) they are
+        put back on the queue, to be written by the next flush.
+
+        :return: number of events written
+        """
+        with self.flush_lock:
+            with self.lock:
+                events = self.queue
+                self.queue = list()
+            if not events:
+                return 0
+
+            batch_size = get_box_event_settings()['BATCH_SIZE']
+            try:
+                with transaction.atomic():
+                    self.resolve_references(events)
+                    BoxEvent.objects.bulk_create(
+                        events, batch_size=batch_size)
+            except Exception:
+                logger.exception(f'Unable to write {len(events)} box '
+                                 f'events, kept for the next flush')
+                with self.lock:
+                    self.queue[:0] = events
+                return 0
+        return len(events)
+
+    @staticmethod
+    def resolve_references(events: list):
+        """
+        Fill in product names and drop links to boxes deleted since.
+
+        This is done here, once per batch, so that saving a box never pays
+        for an extra query.
+
+        :param events: box events about to be written
+        :return:
+        """
+        product_ids = {event.product_id for event in events}
+        product_ids.discard(None)
+        prod_names = dict(
+            Product.objects
+            .filter(pk__in=product_ids)
+            .values_list('pk', 'prod_name')
+        )
+
+        box_ids = {event.box_id for event in events}
+        box_ids.discard(None)
+        existing_box_ids = set(
+            Box.objects.filter(pk__in=box_ids).values_list('pk', flat=True))
+
+        for event in events:
+            event.prod_name = prod_names.get(event.product_id)
+            if event.box_id not in existing_box_ids:
+                event.box_id = None
+
+    def start_thread(self):
+        """
+        Start the background flushing thread if it is not running yet.
+
+        :return:
+        """
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.thread = Thread(
+                target=self.run_thread,
+                name='box-event-writer',
+                daemon=True,
+            )
+            self.thread.start()
+
+    def run_thread(self):
+        """
+        Flush the queue periodically, or sooner when a batch fills up.
+
+        :return:
+        """
+        while True:
+            config = get_box_event_settings()
+            self.wakeup.wait(config['FLUSH_INTERVAL'])
+            self.wakeup.clear()
+            if not config['ASYNC']:
+                # the events are written at the end of each request
+                continue
+            try:
+                self.flush()
+            finally:
+                # don't hold a database connection open while idle, and
+                # never reuse one that failed
+                connection.close()
+
+
+box_event_writer = BoxEventWriter()
+
+atexit.register(box_event_writer.flush)
+
+
+def build_box_event(box: Box, event_type: str, changes: dict) -> BoxEvent:
+    """
+    Create (but do not save) a box event describing the box as it is now.
+
+    :param box: box that was changed
+    :param event_type: one of the BoxEvent event type names
+    :param changes: dictionary of field name to [old value, new value]
+    :return: unsaved box event
+    """
+    event_time = timezone.now()
+    event = BoxEvent(
+        box_id=None if event_type == BoxEvent.DELETED else box.pk,
+        box_number=box.box_number,
+        event_type=event_type,
+        event_time=event_time,
+        event_date=timezone.localdate(event_time),
+        loc_row=box.loc_row,
+        loc_bin=box.loc_bin,
+        loc_tier=box.loc_tier,
+        quantity=box.quantity,
+        changes=changes,
+    )
+    # the product name is looked up when the event is written
+    event.product_id = box.product_id
+    return event
+
+
+def snapshot(box: Box) -> dict:
+    """
+    Capture the current values of the tracked fields of a box.
+
+    :param box: box to capture
+    :return: dictionary of field name to value
+    """
+    return {name: getattr(box, name) for name in TRACKED_FIELDS}
+
+
+def classify_changes(created: bool, changes: dict) -> str:
+    """
+    Pick the event type that best describes a set of changes.
+
+    :param created: True if the box was just added
+    :param changes: dictionary of field name to [old value, new value]
+    :return: one of the BoxEvent event type names
+    """
+    if created:
+        return BoxEvent.CREATED
+    if 'product_id' in changes:
+        old_product, new_product = changes['product_id']
+        if new_product is None:
+            return BoxEvent.EMPTIED
+        if old_product is None:
+            return BoxEvent.FILLED
+    if any(name in changes for name in LOCATION_FIELDS):
+        return BoxEvent.MOVED
+    return BoxEvent.EDITED
+
+
+@receiver(post_save, sender=Box)
+def log_box_saved(sender, instance: Box, created: bool, raw: bool,
+                  **kwargs):
+    """
+    Record an event if a saved box actually changed.
+    """
+    if raw:
+        # loading fixtures
+        return
+
+    current = snapshot(instance)
+    previous = instance.loaded_values or {}
+    changes = {
+        name: [str_or_none(previous.get(name)), str_or_none(value)]
+        for name, value in current.items()
+        if created or previous.get(name) != value
+    }
+    if not changes:
+        return
+
+    event_type = classify_changes(created, changes)
+    box_event_writer.record(build_box_event(instance, event_type, changes))
+
+
+@receiver(post_delete, sender=Box)
+def log_box_deleted(sender, instance: Box, **kwargs):
+    """
+    Record the deletion of a box.
+    """
+    box_event_writer.record(
+        build_box_event(instance, BoxEvent.DELETED, {}))
+
+
+@receiver(request_finished)
+def flush_box_events(sender, **kwargs):
+    """
+    Write the queued events at the end of the request when not using the
+    background thread.
+    """
+    if not get_box_event_settings()['ASYNC']:
+        box_event_writer.flush()
+
+
+def str_or_none(value):
+    """
+    Convert a value to a string so it can be stored as JSON.
+
+    :param value: any field value
+    :return: None or the value as a string (numbers are left alone)
+    """
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return str(value)
+
+
+# EOF
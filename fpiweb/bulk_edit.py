@@ -0,0 +1,83 @@
+"""
+bulk_edit.py - Save the rows of the box bulk edit that were changed.
+
+After a donation drive the quantities and expiration dates of hundreds of
+boxes need fixing.  The bulk edit page shows them a page at a time in a
+model formset (BoxBulkEditFormSet).  Only the rows actually changed are
+saved, all with one bulk UPDATE, and an Edited box event is written for
+each of them with one bulk insert, in the same transaction.
+
+bulk_update sends no signals, so the box detail fragments of the changed
+boxes are dropped here.  The occupancy map and slot index are not
+affected as neither location nor product can be changed.
+"""
+
+from typing import Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from fpiweb.box_events import build_box_event, get_box_event_settings, \
+    str_or_none
+from fpiweb.forms import BoxBulkEditForm
+from fpiweb.fragment_cache import box_detail_key
+from fpiweb.models import Box, BoxEvent
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+# boxes shown on one page of the bulk edit
+BULK_EDIT_PAGE_SIZE = 50
+
+
+def save_changed_boxes(forms: Iterable[BoxBulkEditForm]) -> int:
+    """
+    Save the boxes whose form was changed.
+
+    :param forms: valid bulk edit forms, one per box
+    :return: number of boxes saved
+    """
+    now = timezone.now()
+    boxes = list()
+    events = list()
+    replaced_keys = list()
+    fields = {'last_changed'}
+    for form in forms:
+        changes = {
+            name: [
+                str_or_none(form.initial.get(name)),
+                str_or_none(form.cleaned_data.get(name)),
+            ]
+            for name in form.changed_data
+        }
+        changes = {
+            name: values for name, values in changes.items()
+            if values[0] != values[1]
+        }
+        if not changes:
+            continue
+
+        box: Box = form.instance
+        replaced_keys.append(box_detail_key(box.pk, box.cache_version))
+        box.last_changed = now
+        boxes.append(box)
+        fields.update(changes)
+
+        event = build_box_event(box, BoxEvent.EDITED, changes)
+        event.prod_name = box.product.prod_name if box.product_id else None
+        events.append(event)
+
+    if not boxes:
+        return 0
+
+    batch_size = get_box_event_settings()['BATCH_SIZE']
+    with transaction.atomic():
+        Box.objects.bulk_update(boxes, sorted(fields), batch_size=batch_size)
+        BoxEvent.objects.bulk_create(events, batch_size=batch_size)
+        transaction.on_commit(lambda: cache.delete_many(replaced_keys))
+    return len(boxes)
+
+
+# EOF
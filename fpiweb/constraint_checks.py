@@ -0,0 +1,268 @@
+"""
+constraint_checks.py - CHECK constraints on the boxes and activities.
+
+The forms check box values against the Constraints table (see
+constraint_validators.py), but the admin, bulk loads and raw SQL do not go
+through the forms.  The rules that hold for every box and activity, old or
+new, are therefore also added to the database as CHECK constraints:
+
+    quantity            within the Quantity Limit constraint
+    exp_month_start     within the Expiration Month constraint
+    exp_month_end       within the Expiration Month constraint
+    expiration months   both or neither given, the end after the start
+
+The Expiration Year list (years for newly packed boxes) and the Row, Bin
+and Tier constraints (which may be narrowed while boxes are still in the
+dropped locations) are only checked by the forms.
+
+Each CHECK constraint is named after a hash of its condition, so bringing
+the database in line with the Constraints table only adds the checks whose
+condition changed and drops the stale ones.  A check is added NOT VALID,
+which enforces it on new and changed rows at once without reading the
+table, and is then validated if no existing row breaks it.
+
+Run "python manage.py constraint_checks" after loading the constraints; the
+checks are brought in line again whenever a constraint is changed, except
+that a check existing rows break is then left to the command (the old one
+is kept), so those rows can still be moved and edited.
+"""
+
+from dataclasses import dataclass
+from hashlib import sha1
+from logging import getLogger
+from typing import Dict, List, Tuple
+
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from fpiweb.constraint_validators import EXP_MONTH, QUANTITY, \
+    RangeValidator, Validator, constraint_validators
+from fpiweb.models import Activity, Box, Constraints
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+logger = getLogger('fpiweb')
+
+# start of the name of every CHECK constraint added here
+CHECK_PREFIX = 'fpi_check_'
+
+# models checked, and the constraint checking each of their columns
+CHECKED_MODELS = (Box, Activity)
+CHECKED_COLUMNS = {
+    'quantity': QUANTITY,
+    'exp_month_start': EXP_MONTH,
+    'exp_month_end': EXP_MONTH,
+}
+
+# both expiration months or neither, the end after the start
+MONTH_ORDER_CONDITION = \
+    '(exp_month_start IS NULL) = (exp_month_end IS NULL) AND ' \
+    '(exp_month_start IS NULL OR exp_month_end > exp_month_start)'
+
+
+@dataclass
+class CheckDefinition:
+    """
+    A CHECK constraint on one table.
+    """
+    table: str
+    label: str
+    condition: str
+
+    @property
+    def prefix(self) -> str:
+        """ Start of the name of every check of this column. """
+        return f'{CHECK_PREFIX}{self.table}_{self.label}_'
+
+    @property
+    def name(self) -> str:
+        digest = sha1(self.condition.encode()).hexdigest()[:8]
+        return f'{self.prefix}{digest}'[:63]
+
+
+def validator_condition(column: str, validator: Validator) -> str:
+    """
+    SQL condition of an integer validator on a column.
+
+    :param column: column checked (NULL passes, as in any CHECK)
+    :param validator: the compiled constraint
+    :return: the condition
+    """
+    quote = connection.ops.quote_name
+    if isinstance(validator, RangeValidator):
+        return f'{quote(column)} BETWEEN {int(validator.minimum)} ' \
+            f'AND {int(validator.maximum)}'
+    values = ', '.join(str(int(value)) for value in validator.ordered)
+    return f'{quote(column)} IN ({values})'
+
+
+def check_definitions() -> List[CheckDefinition]:
+    """
+    The CHECK constraints the Constraints table asks for.
+
+    :return: the checks of every checked table
+    """
+    validators = constraint_validators()
+    definitions = list()
+    for model in CHECKED_MODELS:
+        table = model._meta.db_table
+        for column, constraint_name in CHECKED_COLUMNS.items():
+            validator = validators.get(constraint_name)
+            # the columns are whole numbers
+            if validator is not None and validator.integer:
+                definitions.append(CheckDefinition(
+                    table, column, validator_condition(column, validator)))
+        definitions.append(
+            CheckDefinition(table, 'exp_months', MONTH_ORDER_CONDITION))
+    return definitions
+
+
+def existing_checks() -> Dict[str, Tuple[str, bool]]:
+    """
+    The CHECK constraints added here, as found in the database.
+
+    :return: table and whether it is validated, by constraint name
+    """
+    tables = [model._meta.db_table for model in CHECKED_MODELS]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT con.conname, rel.relname, con.convalidated "
+            "FROM pg_constraint con "
+            "JOIN pg_class rel ON rel.oid = con.conrelid "
+            "WHERE con.contype = 'c' AND rel.relname = ANY(%s) "
+            "AND con.conname LIKE %s",
+            [tables, CHECK_PREFIX + '%'],
+        )
+        return {name: (table, valid) for name, table, valid in cursor}
+
+
+def broken_rows(cursor, definition: CheckDefinition) -> int:
+    """
+    Count the rows breaking a CHECK constraint.
+
+    :param cursor: cursor of the connection
+    :param definition: the check
+    :return: number of rows
+    """
+    quote = connection.ops.quote_name
+    cursor.execute(
+        f'SELECT count(*) FROM {quote(definition.table)} '
+        f'WHERE NOT ({definition.condition})')
+    return cursor.fetchone()[0]
+
+
+def sync_checks(validate: bool = True,
+                keep_broken: bool = False) -> Dict[str, int]:
+    """
+    Bring the CHECK constraints in line with the Constraints table.
+
+    A check added NOT VALID is enforced on every later update of the rows
+    breaking it, so they could no longer be moved or edited.  With
+    keep_broken such a check is not added and the one it would replace is
+    kept.
+
+    :param validate: check the existing rows of the new constraints
+    :param keep_broken: leave out the new checks existing rows break
+    :return: rows breaking each constraint left out or not validated, by
+        name
+    """
+    quote = connection.ops.quote_name
+    wanted = {
+        definition.name: definition for definition in check_definitions()}
+    kept = set()
+    broken = dict()
+    with transaction.atomic():
+        existing = existing_checks()
+        with connection.cursor() as cursor:
+            for name, definition in list(wanted.items()):
+                if not keep_broken or name in existing:
+                    continue
+                rows = broken_rows(cursor, definition)
+                if rows:
+                    broken[name] = rows
+                    del wanted[name]
+                    kept.update(
+                        old for old in existing
+                        if old.startswith(definition.prefix))
+            for name, (table, _) in existing.items():
+                if name not in wanted and name not in kept:
+                    cursor.execute(
+                        f'ALTER TABLE {quote(table)} '
+                        f'DROP CONSTRAINT {quote(name)}')
+            for name, definition in wanted.items():
+                if name not in existing:
+                    cursor.execute(
+                        f'ALTER TABLE {quote(definition.table)} '
+                        f'ADD CONSTRAINT {quote(name)} '
+                        f'CHECK ({definition.condition}) NOT VALID')
+    if not validate:
+        return broken
+
+    existing = existing_checks()
+    with connection.cursor() as cursor:
+        for name, definition in wanted.items():
+            if existing.get(name, (None, True))[1]:
+                continue
+            rows = broken_rows(cursor, definition)
+            if rows:
+                broken[name] = rows
+                continue
+            cursor.execute(
+                f'ALTER TABLE {quote(definition.table)} '
+                f'VALIDATE CONSTRAINT {quote(name)}')
+    return broken
+
+
+def drop_checks() -> int:
+    """
+    Remove every CHECK constraint added here.
+
+    :return: number of constraints removed
+    """
+    quote = connection.ops.quote_name
+    with transaction.atomic():
+        existing = existing_checks()
+        with connection.cursor() as cursor:
+            for name, (table, _) in existing.items():
+                cursor.execute(
+                    f'ALTER TABLE {quote(table)} '
+                    f'DROP CONSTRAINT {quote(name)}')
+    return len(existing)
+
+
+def sync_checks_on_commit():
+    """
+    Bring the CHECK constraints in line, unless existing rows break them.
+
+    A narrowed constraint some boxes or activities are already out of
+    keeps its old check; the command adds the new one once they are
+    corrected.
+    """
+    if not existing_checks():
+        return
+    broken = sync_checks(validate=False, keep_broken=True)
+    for name, rows in broken.items():
+        logger.warning(
+            f'{rows} rows break the new CHECK constraint {name}, so it was '
+            f'not added.  Correct them and run "python manage.py '
+            f'constraint_checks".')
+    return
+
+
+@receiver(post_save, sender=Constraints)
+@receiver(post_delete, sender=Constraints)
+def sync_checks_on_constraint(sender, raw=False, **kwargs):
+    """
+    Follow a changed constraint once it is committed.
+
+    Only databases where the checks were added (by the constraint_checks
+    command) are changed, and not while fixtures are loaded.
+    """
+    if not raw:
+        transaction.on_commit(sync_checks_on_commit)
+
+
+# EOF
@@ -0,0 +1,315 @@
+"""
+constraint_validators.py - Check box values against the Constraints table.
+
+Every row of the Constraints table is compiled into a validator: a range
+check for a Min/Max constraint, or membership of a frozenset for a valid
+list.  The validators give the choices of the box forms and check the
+values of the box forms and bulk edits (row, bin and tier, quantity,
+expiration year and months).
+
+The constraints are read with one query and kept in the cache together
+with a version token, which is added before they are read and dropped when
+a constraint changes.  Each
+process compiles the validators once per version: a form only reads the
+token from the cache (in memory, see tiered_cache.py) to know the
+validators it has are still current.
+"""
+
+from dataclasses import dataclass
+from logging import getLogger
+from threading import RLock
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from fpiweb.models import Constraints
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+logger = getLogger('fpiweb')
+
+# names of the constraints checked on boxes
+ROW = 'Row'
+BIN = 'Bin'
+TIER = 'Tier'
+QUANTITY = 'Quantity Limit'
+EXP_YEAR = 'Expiration Year'
+EXP_MONTH = 'Expiration Month'
+
+# constraint checking each box field
+BOX_FIELD_CONSTRAINTS = {
+    'loc_row': ROW,
+    'loc_bin': BIN,
+    'loc_tier': TIER,
+    'quantity': QUANTITY,
+    'exp_year': EXP_YEAR,
+    'exp_month_start': EXP_MONTH,
+    'exp_month_end': EXP_MONTH,
+}
+
+# cache keys of the version token and of the constraints of that version
+VERSION_KEY = 'constraint_validators:version'
+ROWS_KEY = 'constraint_validators:rows'
+
+# fields of a constraint needed to compile it
+ROW_FIELDS = (
+    'constraint_name',
+    'constraint_type',
+    'constraint_min',
+    'constraint_max',
+    'constraint_list',
+)
+
+Value = Union[int, str]
+
+
+@dataclass(frozen=True)
+class RangeValidator:
+    """
+    Values from a minimum to a maximum (a Min/Max constraint).
+    """
+    name: str
+    integer: bool
+    minimum: Value
+    maximum: Value
+
+    def __contains__(self, value) -> bool:
+        value = convert(value, self.integer)
+        return value is not None and self.minimum <= value <= self.maximum
+
+    def values(self) -> List[Value]:
+        """ Valid values in order (none for a character range). """
+        if not self.integer:
+            return []
+        return list(range(self.minimum, self.maximum + 1))
+
+    @property
+    def message(self) -> str:
+        return f'{self.name} must be from {self.minimum} to {self.maximum}'
+
+
+@dataclass(frozen=True)
+class SetValidator:
+    """
+    Values of a list (a Valid List constraint).
+    """
+    name: str
+    integer: bool
+    ordered: Tuple[Value, ...]
+    members: FrozenSet[Value]
+
+    def __contains__(self, value) -> bool:
+        return convert(value, self.integer) in self.members
+
+    def values(self) -> List[Value]:
+        """ Valid values in the order of the list. """
+        return list(self.ordered)
+
+    @property
+    def message(self) -> str:
+        return f'{self.name} must be one of ' \
+            f'{", ".join(str(value) for value in self.ordered)}'
+
+
+Validator = Union[RangeValidator, SetValidator]
+
+
+def convert(value, integer: bool) -> Optional[Value]:
+    """
+    A value as compared by a validator.
+
+    :param value: value of a form field or box
+    :param integer: the constraint is of whole numbers ("04" is 4)
+    :return: the value, or None if it is not a whole number when it must be
+    """
+    if not integer:
+        return str(value).strip()
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def compile_constraint(row: dict) -> Validator:
+    """
+    Validator of one constraint.
+
+    :param row: the fields of the constraint named in ROW_FIELDS
+    :return: the validator
+    """
+    constraint = Constraints(**row)
+    values = constraint.valid_values()
+    integer = constraint.constraint_type in (
+        Constraints.INT_RANGE, Constraints.INT_LIST)
+    if constraint.constraint_type in (
+            Constraints.INT_RANGE, Constraints.CHAR_RANGE):
+        return RangeValidator(
+            name=constraint.constraint_name,
+            integer=integer,
+            minimum=values[0],
+            maximum=values[1],
+        )
+    return SetValidator(
+        name=constraint.constraint_name,
+        integer=integer,
+        ordered=tuple(values),
+        members=frozenset(values),
+    )
+
+
+class ConstraintValidators:
+    """
+    The validators of every constraint, by name (in any case).
+    """
+
+    def __init__(self, rows: List[dict]):
+        self.validators: Dict[str, Validator] = dict()
+        for row in rows:
+            try:
+                validator = compile_constraint(row)
+            except (TypeError, ValueError, IndexError):
+                logger.error(
+                    f'Constraint {row["constraint_name"]} has invalid '
+                    f'values and is not checked')
+                continue
+            self.validators[validator.name.lower()] = validator
+
+    def get(self, name: str) -> Optional[Validator]:
+        return self.validators.get(name.lower())
+
+    def values(self, name: str) -> Optional[List[Value]]:
+        """
+        Valid values of a constraint, in order.
+
+        :param name: name of the constraint
+        :return: the values, or None if there is no such constraint
+        """
+        validator = self.get(name)
+        return None if validator is None else validator.values()
+
+    def choices(self, name: str) -> List[Tuple[str, str]]:
+        """
+        Valid values of a constraint, as choices of a form field.
+        """
+        return [(str(value), str(value)) for value in self.values(name) or []]
+
+    def box_errors(self, values: dict) -> Dict[str, str]:
+        """
+        Check the values of box fields against their constraints.
+
+        Empty values and fields without a constraint are not checked.
+
+        :param values: values by box field name (e.g. a form's cleaned_data)
+        :return: error message by field name
+        """
+        errors = dict()
+        for field_name, name in BOX_FIELD_CONSTRAINTS.items():
+            value = values.get(field_name)
+            if value is None or value == '':
+                continue
+            validator = self.get(name)
+            if validator is not None and value not in validator:
+                errors[field_name] = validator.message
+        return errors
+
+
+class ValidatorRegistry:
+    """
+    Process wide holder of the validators, compiled once per version.
+    """
+
+    def __init__(self):
+        self._version: Optional[str] = None
+        self._validators: Optional[ConstraintValidators] = None
+        self._lock = RLock()
+
+    def validators(self) -> ConstraintValidators:
+        """
+        The validators of the current version of the constraints.
+
+        :return: the validators
+        """
+        version = cache.get(VERSION_KEY)
+        with self._lock:
+            if version is not None and version == self._version:
+                return self._validators
+        rows = None
+        if version is not None:
+            cached = cache.get(ROWS_KEY)
+            if cached is not None and cached[0] == version:
+                rows = cached[1]
+        if rows is None:
+            version, rows = self.read_rows()
+        validators = ConstraintValidators(rows)
+        with self._lock:
+            self._version = version
+            self._validators = validators
+        return validators
+
+    @staticmethod
+    def read_rows() -> Tuple[Optional[str], List[dict]]:
+        """
+        Read the constraints and cache them under a version token.
+
+        The token is added to the cache before the constraints are read, so
+        a constraint committed after the read drops it (see
+        invalidate_constraint_validators) and the rows read cannot outlive
+        the change.  Inside a transaction the cache is only written on
+        commit, possibly after such a change, so the token is dropped again
+        then.
+
+        :return: the token (None if dropped already) and the constraints
+        """
+        version = uuid4().hex
+        if not cache.add(VERSION_KEY, version, None):
+            # added by another process meanwhile
+            version = cache.get(VERSION_KEY)
+        rows = list(Constraints.objects.order_by().values(*ROW_FIELDS))
+        if version is not None:
+            cache.set(ROWS_KEY, (version, rows), None)
+            if connection.in_atomic_block:
+                transaction.on_commit(invalidate_constraint_validators)
+        return version, rows
+
+
+validator_registry = ValidatorRegistry()
+
+
+def constraint_validators() -> ConstraintValidators:
+    """
+    The validators of the current constraints.
+
+    :return: the validators
+    """
+    return validator_registry.validators()
+
+
+def invalidate_constraint_validators():
+    """
+    Compile the validators again before they are next used.
+
+    Called when a constraint changes.  Code changing the constraints
+    without signals (e.g. bulk_update) must call it too.
+
+    :return:
+    """
+    cache.delete(VERSION_KEY)
+    return
+
+
+@receiver(post_save, sender=Constraints)
+@receiver(post_delete, sender=Constraints)
+def invalidate_validators_on_constraint(sender, **kwargs):
+    """
+    Compile the validators again once a changed constraint is committed.
+    """
+    transaction.on_commit(invalidate_constraint_validators)
+
+
+# EOF
@@ -0,0 +1,239 @@
+"""
+constraints_edit.py - Check and apply changes to many constraints at once.
+
+The Row, Bin and Tier constraints say where a box can be put.  Narrowing
+one of them (e.g. Row 01 to 04 becoming 01 to 03) leaves the boxes already
+in the dropped locations stranded: the occupancy map counts them as
+unplaced and the move forms no longer offer their location.
+
+The Quantity Limit and Expiration Month constraints hold every box (see
+constraint_checks.py), so narrowing one of them leaves the boxes already
+out of the new values to be corrected.
+
+The constraints bulk edit first reports, for every one of these
+constraints changed, the boxes the new values would leave out.  This takes
+one aggregate query per constraint (count, box numbers and values
+together), however many boxes there are.  The changes are then saved
+together in one transaction, after checking the boxes again, and only if
+no box is left out or the user accepted it.
+
+bulk_update sends no signals, so the occupancy map, the slot index, the
+constraint validators and the CHECK constraints are refreshed here once
+the changes are committed.
+"""
+
+from dataclasses import dataclass, field
+from functools import reduce
+from operator import or_
+from typing import Iterable, List, Optional, Tuple
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import transaction
+from django.db.models import CharField, Count, IntegerField, Q, Transform
+
+from fpiweb.constraint_checks import sync_checks_on_commit
+from fpiweb.constraint_validators import BIN, EXP_MONTH, QUANTITY, ROW, \
+    TIER, invalidate_constraint_validators
+from fpiweb.models import Box, Constraints
+from fpiweb.occupancy import invalidate_occupancy
+from fpiweb.slotting import slot_suggester
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+# box field of each location constraint, and the constraint type the box
+# forms, the occupancy map and the slot suggestions depend on
+LOCATION_CONSTRAINTS = {
+    ROW: ('loc_row', Constraints.INT_RANGE),
+    BIN: ('loc_bin', Constraints.INT_RANGE),
+    TIER: ('loc_tier', Constraints.CHAR_LIST),
+}
+
+# box fields of each constraint whose changes are checked against the boxes
+REPORTED_CONSTRAINTS = {
+    ROW: ('loc_row',),
+    BIN: ('loc_bin',),
+    TIER: ('loc_tier',),
+    QUANTITY: ('quantity',),
+    EXP_MONTH: ('exp_month_start', 'exp_month_end'),
+}
+
+# fields of a constraint changed by the bulk edit
+BULK_EDIT_FIELDS = [
+    'constraint_type',
+    'constraint_min',
+    'constraint_max',
+    'constraint_list',
+]
+
+
+class LocationNumber(Transform):
+    """
+    A location as a number, or NULL if it is not a number ("04" is 4).
+    """
+    lookup_name = 'location_number'
+    # the column is repeated, which is fine as a column has no parameters
+    template = \
+        "CASE WHEN %(expressions)s ~ '^[0-9]+$' " \
+        "THEN CAST(%(expressions)s AS integer) END"
+    output_field = IntegerField()
+
+
+CharField.register_lookup(LocationNumber)
+
+
+@dataclass
+class ConstraintImpact:
+    """
+    Boxes left outside the valid values of a changed constraint.
+    """
+    constraint_name: str
+    boxes: int = 0
+    box_numbers: List[str] = field(default_factory=list)
+    values: list = field(default_factory=list)
+
+
+def invalid_value(constraint: Constraints, field_name: str) -> Optional[Q]:
+    """
+    Condition matching the boxes whose field breaks a constraint.
+
+    Integer constraints on a location are checked against the location
+    converted to a number, so "04" and "4" are the same row.  Empty fields
+    are not checked.
+
+    :param constraint: the constraint, possibly not saved yet
+    :param field_name: box field checked
+    :return: the condition, or None for a character constraint on a
+        number field (which the forms cannot check either)
+    """
+    values = constraint.valid_values()
+    integer = constraint.constraint_type in (
+        Constraints.INT_RANGE, Constraints.INT_LIST)
+    given = Q(**{f'{field_name}__isnull': False})
+    if isinstance(Box._meta.get_field(field_name), IntegerField):
+        if not integer:
+            return None
+        number = field_name
+    else:
+        given &= ~Q(**{field_name: ''})
+        number = f'{field_name}__location_number'
+    if constraint.constraint_type == Constraints.INT_RANGE:
+        return given & (
+            Q(**{f'{number}__isnull': True}) |
+            Q(**{f'{number}__lt': values[0]}) |
+            Q(**{f'{number}__gt': values[1]}))
+    if constraint.constraint_type == Constraints.INT_LIST:
+        return given & (
+            Q(**{f'{number}__isnull': True}) |
+            ~Q(**{f'{number}__in': values}))
+    if constraint.constraint_type == Constraints.CHAR_RANGE:
+        return given & (
+            Q(**{f'{field_name}__lt': values[0]}) |
+            Q(**{f'{field_name}__gt': values[1]}))
+    return given & ~Q(**{f'{field_name}__in': values})
+
+
+def constraint_impact(constraint: Constraints) -> Optional[ConstraintImpact]:
+    """
+    Find the boxes a constraint would leave out, with one query.
+
+    :param constraint: the constraint, possibly not saved yet
+    :return: the boxes left out, or None if boxes are not checked against
+        the constraint
+    """
+    conditions = {
+        field_name: invalid_value(constraint, field_name)
+        for field_name in REPORTED_CONSTRAINTS.get(
+            constraint.constraint_name, ())
+    }
+    conditions = {
+        field_name: condition for field_name, condition in conditions.items()
+        if condition is not None}
+    if not conditions:
+        return None
+    invalid = reduce(or_, conditions.values())
+    aggregates = {
+        'boxes': Count('id', filter=invalid),
+        'box_numbers': ArrayAgg(
+            'box_number', filter=invalid, ordering='box_number'),
+    }
+    for field_name, condition in conditions.items():
+        aggregates[f'{field_name}_values'] = ArrayAgg(
+            field_name, filter=condition, distinct=True)
+    totals = Box.objects.aggregate(**aggregates)
+    values = set()
+    for field_name in conditions:
+        values.update(totals[f'{field_name}_values'] or [])
+    return ConstraintImpact(
+        constraint_name=constraint.constraint_name,
+        boxes=totals['boxes'],
+        box_numbers=totals['box_numbers'] or [],
+        values=sorted(values),
+    )
+
+
+def changed_constraints(forms: Iterable) -> List[Constraints]:
+    """
+    Constraints whose form was changed, with the new values set.
+
+    :param forms: valid bulk edit forms, one per constraint
+    :return: the changed constraints (not saved)
+    """
+    return [form.instance for form in forms if form.has_changed()]
+
+
+def check_constraints(
+        constraints: Iterable[Constraints]) -> List[ConstraintImpact]:
+    """
+    Report the boxes left out by each changed constraint.
+
+    :param constraints: changed constraints (not saved)
+    :return: the constraints that leave boxes out
+    """
+    impacts = list()
+    for constraint in constraints:
+        impact = constraint_impact(constraint)
+        if impact is not None and impact.boxes:
+            impacts.append(impact)
+    return impacts
+
+
+def apply_constraints(
+        constraints: List[Constraints],
+        accept_stranded: bool = False
+) -> Tuple[int, List[ConstraintImpact]]:
+    """
+    Save changed constraints together, unless they leave boxes out.
+
+    :param constraints: changed constraints (not saved)
+    :param accept_stranded: save even if boxes are left out
+    :return: number of constraints saved (0 if none were) and the boxes
+        left out
+    """
+    if not constraints:
+        return 0, []
+    with transaction.atomic():
+        # checked again, as boxes may have changed since the report
+        impacts = check_constraints(constraints)
+        if impacts and not accept_stranded:
+            return 0, impacts
+        Constraints.objects.bulk_update(constraints, BULK_EDIT_FIELDS)
+        transaction.on_commit(refresh_locations)
+    return len(constraints), impacts
+
+
+def refresh_locations():
+    """
+    Rebuild what was computed from the constraints.
+
+    :return:
+    """
+    invalidate_constraint_validators()
+    sync_checks_on_commit()
+    invalidate_occupancy()
+    slot_suggester.invalidate()
+    return
+
+
+# EOF
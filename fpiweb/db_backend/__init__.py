@@ -0,0 +1,11 @@
+"""
+db_backend - PostgreSQL backend checking persistent connections lazily.
+
+See fpiweb/db_connections.py.
+"""
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+# EOF
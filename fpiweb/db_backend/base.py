@@ -0,0 +1,66 @@
+"""
+base.py - PostgreSQL database wrapper with connection health checks.
+
+A reused connection is tested once per request, just before the request
+first uses it, and quietly replaced if it no longer works (as
+CONN_HEALTH_CHECKS does in Django 4.1 and later).  Requests that never use
+the database, such as static files, cost no round trip.
+"""
+
+from logging import getLogger
+
+from django.db.backends.postgresql import base
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+logger = getLogger('fpiweb')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL connection tested before its first use in each request.
+    """
+
+    # reset at the start of each request (see db_connections.py)
+    health_check_done: bool = False
+
+    def connect(self):
+        # a new connection needs no test
+        self.health_check_done = True
+        super().connect()
+
+    def close_if_health_check_failed(self):
+        """
+        Close the connection if it no longer responds.
+
+        Django opens a fresh connection the next time one is needed.
+
+        :return:
+        """
+        if self.connection is None or self.health_check_done or \
+                not self.settings_dict.get('CONN_HEALTH_CHECKS'):
+            return
+        self.health_check_done = True
+        if not self.is_usable():
+            logger.warning(
+                f'Database connection {self.alias} is unusable, '
+                f'reconnecting')
+            self.close()
+
+    def _cursor(self, name=None):
+        if not self.in_atomic_block:
+            self.close_if_health_check_failed()
+        return super()._cursor(name)
+
+    def set_autocommit(self, autocommit,
+                       force_begin_transaction_with_broken_autocommit=False):
+        # starting a transaction may be the first use of the connection
+        if not autocommit and not self.in_atomic_block:
+            self.close_if_health_check_failed()
+        super().set_autocommit(
+            autocommit, force_begin_transaction_with_broken_autocommit)
+
+
+# EOF
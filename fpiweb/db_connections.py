@@ -0,0 +1,34 @@
+"""
+db_connections.py - Health checks for persistent database connections.
+
+With CONN_MAX_AGE set, Django keeps a database connection open between
+requests.  If the database server restarts, or a firewall drops the idle
+connection, the next request to reuse it would fail.  When a database has
+CONN_HEALTH_CHECKS set, the reused connection is tested once per request,
+before the request first uses it, and quietly replaced if it no longer
+works (see fpiweb/db_backend/base.py).  Requests that never use the
+database are not slowed down.
+
+(Django 4.1 and later provide the same behavior for CONN_HEALTH_CHECKS
+themselves.)
+"""
+
+from django.core.signals import request_started
+from django.db import connections
+from django.dispatch import receiver
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+
+@receiver(request_started)
+def check_persistent_connections(sender, **kwargs):
+    """
+    Have every reused connection tested before its first use.
+    """
+    for conn in connections.all():
+        conn.health_check_done = False
+
+
+# EOF
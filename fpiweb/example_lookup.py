@@ -0,0 +1,228 @@
+"""
+example_lookup.py - Which product does this item belong to?
+
+Volunteers type the name of an item (e.g. a brand of soup) at the scan
+station and need the product (and so the box label) it goes under.  The
+product examples are few enough to keep in memory, so they are held in a
+prefix trie of the words in their names.  A lookup walks one trie node per
+letter typed and never touches the database, so it answers in well under a
+millisecond.
+
+The trie is built on the first lookup and marked stale whenever a product
+or product example changes in this process.  Other processes pick up the
+change when their copy is older than REFRESH_SECONDS.
+"""
+
+from dataclasses import dataclass, field
+from itertools import chain
+from re import compile as re_compile
+from threading import Lock
+from time import monotonic
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from fpiweb.models import Product, ProductExample
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+# most examples returned by one lookup
+LOOKUP_LIMIT = 20
+
+# seconds after which the trie is rebuilt even if no change was seen here
+REFRESH_SECONDS = 5 * 60
+
+# characters dropped before a name is split into words (Campbell's)
+DROPPED_REGEX = re_compile(r"['`’]")
+
+# anything else that is not a letter or digit separates words
+SEPARATOR_REGEX = re_compile(r'[\W_]+')
+
+
+def name_words(name: str) -> List[str]:
+    """
+    Split a name into lower case words.
+
+    :param name: e.g. "Campbell's Chicken & Stars"
+    :return: e.g. ['campbells', 'chicken', 'stars']
+    """
+    name = DROPPED_REGEX.sub('', name.casefold())
+    return [word for word in SEPARATOR_REGEX.split(name) if word]
+
+
+@dataclass(frozen=True)
+class ExampleMatch:
+    """
+    A product example and the product it belongs to.
+    """
+    prod_example_name: str
+    prod_id: int
+    prod_name: str
+    words: Tuple[str, ...] = field(compare=False, repr=False)
+
+
+class _Node:
+    """
+    One letter of the trie.
+
+    Every node lists the examples with a word starting with the letters
+    leading to it: first those whose name starts with that word, then the
+    rest, each in alphabetical order.
+    """
+    __slots__ = ('children', 'starts', 'contains')
+
+    def __init__(self):
+        self.children: Dict[str, _Node] = dict()
+        self.starts: List[ExampleMatch] = list()
+        self.contains: List[ExampleMatch] = list()
+
+
+class ExampleTrie:
+    """
+    Prefix trie of the words in the product example names.
+    """
+
+    def __init__(self, examples: List[ExampleMatch]):
+        self.root = _Node()
+        for example in sorted(examples, key=lambda e: e.prod_example_name):
+            for position, word in enumerate(dict.fromkeys(example.words)):
+                self._add(word, example, first=position == 0)
+
+    def _add(self, word: str, example: ExampleMatch, first: bool):
+        node = self.root
+        for letter in word:
+            node = node.children.setdefault(letter, _Node())
+            # another word of this example may share the prefix
+            if node.starts and node.starts[-1] is example or \
+                    node.contains and node.contains[-1] is example:
+                continue
+            if first:
+                node.starts.append(example)
+            else:
+                node.contains.append(example)
+        return
+
+    def _find(self, prefix: str) -> Optional[_Node]:
+        node = self.root
+        for letter in prefix:
+            node = node.children.get(letter)
+            if node is None:
+                return None
+        return node
+
+    def lookup(self, text: str,
+               limit: int = LOOKUP_LIMIT) -> List[ExampleMatch]:
+        """
+        Examples having a word starting with each word of the text.
+
+        :param text: e.g. "campb tom"
+        :param limit: most examples to return
+        :return: the examples, those starting with the text first
+        """
+        words = name_words(text)
+        if not words:
+            return []
+
+        node = self._find(words[0])
+        if node is None:
+            return []
+
+        candidates: Iterator[ExampleMatch] = chain(node.starts, node.contains)
+        others = words[1:]
+        found = list()
+        for example in candidates:
+            if all(
+                    any(word.startswith(other) for word in example.words)
+                    for other in others):
+                found.append(example)
+                if len(found) >= limit:
+                    break
+        return found
+
+
+class ExampleLookup:
+    """
+    Process wide holder of the trie, rebuilt when it goes stale.
+    """
+
+    def __init__(self):
+        self._trie: Optional[ExampleTrie] = None
+        self._built_at: float = 0.0
+        self._lock = Lock()
+
+    def invalidate(self):
+        """
+        Rebuild the trie before the next lookup.
+
+        :return:
+        """
+        self._trie = None
+        return
+
+    def trie(self) -> ExampleTrie:
+        """
+        The current trie, built from the database if need be.
+
+        :return: the trie
+        """
+        trie = self._trie
+        if trie is None or monotonic() - self._built_at > REFRESH_SECONDS:
+            with self._lock:
+                trie = self._trie
+                if trie is None or \
+                        monotonic() - self._built_at > REFRESH_SECONDS:
+                    trie = self._build()
+                    self._trie = trie
+                    self._built_at = monotonic()
+        return trie
+
+    @staticmethod
+    def _build() -> ExampleTrie:
+        rows = ProductExample.objects \
+            .order_by() \
+            .values_list('prod_example_name', 'prod_id', 'prod_id__prod_name')
+        return ExampleTrie([
+            ExampleMatch(
+                prod_example_name=name,
+                prod_id=prod_id,
+                prod_name=prod_name,
+                words=tuple(name_words(name)),
+            )
+            for name, prod_id, prod_name in rows
+        ])
+
+    def lookup(self, text: str,
+               limit: int = LOOKUP_LIMIT) -> List[ExampleMatch]:
+        """
+        Find the product examples matching the text typed so far.
+
+        :param text: part of the name of an item
+        :param limit: most examples to return
+        :return: the matching examples with their products
+        """
+        return self.trie().lookup(text, limit)
+
+
+example_lookup = ExampleLookup()
+
+
+@receiver(post_save, sender=ProductExample)
+@receiver(post_delete, sender=ProductExample)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_example_lookup(sender, **kwargs):
+    """
+    Rebuild the trie once a changed product or product example is
+    committed.
+
+    A trie rebuilt before the commit would be built from the old rows and
+    kept until the next refresh.
+    """
+    transaction.on_commit(example_lookup.invalidate)
+
+
+# EOF
@@ -0,0 +1,237 @@
+"""
+forecast.py - How many boxes of each product will be needed next month?
+
+The boxes of every product consumed each week are read from the running
+weekly totals (ActivityWeek, see activity_stats.py) with one query and laid
+out as a products x weeks matrix.  A simple seasonal model is then fitted
+to all the products at once with NumPy:
+
+    seasonal factor     boxes per week in each month of the year over the
+                        product's average, pulled toward 1 (no season) by
+                        SEASONAL_PRIOR_WEEKS of average weeks so that a
+                        short history does not give wild factors
+    level               average of the last RECENT_WEEKS weeks with the
+                        seasonal factor of each week divided out
+    forecast            level x factor of next month x weeks in next month
+
+Weeks before the first box of a product was used are left out, so a new
+product is not dragged down by the years it did not exist.
+
+The forecast is cached until an activity is added, changed or deleted.
+"""
+
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from fpiweb.activity_stats import week_start
+from fpiweb.models import Activity, ActivityWeek
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+# weeks of history the model is fitted to
+HISTORY_WEEKS = 3 * 52
+
+# weeks averaged for the current level of demand
+RECENT_WEEKS = 8
+
+# average weeks mixed into every month when computing seasonal factors
+SEASONAL_PRIOR_WEEKS = 8
+
+# seconds a forecast is kept (it is dropped early when activity arrives)
+FORECAST_TIMEOUT = 24 * 60 * 60
+
+# cache key of the forecast made on a given day
+FORECAST_KEY = 'demand_forecast:{day}'
+
+
+@dataclass
+class ProductForecast:
+    """
+    Boxes of one product expected to be needed next month.
+    """
+    prod_name: str
+    prod_cat_name: str
+    recent_per_week: float
+    seasonal_factor: float
+    boxes: float
+
+    @property
+    def boxes_needed(self) -> int:
+        """ Whole boxes (cases) to have on hand. """
+        return int(np.ceil(self.boxes - 1e-9))
+
+
+@dataclass
+class DemandForecast:
+    """
+    Forecast of every product for one month.
+    """
+    month: date
+    history_weeks: int
+    products: List[ProductForecast]
+
+
+def next_month(day: date) -> date:
+    """
+    First day of the month after a day.
+    """
+    if day.month == 12:
+        return date(day.year + 1, 1, 1)
+    return date(day.year, day.month + 1, 1)
+
+
+def fit_forecast(boxes: np.ndarray, week_months: np.ndarray,
+                 month: int, weeks_in_month: float) -> tuple:
+    """
+    Fit the seasonal model to every product and forecast one month.
+
+    :param boxes: products x weeks matrix of boxes used, oldest week first
+    :param week_months: month (0 - 11) of each week
+    :param month: month (0 - 11) to forecast
+    :param weeks_in_month: number of weeks in that month
+    :return: (forecast, level, seasonal factor), one value per product
+    """
+    product_count, week_count = boxes.shape
+    if not product_count or not week_count:
+        empty = np.zeros(product_count)
+        return empty, empty, np.ones(product_count)
+
+    # leave out the weeks before each product was first used
+    first_week = np.argmax(boxes > 0, axis=1)
+    active = np.arange(week_count) >= first_week[:, np.newaxis]
+    active_boxes = np.where(active, boxes, 0.0)
+
+    # one column per month of the year
+    months = np.zeros((week_count, 12))
+    months[np.arange(week_count), week_months] = 1.0
+
+    active_weeks = active.sum(axis=1)
+    average = active_boxes.sum(axis=1) / np.maximum(active_weeks, 1)
+    month_boxes = active_boxes @ months
+    month_weeks = active.astype(float) @ months
+
+    prior = SEASONAL_PRIOR_WEEKS * average[:, np.newaxis]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factors = (month_boxes + prior) / (
+            (month_weeks + SEASONAL_PRIOR_WEEKS) * average[:, np.newaxis])
+    factors = np.where(average[:, np.newaxis] > 0, factors, 1.0)
+
+    recent = slice(max(week_count - RECENT_WEEKS, 0), week_count)
+    recent_factors = factors[:, week_months[recent]]
+    recent_active = active[:, recent]
+    deseasonalized = np.where(
+        recent_active, active_boxes[:, recent] / recent_factors, 0.0)
+    level = deseasonalized.sum(axis=1) / np.maximum(
+        recent_active.sum(axis=1), 1)
+
+    forecast = level * factors[:, month] * weeks_in_month
+    return forecast, level, factors[:, month]
+
+
+def build_forecast(today: Optional[date] = None) -> DemandForecast:
+    """
+    Forecast the boxes of every product needed next month (one query).
+
+    :param today: day of the forecast (today by default)
+    :return: the forecast, products most needed first
+    """
+    today = today or timezone.localdate()
+    month = next_month(today)
+
+    # whole weeks only, the current one is still filling up
+    end = week_start(today)
+    start = end - timedelta(weeks=HISTORY_WEEKS)
+    rows = list(
+        ActivityWeek.objects
+        .filter(week_start__gte=start, week_start__lt=end, boxes__gt=0)
+        .order_by()
+        .values_list('prod_cat_name', 'prod_name', 'week_start', 'boxes')
+    )
+    if not rows:
+        return DemandForecast(month=month, history_weeks=0, products=[])
+
+    first = min(row[2] for row in rows)
+    week_count = (end - first).days // 7
+    products = sorted({(row[0], row[1]) for row in rows})
+    product_index = {product: index for index, product in enumerate(products)}
+
+    boxes = np.zeros((len(products), week_count))
+    product_rows = np.array(
+        [product_index[(row[0], row[1])] for row in rows])
+    week_columns = np.array([(row[2] - first).days // 7 for row in rows])
+    np.add.at(boxes, (product_rows, week_columns),
+              np.array([row[3] for row in rows], dtype=float))
+
+    week_months = np.array([
+        (first + timedelta(weeks=week)).month - 1
+        for week in range(week_count)
+    ])
+    weeks_in_month = monthrange(month.year, month.month)[1] / 7
+    forecast, level, factor = fit_forecast(
+        boxes, week_months, month.month - 1, weeks_in_month)
+
+    result = [
+        ProductForecast(
+            prod_name=prod_name,
+            prod_cat_name=prod_cat_name,
+            recent_per_week=round(float(level[index]), 2),
+            seasonal_factor=round(float(factor[index]), 2),
+            boxes=round(float(forecast[index]), 1),
+        )
+        for index, (prod_cat_name, prod_name) in enumerate(products)
+    ]
+    result.sort(key=lambda product: (-product.boxes, product.prod_name))
+    return DemandForecast(
+        month=month, history_weeks=week_count, products=result)
+
+
+def demand_forecast(today: Optional[date] = None) -> DemandForecast:
+    """
+    The forecast made today, from the cache if no activity arrived since.
+
+    :param today: day of the forecast (today by default)
+    :return: the forecast
+    """
+    today = today or timezone.localdate()
+    key = FORECAST_KEY.format(day=today)
+    forecast = cache.get(key)
+    if forecast is None:
+        forecast = build_forecast(today)
+        cache.set(key, forecast, FORECAST_TIMEOUT)
+    return forecast
+
+
+def invalidate_forecast():
+    """
+    Drop the cached forecast.
+
+    Called when an activity changes.  Code changing the activity totals
+    without signals (e.g. rebuild_activity_stats) must call it too.
+
+    :return:
+    """
+    cache.delete(FORECAST_KEY.format(day=timezone.localdate()))
+    return
+
+
+@receiver(post_save, sender=Activity)
+@receiver(post_delete, sender=Activity)
+def invalidate_forecast_on_activity(sender, **kwargs):
+    """
+    Drop the cached forecast once a changed activity is committed.
+    """
+    transaction.on_commit(invalidate_forecast)
+
+
+# EOF
@@ -3,13 +3,22 @@ forms.py - provide validation of a forms.
 """
 
 from logging import getLogger, debug, error
+from typing import Iterable, Optional
 
 from django import forms
 from django.forms import CharField, DateInput, Form, PasswordInput, ValidationError
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.functional import cached_property
 
-from fpiweb.models import Box, BoxType, Constraints, Product, ProductCategory
+from fpiweb.constraint_validators import BIN, EXP_MONTH, EXP_YEAR, QUANTITY, \
+    ROW, TIER, constraint_validators
+from fpiweb.constraints_edit import BULK_EDIT_FIELDS, LOCATION_CONSTRAINTS
+from fpiweb.labels import MAX_BOX_NUMBER, MAX_LABELS
+from fpiweb.models import Box, BoxNumber, BoxType, Constraints, Product, \
+    ProductCategory
+from StandaloneTools.LabelLayout import DEFAULT_LAYOUT, load_layouts
 
 
 __author__ = '(Multiple)'
@@ -18,40 +27,57 @@ __creation_date__ = "04/01/2019"
 # "${CopyRight.py}"
 
 
-month_choices = [(None, '--')] + [(str(i), str(i)) for i in range(1, 13)]
-
 logger = getLogger('fpiweb')
 
 
+def month_choices():
+    choices = constraint_validators().choices(EXP_MONTH) or \
+        [(str(i), str(i)) for i in range(1, 13)]
+    return [(None, '--')] + choices
+
+
 def expire_year_choices():
+    choices = constraint_validators().choices(EXP_YEAR)
+    if choices:
+        return choices
     current_year = timezone.now().year
     years_ahead = 5
-    for i in range(years_ahead + 1):
-        value = str(current_year + i)
-        yield value, value
-
-
-def min_max_choices(constraint_name):
-    min_value, max_value = Constraints.get_values(constraint_name)
-    select_range = [str(i) for i in range(min_value, max_value + 1)]
-    return list(zip(select_range, select_range))
-
-
-def char_list_choices(constraint_name):
-    values = Constraints.get_values(constraint_name)
-    return list(zip(values, values))
+    return [
+        (str(current_year + i), str(current_year + i))
+        for i in range(years_ahead + 1)
+    ]
 
 
 def row_choices():
-    return min_max_choices('Row')
+    return constraint_validators().choices(ROW)
 
 
 def bin_choices():
-    return min_max_choices('Bin')
+    return constraint_validators().choices(BIN)
 
 
 def tier_choices():
-    return char_list_choices('Tier')
+    return constraint_validators().choices(TIER)
+
+
+def add_constraint_errors(form, cleaned_data: dict,
+                          fields: Optional[Iterable[str]] = None):
+    """
+    Check the box fields of a form against the Constraints table.
+
+    :param form: the form, given an error for each field out of bounds
+    :param cleaned_data: the values of the form
+    :param fields: fields to check (all of them if not given)
+    :return:
+    """
+    if fields is not None:
+        cleaned_data = {
+            field_name: value for field_name, value in cleaned_data.items()
+            if field_name in fields}
+    errors = constraint_validators().box_errors(cleaned_data)
+    for field_name, message in errors.items():
+        form.add_error(field_name, message)
+    return
 
 
 def none_or_int(text):
@@ -64,6 +90,35 @@ class Html5DateInput(DateInput):
     input_type = 'date'
 
 
+class ProductAutocompleteWidget(forms.Widget):
+    """
+    Product picker that searches as the user types.
+
+    Unlike a select, it does not list every product, only the name of the
+    product chosen so far.  Matching products come from the product search
+    of the API, so pages using it must include {{ form.media }}.
+
+    Used by FillBoxForm, which no page renders yet (only the API fills
+    boxes); a box fill page should show it with {{ form.media }}.
+    """
+    template_name = 'fpiweb/widgets/product_autocomplete.html'
+
+    class Media:
+        js = ('fpiweb/product_autocomplete.js',)
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        prod_name = None
+        if str(value or '').isdigit():
+            prod_name = Product.objects \
+                .filter(pk=value) \
+                .values_list('prod_name', flat=True) \
+                .first()
+        context['widget']['prod_name'] = prod_name
+        context['widget']['search_url'] = reverse('fpiweb:api_products')
+        return context
+
+
 class LogoutForm(Form):
     username = CharField(
         label='Username',
@@ -108,6 +163,17 @@ class NewBoxForm(forms.ModelForm):
         disabled=True
     )
 
+    def clean(self):
+        cleaned_data = super().clean()
+        box_type = cleaned_data.get('box_type')
+        if box_type is not None:
+            # the box is filled with the quantity of its type
+            validator = constraint_validators().get(QUANTITY)
+            if validator is not None and \
+                    box_type.box_type_qty not in validator:
+                self.add_error('box_type', validator.message)
+        return cleaned_data
+
     def save(self, commit=True):
         if self.instance and not self.instance.pk:
             if self.instance.box_type:
@@ -127,6 +193,7 @@ class FillBoxForm(forms.ModelForm):
             'date_filled',
         ]
         widgets = {
+            'product': ProductAutocompleteWidget,
             'date_filled': Html5DateInput
         }
 
@@ -173,6 +240,179 @@ class FillBoxForm(forms.ModelForm):
         exp_month_start = cleaned_data.get('exp_month_start')
         exp_month_end = cleaned_data.get('exp_month_end')
         self.validate_exp_month_start_end(exp_month_start, exp_month_end)
+        add_constraint_errors(self, cleaned_data)
+        return cleaned_data
+
+
+class BoxBulkEditForm(forms.ModelForm):
+    """
+    Quantity and expiration of one filled box, as a row of the bulk edit.
+    """
+    class Meta:
+        model = Box
+        fields = [
+            'quantity',
+            'exp_year',
+            'exp_month_start',
+            'exp_month_end',
+        ]
+        widgets = {
+            'quantity': forms.NumberInput(attrs={'min': 0}),
+            'exp_year': forms.NumberInput,
+        }
+
+    exp_month_start = forms.TypedChoiceField(
+        choices=month_choices,
+        required=False,
+        empty_value=None,
+        coerce=none_or_int,
+        help_text=Box.exp_month_start_help_text,
+    )
+
+    exp_month_end = forms.TypedChoiceField(
+        choices=month_choices,
+        required=False,
+        empty_value=None,
+        coerce=none_or_int,
+        help_text=Box.exp_month_end_help_text,
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        exp_month_start = cleaned_data.get('exp_month_start')
+        exp_month_end = cleaned_data.get('exp_month_end')
+        FillBoxForm.validate_exp_month_start_end(
+            exp_month_start, exp_month_end)
+        # the rows left as they were may hold values allowed when the box
+        # was packed (e.g. an older Expiration Year)
+        add_constraint_errors(self, cleaned_data, self.changed_data)
+        return cleaned_data
+
+
+class LoadedInstanceField(forms.ModelChoiceField):
+    """
+    Primary key field of a model formset row, checked against the
+    instances the formset has already loaded.
+    """
+
+    def __init__(self, instances: dict, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.instances = instances
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return self.instances[int(value)]
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+            )
+
+
+class BaseLoadedModelFormSet(forms.BaseModelFormSet):
+    """
+    Model formset checking the primary key posted for each row against the
+    instances it has already loaded.
+
+    Django checks the primary key posted for every row with a query of its
+    own; here the instances loaded for the formset are used instead.
+    """
+
+    @cached_property
+    def loaded_instances(self) -> dict:
+        return {instance.pk: instance for instance in self.get_queryset()}
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        pk_field = form.fields[self.model._meta.pk.name]
+        form.fields[self.model._meta.pk.name] = LoadedInstanceField(
+            self.loaded_instances,
+            queryset=pk_field.queryset,
+            initial=pk_field.initial,
+            required=False,
+            widget=pk_field.widget,
+        )
+
+
+class BaseBoxBulkEditFormSet(BaseLoadedModelFormSet):
+    """
+    Rows of the box bulk edit.
+    """
+
+
+BoxBulkEditFormSet = forms.modelformset_factory(
+    Box,
+    form=BoxBulkEditForm,
+    formset=BaseBoxBulkEditFormSet,
+    extra=0,
+)
+
+
+class ConstraintsBulkForm(forms.ModelForm):
+    """
+    Values of one constraint, as a row of the constraints bulk edit.
+
+    The name cannot be changed here, as the rest of the application looks
+    the constraints up by name.
+    """
+
+    class Meta:
+        model = Constraints
+        fields = BULK_EDIT_FIELDS
+
+    def clean(self):
+        cleaned_data = super().clean()
+        constraint_type = cleaned_data.get('constraint_type')
+        if constraint_type is None:
+            return cleaned_data
+        name = self.instance.constraint_name
+
+        # the box forms, the occupancy map and the slot suggestions depend
+        # on the type of the location constraints
+        if name in LOCATION_CONSTRAINTS:
+            _, location_type = LOCATION_CONSTRAINTS[name]
+            if constraint_type != location_type:
+                raise ValidationError(
+                    f'{name} must stay '
+                    f'{dict(Constraints.CONSTRAINT_TYPE_CHOICES)[location_type]}'
+                )
+
+        if constraint_type in (Constraints.INT_RANGE, Constraints.CHAR_RANGE):
+            minimum = cleaned_data.get('constraint_min')
+            maximum = cleaned_data.get('constraint_max')
+            if not minimum or not maximum:
+                raise ValidationError('A range needs a minimum and a maximum')
+            if constraint_type == Constraints.INT_RANGE:
+                try:
+                    minimum, maximum = int(minimum), int(maximum)
+                except ValueError:
+                    raise ValidationError('The range must be whole numbers')
+            if minimum > maximum:
+                raise ValidationError(
+                    'The minimum must not be more than the maximum')
+        else:
+            values = [
+                value.strip()
+                for value in (cleaned_data.get('constraint_list') or '')
+                .split(',')
+                if value.strip()
+            ]
+            if not values:
+                raise ValidationError('A list needs at least one value')
+            if constraint_type == Constraints.INT_LIST and \
+                    not all(value.isdigit() for value in values):
+                raise ValidationError('The list must be whole numbers')
+        return cleaned_data
+
+
+ConstraintsBulkFormSet = forms.modelformset_factory(
+    Constraints,
+    form=ConstraintsBulkForm,
+    formset=BaseLoadedModelFormSet,
+    extra=0,
+)
 
 
 class MoveBoxForm(forms.ModelForm):
@@ -200,4 +440,118 @@ class MoveBoxForm(forms.ModelForm):
     )
 
 
+class PalletMoveForm(Form):
+    """
+    Move every box of a slot, or a list of boxes, to a new location.
+    """
+
+    from_row = forms.ChoiceField(
+        required=False,
+        help_text='Row the boxes are in now.',
+    )
+
+    from_bin = forms.ChoiceField(
+        required=False,
+        help_text='Bin the boxes are in now.',
+    )
+
+    from_tier = forms.ChoiceField(
+        required=False,
+        help_text='Tier the boxes are in now.',
+    )
+
+    box_numbers = forms.CharField(
+        widget=forms.Textarea(attrs={'rows': 4}),
+        required=False,
+        help_text='Or scan the boxes to move, one per line.',
+    )
+
+    loc_row = forms.ChoiceField(
+        help_text='Row to move the boxes to.',
+    )
+
+    loc_bin = forms.ChoiceField(
+        help_text='Bin to move the boxes to.',
+    )
+
+    loc_tier = forms.ChoiceField(
+        help_text='Tier to move the boxes to.',
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # the "from" and "to" fields share the Row, Bin and Tier
+        # constraints
+        validators = constraint_validators()
+        for name, constraint_name in (('row', ROW), ('bin', BIN),
+                                      ('tier', TIER)):
+            choices = validators.choices(constraint_name)
+            self.fields[f'from_{name}'].choices = [('', '--')] + choices
+            self.fields[f'loc_{name}'].choices = choices
+
+    def clean_box_numbers(self):
+        box_numbers = [
+            box_number.upper()
+            for box_number in
+            self.cleaned_data['box_numbers'].replace(',', ' ').split()
+        ]
+        invalid = [
+            box_number for box_number in box_numbers
+            if not BoxNumber.validate(box_number)
+        ]
+        if invalid:
+            raise ValidationError(
+                f"Invalid box numbers: {', '.join(invalid)}")
+        return list(dict.fromkeys(box_numbers))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        source = [
+            cleaned_data.get(name)
+            for name in ('from_row', 'from_bin', 'from_tier')
+        ]
+        box_numbers = cleaned_data.get('box_numbers')
+        if any(source) and not all(source):
+            raise ValidationError(
+                'Give the row, bin and tier the boxes are in now')
+        if all(source) == bool(box_numbers):
+            if 'box_numbers' not in self.errors:
+                raise ValidationError(
+                    'Give either the location the boxes are in now or the '
+                    'box numbers, but not both')
+        return cleaned_data
+
+
+def layout_choices():
+    return [
+        (name, layout.description)
+        for name, layout in load_layouts().items()
+    ]
+
+
+class LabelPrintForm(Form):
+    """
+    Print QR code labels for boxes not yet in use.
+    """
+
+    start = forms.IntegerField(
+        min_value=1,
+        max_value=MAX_BOX_NUMBER,
+        help_text='First box number to print (numbers in use are skipped).',
+    )
+
+    count = forms.IntegerField(
+        min_value=1,
+        max_value=MAX_LABELS,
+        help_text='Number of labels to print.',
+    )
+
+    layout = forms.ChoiceField(
+        choices=layout_choices,
+        initial=DEFAULT_LAYOUT,
+        help_text='Label sheets (or roll) in the printer.',
+    )
+
+
 # EOF
@@ -0,0 +1,106 @@
+"""
+fragment_cache.py - Keys and invalidation for cached template fragments.
+
+The box detail page caches its body with
+
+    {% cache box_detail_timeout box_detail box.pk box.cache_version
+        related_version %}
+
+Because the key includes the version of the box, a changed box never
+shows a stale fragment.  The fragment of the version that was just
+replaced is deleted as well so it does not sit in the cache until it
+times out.
+
+The fragment also shows the product and box type of the box.  Their
+changes are followed by related_version, a token kept in the cache and
+dropped whenever a product or box type changes, so every box detail
+fragment is rendered again after a product is renamed.  Products and box
+types change rarely.  The token is read before the box, so a fragment
+rendered from a product read just before it changed is stored under the
+token dropped by that change.
+"""
+
+from typing import Optional
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from fpiweb.models import Box, BoxType, Product
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+
+# fragment name used in the {% cache %} tag of box_detail.html
+BOX_DETAIL_FRAGMENT = 'box_detail'
+
+# seconds a box detail fragment is kept
+BOX_DETAIL_TIMEOUT = 24 * 60 * 60
+
+# cache key of the version of the products and box types shown
+RELATED_VERSION_KEY = 'box_detail:related_version'
+
+
+def related_version() -> str:
+    """
+    Version of the products and box types, for keying box fragments.
+
+    :return: the version token, added to the cache if there is none
+    """
+    version = cache.get(RELATED_VERSION_KEY)
+    if version is None:
+        version = uuid4().hex
+        if not cache.add(RELATED_VERSION_KEY, version, None):
+            # added by another process meanwhile
+            version = cache.get(RELATED_VERSION_KEY, version)
+    return version
+
+
+def box_detail_key(box_pk: int, version: int,
+                   related: Optional[str] = None) -> str:
+    """
+    Cache key of the box detail fragment of one version of a box.
+
+    :param box_pk: primary key of the box
+    :param version: Box.cache_version of the box
+    :param related: version of the products and box types (the current
+        one if not given)
+    :return: cache key
+    """
+    if related is None:
+        related = cache.get(RELATED_VERSION_KEY)
+    return make_template_fragment_key(
+        BOX_DETAIL_FRAGMENT, [box_pk, version, related])
+
+
+@receiver(post_save, sender=Box)
+@receiver(post_delete, sender=Box)
+def invalidate_box_fragments(sender, instance: Box, **kwargs):
+    """
+    Drop the cached fragments of the version of the box just replaced.
+    """
+    if instance.loaded_values is None:
+        return
+    version = Box.version_of(instance.loaded_values.get('last_changed'))
+    if version:
+        cache.delete(box_detail_key(instance.pk, version))
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=BoxType)
+@receiver(post_delete, sender=BoxType)
+def invalidate_related_fragments(sender, raw=False, **kwargs):
+    """
+    Render every box detail fragment again after a product or box type
+    changes.
+    """
+    if not raw:
+        cache.delete(RELATED_VERSION_KEY)
+
+
+# EOF
@@ -0,0 +1,273 @@
+"""
+labels.py - Print the QR code labels of new boxes from the web application.
+
+The labels are drawn by StandaloneTools/LabelPdf.py, the same code used by
+QRCodePrinter.py, and streamed to the browser a page at a time: the first
+sheet reaches the printer while the later ones are still being drawn, and
+the web worker never holds more than one page in memory.
+
+Larger runs are queued as a LabelJob instead.  "manage.py label_worker"
+picks up the waiting jobs one at a time, draws the PDF and stores it with
+the job, from where the user downloads it.  The web workers are never held
+up by a long run, and the jobs use the application's database connection
+rather than a connection of their own.
+
+As with QRCodePrinter.py, box numbers already in use are skipped.  The
+numbers printed are reserved (ReservedBoxNumber) while holding a database
+lock, so two runs started at the same time never print the same number.
+"""
+
+from datetime import timedelta
+from io import BytesIO
+from logging import getLogger
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.http import HttpRequest, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+
+from fpiweb.models import Box, BoxNumber, LabelJob, ReservedBoxNumber
+from StandaloneTools.LabelLayout import LabelLayout, get_layout
+from StandaloneTools.LabelPdf import iter_label_pdf, write_label_pdf
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+# most labels printed at once
+MAX_LABELS = 1000
+
+# highest box number that fits the BOXnnnnn format
+MAX_BOX_NUMBER = 99999
+
+# key of the PostgreSQL advisory lock held while reserving box numbers
+RESERVATION_LOCK = 0x4C41424C  # "LABL"
+
+# a running job not finished after this long is taken to have been
+# abandoned by its worker and is queued again
+LABEL_JOB_TIMEOUT = timedelta(minutes=30)
+
+logger = getLogger('fpiweb')
+
+
+def free_box_numbers(start: int, count: int) -> Iterator[int]:
+    """
+    Box numbers not yet in use, from a starting number on.
+
+    The numbers in use (or reserved for a label) are read in order with
+    one query and skipped.
+
+    :param start: first box number to consider
+    :param count: number of free box numbers wanted
+    :return: the free box numbers (fewer if the numbers run out)
+    """
+    first = BoxNumber.format_box_number(start)
+    boxes = Box.objects \
+        .filter(box_number__gte=first) \
+        .values_list('box_number', flat=True)
+    reserved = ReservedBoxNumber.objects \
+        .filter(box_number__gte=first) \
+        .values_list('box_number', flat=True)
+    used = (
+        int(box_number[3:])
+        for box_number in boxes.union(reserved).order_by('box_number')
+        .iterator()
+        if BoxNumber.validate(box_number)
+    )
+    next_used = next(used, None)
+    number = start
+    while count > 0 and number <= MAX_BOX_NUMBER:
+        while next_used is not None and next_used < number:
+            next_used = next(used, None)
+        if number != next_used:
+            count -= 1
+            yield number
+        number += 1
+    return
+
+
+def reserve_box_numbers(start: int, count: int,
+                        label_job: Optional[LabelJob] = None) -> List[int]:
+    """
+    Set aside the next free box numbers for labels.
+
+    :param start: first box number to consider
+    :param count: number of box numbers wanted
+    :param label_job: job printing the labels, if any
+    :return: the box numbers reserved (fewer if the numbers run out)
+    """
+    with transaction.atomic():
+        # one reservation at a time, released at the end of the transaction
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_advisory_xact_lock(%s)', [RESERVATION_LOCK])
+        numbers = list(free_box_numbers(start, count))
+        now = timezone.now()
+        ReservedBoxNumber.objects.bulk_create([
+            ReservedBoxNumber(
+                box_number=BoxNumber.format_box_number(number),
+                label_job=label_job,
+                reserved=now,
+            )
+            for number in numbers
+        ])
+    return numbers
+
+
+def box_url_prefix(request: HttpRequest) -> str:
+    """
+    URL of a scanned box, less the box number.
+
+    :param request: request being answered
+    :return: e.g. "http://localhost:8765/fpiweb/box/box"
+    """
+    url = request.build_absolute_uri(
+        reverse('fpiweb:box_scanned', args=(0,)))
+    return url[:-len('0/')]
+
+
+def box_labels(url_prefix: str,
+               numbers: Iterable[int]) -> Iterator[Tuple[str, str]]:
+    """
+    URL and title of the label of each box number.
+
+    :param url_prefix: see box_url_prefix
+    :param numbers: box numbers
+    :return: (URL, title) of each label
+    """
+    for number in numbers:
+        yield f'{url_prefix}{number:05}', BoxNumber.format_box_number(number)
+    return
+
+
+def label_pdf_response(labels: Iterable[Tuple[str, str]],
+                       layout: Optional[LabelLayout] = None,
+                       filename: str = 'labels.pdf') -> StreamingHttpResponse:
+    """
+    PDF of labels, sent a page at a time.
+
+    :param labels: (URL, title) of each label
+    :param layout: label stock (the default layout if not given)
+    :param filename: name the browser saves the PDF as
+    :return: the response
+    """
+    response = StreamingHttpResponse(
+        iter_label_pdf(labels, layout), content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def queue_label_job(start: int, count: int, layout: str, url_prefix: str,
+                    requested_by=None) -> LabelJob:
+    """
+    Reserve box numbers and queue a job printing their labels.
+
+    :param start: first box number to consider
+    :param count: number of labels
+    :param layout: name of the label layout
+    :param url_prefix: see box_url_prefix
+    :param requested_by: user asking for the labels
+    :return: the job, waiting for a worker
+    """
+    with transaction.atomic():
+        label_job = LabelJob.objects.create(
+            layout=layout,
+            url_prefix=url_prefix,
+            label_count=count,
+            requested_by=requested_by,
+        )
+        numbers = reserve_box_numbers(start, count, label_job)
+        label_job.label_count = len(numbers)
+        if numbers:
+            label_job.first_box_number = \
+                BoxNumber.format_box_number(numbers[0])
+            label_job.last_box_number = \
+                BoxNumber.format_box_number(numbers[-1])
+        label_job.save(update_fields=[
+            'label_count', 'first_box_number', 'last_box_number'])
+    return label_job
+
+
+def claim_label_job() -> Optional[LabelJob]:
+    """
+    Take the oldest waiting job, if any.
+
+    Jobs locked by another worker are skipped, so any number of workers
+    can run at once.
+
+    :return: the job, now running
+    """
+    with transaction.atomic():
+        label_job = LabelJob.objects \
+            .select_for_update(skip_locked=True) \
+            .filter(status=LabelJob.PENDING) \
+            .order_by('created') \
+            .defer('pdf') \
+            .first()
+        if label_job is None:
+            return None
+        label_job.status = LabelJob.RUNNING
+        label_job.started = timezone.now()
+        label_job.save(update_fields=['status', 'started'])
+    return label_job
+
+
+def run_label_job(label_job: LabelJob):
+    """
+    Draw the labels of a job and store the PDF with it.
+
+    :param label_job: job claimed with claim_label_job
+    :return:
+    """
+    try:
+        box_numbers = ReservedBoxNumber.objects \
+            .filter(label_job=label_job) \
+            .order_by('box_number') \
+            .values_list('box_number', flat=True)
+        labels = box_labels(
+            label_job.url_prefix,
+            (int(box_number[3:]) for box_number in box_numbers),
+        )
+        pdf = BytesIO()
+        write_label_pdf(pdf, labels, get_layout(label_job.layout))
+    except Exception as exc:
+        logger.exception(f'Label job {label_job.pk} failed')
+        label_job.status = LabelJob.FAILED
+        label_job.error = str(exc)
+    else:
+        label_job.status = LabelJob.DONE
+        label_job.pdf = pdf.getvalue()
+    label_job.finished = timezone.now()
+    label_job.save(update_fields=['status', 'error', 'pdf', 'finished'])
+    return
+
+
+def requeue_abandoned_label_jobs() -> int:
+    """
+    Queue again the jobs whose worker stopped before finishing them.
+
+    :return: number of jobs queued again
+    """
+    return LabelJob.objects \
+        .filter(status=LabelJob.RUNNING,
+                started__lt=timezone.now() - LABEL_JOB_TIMEOUT) \
+        .update(status=LabelJob.PENDING, started=None)
+
+
+def process_label_jobs() -> int:
+    """
+    Run the waiting jobs until there are none left.
+
+    :return: number of jobs run
+    """
+    done = 0
+    while True:
+        label_job = claim_label_job()
+        if label_job is None:
+            return done
+        run_label_job(label_job)
+        done += 1
+
+
+# EOF
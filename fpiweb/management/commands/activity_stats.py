@@ -0,0 +1,29 @@
+"""
+activity_stats.py - Rebuild the activity statistics from the history.
+
+The running totals behind the turnover report (see
+fpiweb/activity_stats.py) are kept up to date as activities are saved.
+Activities loaded without signals (fixtures, bulk imports) are not
+counted; this command recomputes the totals from the whole history.
+
+Usage:
+    python manage.py activity_stats
+"""
+
+from django.core.management.base import BaseCommand
+
+from fpiweb.activity_stats import rebuild_activity_stats
+from fpiweb.forecast import invalidate_forecast
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the activity statistics from the activity history'
+
+    def handle(self, *args, **options):
+        counted = rebuild_activity_stats()
+        invalidate_forecast()
+        self.stdout.write(f'Counted {counted} activities')
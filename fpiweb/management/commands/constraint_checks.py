@@ -0,0 +1,56 @@
+"""
+constraint_checks.py - Add CHECK constraints mirroring the Constraints table.
+
+Adds (or brings in line) PostgreSQL CHECK constraints on the boxes and
+activities for the Quantity Limit and Expiration Month constraints and the
+order of the expiration months, see fpiweb/constraint_checks.py.  Existing
+rows breaking a check are counted and reported; the check then stays NOT
+VALID (enforced on new and changed rows only) until they are corrected and
+the command is run again.
+
+Usage:
+    python manage.py constraint_checks [--no-validate] [--drop]
+"""
+
+from django.core.management.base import BaseCommand
+
+from fpiweb.constraint_checks import check_definitions, drop_checks, \
+    existing_checks, sync_checks
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+
+class Command(BaseCommand):
+    help = 'Add CHECK constraints on the boxes and activities from the ' \
+           'Constraints table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--no-validate', action='store_true',
+            help='Do not read the existing rows (the checks stay NOT VALID)')
+        parser.add_argument(
+            '--drop', action='store_true',
+            help='Remove the CHECK constraints instead')
+
+    def handle(self, *args, **options):
+        if options['drop']:
+            removed = drop_checks()
+            self.stdout.write(f'Removed {removed} CHECK constraints')
+            return
+
+        broken = sync_checks(validate=not options['no_validate'])
+        existing = existing_checks()
+        for definition in check_definitions():
+            _, valid = existing[definition.name]
+            if definition.name in broken:
+                state = f'NOT VALID, {broken[definition.name]} rows break it'
+            else:
+                state = 'valid' if valid else 'NOT VALID'
+            self.stdout.write(
+                f'{definition.table}: {definition.condition} ({state})')
+        if broken:
+            self.stdout.write(self.style.WARNING(
+                'Correct the rows breaking a check and run the command '
+                'again to validate it'))
@@ -0,0 +1,50 @@
+"""
+demand_forecast.py - Print the boxes of each product needed next month.
+
+See fpiweb/forecast.py for the model.
+
+Usage:
+    python manage.py demand_forecast [--top 20] [--refresh]
+"""
+
+from django.core.management.base import BaseCommand
+
+from fpiweb.forecast import build_forecast, demand_forecast
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+
+class Command(BaseCommand):
+    help = 'Forecast the boxes of each product needed next month'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=0,
+            help='Only show the products most needed (0 for all)')
+        parser.add_argument(
+            '--refresh', action='store_true',
+            help='Fit the model again rather than use the cached forecast')
+
+    def handle(self, *args, **options):
+        if options['refresh']:
+            forecast = build_forecast()
+        else:
+            forecast = demand_forecast()
+
+        self.stdout.write(
+            f'Forecast for {forecast.month:%B %Y} from '
+            f'{forecast.history_weeks} weeks of history')
+        products = forecast.products
+        if options['top']:
+            products = products[:options['top']]
+        self.stdout.write(
+            f'{"Product":30} {"Category":30} {"Per Week":>8} '
+            f'{"Season":>6} {"Boxes":>6}')
+        for product in products:
+            self.stdout.write(
+                f'{product.prod_name:30} {product.prod_cat_name:30} '
+                f'{product.recent_per_week:8.2f} '
+                f'{product.seasonal_factor:6.2f} '
+                f'{product.boxes_needed:6d}')
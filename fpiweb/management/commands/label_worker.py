@@ -0,0 +1,50 @@
+"""
+label_worker.py - Print the label jobs queued from the web application.
+
+See fpiweb/labels.py.  Run one (or more) of these next to the web server;
+each polls for waiting jobs, draws their PDF and stores it with the job.
+
+Usage:
+    python manage.py label_worker [--once] [--sleep 5]
+"""
+
+from time import sleep
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from fpiweb.labels import process_label_jobs, requeue_abandoned_label_jobs
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+
+class Command(BaseCommand):
+    help = 'Print the label jobs queued from the web application'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Print the waiting jobs and stop rather than keep polling')
+        parser.add_argument(
+            '--sleep', type=float, default=5.0,
+            help='Seconds to wait between polls for new jobs')
+
+    def handle(self, *args, **options):
+        requeued = requeue_abandoned_label_jobs()
+        if requeued:
+            self.stdout.write(f'Queued {requeued} abandoned jobs again')
+
+        try:
+            while True:
+                close_old_connections()
+                done = process_label_jobs()
+                if done:
+                    self.stdout.write(f'Printed {done} label jobs')
+                if options['once']:
+                    break
+                sleep(options['sleep'])
+        except KeyboardInterrupt:
+            # a job being printed is queued again once it times out
+            self.stdout.write('Stopped')
@@ -0,0 +1,63 @@
+"""
+prune_sessions.py - Remove the expired sessions from the database.
+
+Scanner phones start many short sessions.  Unlike "manage.py
+clearsessions", which removes every expired session with one DELETE, the
+sessions are removed in batches, each in a short transaction of its own, so
+the logins going on at the same time are never held up for long.  Schedule
+it (e.g. nightly from cron) next to the web server.
+
+Usage:
+    python manage.py prune_sessions [--batch-size 1000] [--sleep 0]
+"""
+
+from importlib import import_module
+from time import sleep
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+
+class Command(BaseCommand):
+    help = 'Remove the expired sessions from the database, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Sessions removed by each DELETE')
+        parser.add_argument(
+            '--sleep', type=float, default=0.0,
+            help='Seconds to wait between batches')
+
+    def handle(self, *args, **options):
+        engine = import_module(settings.SESSION_ENGINE)
+        get_model_class = getattr(engine.SessionStore, 'get_model_class', None)
+        if get_model_class is None:
+            # cache and signed cookie sessions expire by themselves
+            self.stdout.write(
+                f'Sessions are not kept in the database '
+                f'({settings.SESSION_ENGINE}), nothing to remove')
+            return
+        session_model = get_model_class()
+
+        now = timezone.now()
+        removed = 0
+        while True:
+            keys = list(
+                session_model.objects
+                .filter(expire_date__lt=now)
+                .values_list('session_key', flat=True)[:options['batch_size']]
+            )
+            if not keys:
+                break
+            removed += session_model.objects \
+                .filter(session_key__in=keys) \
+                .delete()[0]
+            if options['sleep']:
+                sleep(options['sleep'])
+        self.stdout.write(f'Removed {removed} expired sessions')
@@ -0,0 +1,132 @@
+"""
+seed_boxes.py - Fill the database with boxes for load testing.
+
+Loads the standard fixtures (constraints, box types, product categories
+and products) and then creates boxes BOX<start> through
+BOX<start + count - 1>.  About half of the boxes (see --filled) are filled
+with a random product and placed in a random valid location.  Boxes that
+already exist are left alone, so the command can be run repeatedly.
+
+Usage:
+    python manage.py seed_boxes --count 1000 --user bench --password ...
+"""
+
+from random import Random
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from fpiweb.models import Box, BoxNumber, BoxType, Constraints, Product
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+FIXTURES = ('Constraints', 'BoxType', 'ProductCategory', 'Product')
+
+
+class Command(BaseCommand):
+    help = 'Load the fixtures and create boxes (and a user) for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count', type=int, default=1000,
+            help='Number of boxes to create')
+        parser.add_argument(
+            '--start', type=int, default=1,
+            help='First box number to create')
+        parser.add_argument(
+            '--filled', type=float, default=0.5,
+            help='Fraction of the boxes to fill with product')
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Random seed, so runs can be repeated exactly')
+        parser.add_argument(
+            '--user',
+            help='Create this user (if missing) for the load test clients')
+        parser.add_argument(
+            '--password',
+            help='Password for --user')
+
+    def handle(self, *args, **options):
+        call_command('loaddata', *FIXTURES, verbosity=0)
+
+        if options['user']:
+            self.create_user(options['user'], options['password'])
+
+        created = self.create_boxes(
+            options['start'],
+            options['count'],
+            options['filled'],
+            Random(options['seed']),
+        )
+        self.stdout.write(f'Created {created} boxes')
+
+    def create_user(self, username: str, password: str):
+        """
+        Create the load test user unless it already exists.
+
+        :param username:
+        :param password:
+        :return:
+        """
+        if not password:
+            raise ValueError('--password is required with --user')
+        if User.objects.filter(username=username).exists():
+            return
+        User.objects.create_user(username, password=password)
+        self.stdout.write(f'Created user {username}')
+
+    @staticmethod
+    def create_boxes(start: int, count: int, filled: float,
+                     choose: Random) -> int:
+        """
+        Create the boxes that do not exist yet.
+
+        :param start: first box number
+        :param count: number of boxes
+        :param filled: fraction of the boxes to fill
+        :param choose: random number generator
+        :return: number of boxes created
+        """
+        box_numbers = [
+            BoxNumber.format_box_number(number)
+            for number in range(start, start + count)
+        ]
+        existing = set(
+            Box.objects
+            .filter(box_number__in=box_numbers)
+            .values_list('box_number', flat=True)
+        )
+
+        box_types = list(BoxType.objects.all())
+        products = list(Product.objects.all())
+        row_min, row_max = Constraints.get_values('Row')
+        bin_min, bin_max = Constraints.get_values('Bin')
+        tiers = Constraints.get_values('Tier')
+        exp_years = Constraints.get_values('Expiration Year')
+        now = timezone.now()
+
+        boxes = list()
+        for box_number in box_numbers:
+            if box_number in existing:
+                continue
+            box_type = choose.choice(box_types)
+            box = Box(box_number=box_number, box_type=box_type)
+            if choose.random() < filled:
+                box.product = choose.choice(products)
+                box.quantity = box_type.box_type_qty
+                box.loc_row = str(choose.randint(row_min, row_max))
+                box.loc_bin = str(choose.randint(bin_min, bin_max))
+                box.loc_tier = choose.choice(tiers)
+                box.exp_year = choose.choice(exp_years)
+                box.date_filled = now
+            boxes.append(box)
+
+        Box.objects.bulk_create(boxes, batch_size=500)
+        return len(boxes)
+
+
+# EOF
@@ -0,0 +1,45 @@
+# Generated by Django 2.2.2 on 2026-10-19 12:54
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fpiweb', '0016_remove_box_print_box_number_label'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoxEvent',
+            fields=[
+                ('id', models.AutoField(help_text='Internal record identifier for a box event.', primary_key=True, serialize=False, verbose_name='Internal Box Event ID')),
+                ('box_number', models.CharField(help_text='Box number on box at time of the event.', max_length=8, verbose_name='Visible Box Number')),
+                ('event_type', models.CharField(choices=[('Created', 'Box created'), ('Filled', 'Box filled with product'), ('Moved', 'Box moved to a new location'), ('Edited', 'Box details edited'), ('Emptied', 'Box emptied'), ('Deleted', 'Box deleted')], help_text='Kind of change made to the box.', max_length=10, verbose_name='Event Type')),
+                ('event_time', models.DateTimeField(default=django.utils.timezone.now, help_text='Date and time the change was made.', verbose_name='Event Time')),
+                ('event_date', models.DateField(help_text='Local date the change was made.', verbose_name='Event Date')),
+                ('loc_row', models.CharField(blank=True, help_text='Row containing the box after the change.', max_length=2, null=True, verbose_name='Row Location')),
+                ('loc_bin', models.CharField(blank=True, help_text='Bin containing the box after the change.', max_length=2, null=True, verbose_name='Bin Location')),
+                ('loc_tier', models.CharField(blank=True, help_text='Tier containing the box after the change.', max_length=2, null=True, verbose_name='Tier Location')),
+                ('prod_name', models.CharField(blank=True, help_text='Product in the box after the change.', max_length=30, null=True, verbose_name='Product Name')),
+                ('quantity', models.IntegerField(blank=True, help_text='Quantity in the box after the change.', null=True, verbose_name='Quantity in Box')),
+                ('changes', django.contrib.postgres.fields.jsonb.JSONField(blank=True, default=dict, help_text='Fields changed by this event (old and new values).', verbose_name='Changes')),
+                ('box', models.ForeignKey(blank=True, help_text='Box that was changed, if it still exists.', null=True, on_delete=django.db.models.deletion.SET_NULL, to='fpiweb.Box', verbose_name='Box')),
+            ],
+            options={
+                'verbose_name_plural': 'Box Events',
+                'ordering': ['-event_time'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='boxevent',
+            index=models.Index(fields=['box_number', 'event_time'], name='fpiweb_boxevent_box_time'),
+        ),
+        migrations.AddIndex(
+            model_name='boxevent',
+            index=models.Index(fields=['event_date', 'event_type'], name='fpiweb_boxevent_date_type'),
+        ),
+    ]
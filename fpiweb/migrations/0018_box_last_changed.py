@@ -0,0 +1,20 @@
+# Generated by Django 2.2.2 on 2026-10-19 13:10
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fpiweb', '0017_boxevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='box',
+            name='last_changed',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text='Date and time this box was last changed.', verbose_name='Last Changed'),
+            preserve_default=False,
+        ),
+    ]
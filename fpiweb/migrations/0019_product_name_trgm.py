@@ -0,0 +1,24 @@
+# Generated by Django 2.2.2 on 2026-10-19 13:06
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fpiweb', '0018_box_last_changed'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['prod_name'], name='product_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='productexample',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['prod_example_name'], name='product_example_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 2.2.2 on 2026-10-19 13:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fpiweb', '0019_product_name_trgm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityWeek',
+            fields=[
+                ('id', models.AutoField(help_text='Internal record identifier for an activity week.', primary_key=True, serialize=False, verbose_name='Internal Activity Week ID')),
+                ('week_start', models.DateField(help_text='Monday of the week the boxes were consumed.', verbose_name='Week Starting')),
+                ('prod_cat_name', models.CharField(help_text='Category of product consumed.', max_length=30, verbose_name='Product Category Name')),
+                ('prod_name', models.CharField(help_text='Product consumed.', max_length=30, verbose_name='Product Name')),
+                ('boxes', models.IntegerField(default=0, help_text='Number of boxes consumed.', verbose_name='Boxes')),
+                ('quantity', models.IntegerField(default=0, help_text='Number of items in the boxes consumed.', verbose_name='Quantity')),
+                ('duration_total', models.IntegerField(default=0, help_text='Total days the boxes consumed were stored.', verbose_name='Total Duration')),
+            ],
+            options={
+                'verbose_name_plural': 'Activity Weeks',
+                'ordering': ['-week_start', 'prod_cat_name', 'prod_name'],
+                'unique_together': {('week_start', 'prod_cat_name', 'prod_name')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ActivityDuration',
+            fields=[
+                ('id', models.AutoField(help_text='Internal record identifier for an activity duration.', primary_key=True, serialize=False, verbose_name='Internal Activity Duration ID')),
+                ('prod_cat_name', models.CharField(help_text='Category of product consumed.', max_length=30, verbose_name='Product Category Name')),
+                ('prod_name', models.CharField(help_text='Product consumed.', max_length=30, verbose_name='Product Name')),
+                ('duration', models.IntegerField(help_text='Number of days between date box was filled and consumed.', verbose_name='Duration')),
+                ('boxes', models.IntegerField(default=0, help_text='Number of boxes stored for this many days.', verbose_name='Boxes')),
+            ],
+            options={
+                'verbose_name_plural': 'Activity Durations',
+                'ordering': ['prod_cat_name', 'prod_name', 'duration'],
+                'unique_together': {('prod_cat_name', 'prod_name', 'duration')},
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 2.2.2 on 2026-10-19 13:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('fpiweb', '0020_activity_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LabelJob',
+            fields=[
+                ('id', models.AutoField(help_text='Internal record identifier for a label job.', primary_key=True, serialize=False, verbose_name='Internal Label Job ID')),
+                ('status', models.CharField(choices=[('Pending', 'Waiting for a worker'), ('Running', 'Being printed'), ('Done', 'Ready to download'), ('Failed', 'Failed')], default='Pending', help_text='How far along the job is.', max_length=10, verbose_name='Status')),
+                ('layout', models.CharField(help_text='Label layout (see StandaloneTools/LabelLayout.py).', max_length=30, verbose_name='Label Layout')),
+                ('url_prefix', models.CharField(help_text='URL of a box, less the box number.', max_length=200, verbose_name='URL Prefix')),
+                ('label_count', models.IntegerField(help_text='Number of labels reserved for the job.', verbose_name='Label Count')),
+                ('first_box_number', models.CharField(blank=True, help_text='First box number reserved for the job.', max_length=8, null=True, verbose_name='First Box Number')),
+                ('last_box_number', models.CharField(blank=True, help_text='Last box number reserved for the job.', max_length=8, null=True, verbose_name='Last Box Number')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now, help_text='Date and time the job was queued.', verbose_name='Created')),
+                ('started', models.DateTimeField(blank=True, help_text='Date and time a worker started the job.', null=True, verbose_name='Started')),
+                ('finished', models.DateTimeField(blank=True, help_text='Date and time the job was done (or failed).', null=True, verbose_name='Finished')),
+                ('error', models.TextField(blank=True, default='', help_text='Why the job failed.', verbose_name='Error')),
+                ('pdf', models.BinaryField(blank=True, help_text='The printed labels.', null=True, verbose_name='PDF')),
+                ('requested_by', models.ForeignKey(blank=True, help_text='User who asked for the labels.', null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Requested By')),
+            ],
+            options={
+                'verbose_name_plural': 'Label Jobs',
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReservedBoxNumber',
+            fields=[
+                ('id', models.AutoField(help_text='Internal record identifier for a reserved box number.', primary_key=True, serialize=False, verbose_name='Internal Reserved Box Number ID')),
+                ('box_number', models.CharField(help_text='Box number printed on a label.', max_length=8, unique=True, verbose_name='Visible Box Number')),
+                ('reserved', models.DateTimeField(default=django.utils.timezone.now, help_text='Date and time the box number was reserved.', verbose_name='Reserved')),
+                ('label_job', models.ForeignKey(blank=True, help_text='Label job printing the box number, if any.', null=True, on_delete=django.db.models.deletion.SET_NULL, to='fpiweb.LabelJob', verbose_name='Label Job')),
+            ],
+            options={
+                'verbose_name_plural': 'Reserved Box Numbers',
+                'ordering': ['box_number'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='labeljob',
+            index=models.Index(fields=['status', 'created'], name='fpiweb_labeljob_status'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.2 on 2026-10-19 13:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fpiweb', '0021_label_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('id', models.AutoField(help_text='Internal record identifier for a cache version.', primary_key=True, serialize=False, verbose_name='Internal Cache Version ID')),
+                ('name', models.CharField(help_text='Name of the cache counted.', max_length=30, unique=True, verbose_name='Cache Name')),
+                ('version', models.BigIntegerField(default=0, help_text='Number of changes made to the cache.', verbose_name='Version')),
+            ],
+            options={
+                'verbose_name_plural': 'Cache Versions',
+            },
+        ),
+    ]
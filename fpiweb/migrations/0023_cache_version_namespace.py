@@ -0,0 +1,18 @@
+# Generated by Django 2.2.2 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fpiweb', '0022_cache_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cacheversion',
+            name='name',
+            field=models.CharField(help_text='Name of the cache and namespace counted.', max_length=200, unique=True, verbose_name='Cache Name'),
+        ),
+    ]
@@ -6,7 +6,10 @@ from enum import Enum, unique
 # import as to avoid conflict with built-in function compile
 from re import compile as re_compile
 
-from django.db import models
+from django.conf import settings
+from django.contrib.postgres.fields import JSONField
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models, transaction
 from django.db.models import Max
 from django.utils import timezone
 from django.urls import reverse
@@ -119,6 +122,14 @@ class Product(models.Model):
     class Meta:
         ordering = ['prod_name']
         app_label = 'fpiweb'
+        indexes = [
+            # trigram index for the product search (see product_search.py)
+            GinIndex(
+                name='product_name_trgm',
+                fields=['prod_name'],
+                opclasses=['gin_trgm_ops'],
+            ),
+        ]
 
     id_help_text = 'Internal record identifier for product.'
     id = models.AutoField(
@@ -186,6 +197,26 @@ class Box(models.Model):
         app_label = 'fpiweb'
         verbose_name_plural = 'Boxes'
 
+    # fields remembered when a box is loaded, to tell what a save changed
+    # (box events, cached fragments, occupancy map and slot index)
+    REMEMBERED_FIELDS = (
+        'box_number',
+        'box_type_id',
+        'loc_row',
+        'loc_bin',
+        'loc_tier',
+        'product_id',
+        'exp_year',
+        'exp_month_start',
+        'exp_month_end',
+        'date_filled',
+        'quantity',
+        'last_changed',
+    )
+
+    loaded_values = None
+    """ Remembered fields as loaded or last saved (None if neither). """
+
     id_help_text = 'Internal record identifier for box.'
     id = models.AutoField(
         'Internal Box ID',
@@ -303,6 +334,14 @@ class Box(models.Model):
     )
     """ Approximate or default number of items in the box, if filled. """
 
+    last_changed_help_text = 'Date and time this box was last changed.'
+    last_changed = models.DateTimeField(
+        'Last Changed',
+        auto_now=True,
+        help_text=last_changed_help_text,
+    )
+    """ Date and time this box was last changed. """
+
     # define a default display of Box
     def __str__(self):
         """ Default way to display this box record. """
@@ -321,15 +360,52 @@ class Box(models.Model):
         return display
 
     def empty(self):
+        """
+        Record the product in this box as consumed and empty the box.
 
-        # TODO: finish creating activity record
-        Activity.objects.create(
-            box_number=self.box_number,
-            box_type=self.box_type,
+        An activity record is written with the contents and location of the
+        box, then the location and product information is cleared.
 
-        )
+        :return: the activity record
+        """
+        if self.product_id is None:
+            raise ValueError(f'{self.box_number} is already empty')
+
+        date_consumed = timezone.localdate()
+        if self.date_filled:
+            date_filled = timezone.localdate(self.date_filled)
+        else:
+            date_filled = date_consumed
+
+        with transaction.atomic():
+            activity = Activity.objects.create(
+                box_number=self.box_number,
+                box_type=self.box_type.box_type_code,
+                loc_row=self.loc_row or '',
+                loc_bin=self.loc_bin or '',
+                loc_tier=self.loc_tier or '',
+                prod_name=self.product.prod_name,
+                prod_cat_name=self.product.prod_cat.prod_cat_name,
+                date_filled=date_filled,
+                date_consumed=date_consumed,
+                duration=(date_consumed - date_filled).days,
+                exp_year=self.exp_year or date_filled.year,
+                exp_month_start=self.exp_month_start,
+                exp_month_end=self.exp_month_end,
+                quantity=self.quantity or 0,
+            )
 
-        # TODO: clear out location and product info
+            self.loc_row = None
+            self.loc_bin = None
+            self.loc_tier = None
+            self.product = None
+            self.exp_year = None
+            self.exp_month_start = None
+            self.exp_month_end = None
+            self.date_filled = None
+            self.quantity = None
+            self.save()
+        return activity
 
     def get_absolute_url(self):
         return reverse(
@@ -337,6 +413,49 @@ class Box(models.Model):
             kwargs={'pk': self.pk},
         )
 
+    @property
+    def cache_version(self):
+        """
+        Version of this box for keying cached fragments (changes on save).
+        """
+        return self.version_of(self.last_changed)
+
+    @staticmethod
+    def version_of(last_changed) -> int:
+        """
+        Cache version of a box last changed at the given time.
+        """
+        if last_changed is None:
+            return 0
+        return int(last_changed.timestamp() * 1_000_000)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_values = instance.remembered_values()
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # only now, so the post_save receivers compared with the old values
+        self.loaded_values = self.remembered_values()
+
+    def remembered_values(self) -> dict:
+        """
+        Current values of the remembered fields that were loaded.
+
+        Deferred fields (.only() or .defer()) are left out rather than
+        read with a query of their own.
+
+        :return: dictionary of field name to value
+        """
+        deferred = self.get_deferred_fields()
+        return {
+            name: getattr(self, name)
+            for name in self.REMEMBERED_FIELDS
+            if name not in deferred
+        }
+
 
 class Activity(models.Model):
     """
@@ -494,6 +613,296 @@ class Activity(models.Model):
         return display
 
 
+class ActivityWeek(models.Model):
+    """
+    Boxes of a product consumed in one week, kept up to date as activities
+    are recorded (see fpiweb/activity_stats.py).
+    """
+
+    class Meta:
+        ordering = ['-week_start', 'prod_cat_name', 'prod_name']
+        app_label = 'fpiweb'
+        verbose_name_plural = 'Activity Weeks'
+        unique_together = ('week_start', 'prod_cat_name', 'prod_name')
+
+    id_help_text = 'Internal record identifier for an activity week.'
+    id = models.AutoField(
+        'Internal Activity Week ID',
+        primary_key=True,
+        help_text=id_help_text,
+    )
+    """ Internal record identifier for an activity week. """
+
+    week_start_help_text = 'Monday of the week the boxes were consumed.'
+    week_start = models.DateField(
+        'Week Starting',
+        help_text=week_start_help_text,
+    )
+    """ Monday of the week the boxes were consumed. """
+
+    prod_cat_name_help_text = 'Category of product consumed.'
+    prod_cat_name = models.CharField(
+        'Product Category Name',
+        max_length=30,
+        help_text=prod_cat_name_help_text,
+    )
+    """ Category of product consumed. """
+
+    prod_name_help_text = 'Product consumed.'
+    prod_name = models.CharField(
+        'Product Name',
+        max_length=30,
+        help_text=prod_name_help_text,
+    )
+    """ Product consumed. """
+
+    boxes_help_text = 'Number of boxes consumed.'
+    boxes = models.IntegerField(
+        'Boxes',
+        default=0,
+        help_text=boxes_help_text,
+    )
+    """ Number of boxes consumed. """
+
+    quantity_help_text = 'Number of items in the boxes consumed.'
+    quantity = models.IntegerField(
+        'Quantity',
+        default=0,
+        help_text=quantity_help_text,
+    )
+    """ Number of items in the boxes consumed. """
+
+    duration_total_help_text = 'Total days the boxes consumed were stored.'
+    duration_total = models.IntegerField(
+        'Total Duration',
+        default=0,
+        help_text=duration_total_help_text,
+    )
+    """ Total days the boxes consumed were stored. """
+
+    # define a default display of ActivityWeek
+    def __str__(self):
+        """ Default way to display this activity week record. """
+        display = f'{self.week_start} {self.prod_name} ' \
+            f'({self.prod_cat_name}) {self.boxes} boxes'
+        return display
+
+
+class ActivityDuration(models.Model):
+    """
+    Number of boxes of a product that were stored for a given number of
+    days before being consumed (a histogram of Activity.duration).
+    """
+
+    class Meta:
+        ordering = ['prod_cat_name', 'prod_name', 'duration']
+        app_label = 'fpiweb'
+        verbose_name_plural = 'Activity Durations'
+        unique_together = ('prod_cat_name', 'prod_name', 'duration')
+
+    id_help_text = 'Internal record identifier for an activity duration.'
+    id = models.AutoField(
+        'Internal Activity Duration ID',
+        primary_key=True,
+        help_text=id_help_text,
+    )
+    """ Internal record identifier for an activity duration. """
+
+    prod_cat_name_help_text = 'Category of product consumed.'
+    prod_cat_name = models.CharField(
+        'Product Category Name',
+        max_length=30,
+        help_text=prod_cat_name_help_text,
+    )
+    """ Category of product consumed. """
+
+    prod_name_help_text = 'Product consumed.'
+    prod_name = models.CharField(
+        'Product Name',
+        max_length=30,
+        help_text=prod_name_help_text,
+    )
+    """ Product consumed. """
+
+    duration_help_text = 'Number of days between date box was filled and ' \
+                         'consumed.'
+    duration = models.IntegerField(
+        'Duration',
+        help_text=duration_help_text,
+    )
+    """ Number of days between date box was filled and consumed. """
+
+    boxes_help_text = 'Number of boxes stored for this many days.'
+    boxes = models.IntegerField(
+        'Boxes',
+        default=0,
+        help_text=boxes_help_text,
+    )
+    """ Number of boxes stored for this many days. """
+
+    # define a default display of ActivityDuration
+    def __str__(self):
+        """ Default way to display this activity duration record. """
+        display = f'{self.prod_name} ({self.prod_cat_name}) ' \
+            f'{self.duration} days: {self.boxes} boxes'
+        return display
+
+
+class BoxEvent(models.Model):
+    """
+    Audit log of changes made to a box (filled, moved, edited, emptied).
+    """
+
+    class Meta:
+        ordering = ['-event_time']
+        app_label = 'fpiweb'
+        verbose_name_plural = 'Box Events'
+        indexes = [
+            models.Index(
+                fields=['box_number', 'event_time'],
+                name='fpiweb_boxevent_box_time',
+            ),
+            models.Index(
+                fields=['event_date', 'event_type'],
+                name='fpiweb_boxevent_date_type',
+            ),
+        ]
+
+    # Event type names
+    CREATED = 'Created'
+    FILLED = 'Filled'
+    MOVED = 'Moved'
+    EDITED = 'Edited'
+    EMPTIED = 'Emptied'
+    DELETED = 'Deleted'
+
+    EVENT_TYPE_CHOICES = (
+        (CREATED, 'Box created'),
+        (FILLED, 'Box filled with product'),
+        (MOVED, 'Box moved to a new location'),
+        (EDITED, 'Box details edited'),
+        (EMPTIED, 'Box emptied'),
+        (DELETED, 'Box deleted'),
+    )
+
+    id_help_text = 'Internal record identifier for a box event.'
+    id = models.AutoField(
+        'Internal Box Event ID',
+        primary_key=True,
+        help_text=id_help_text,
+    )
+    """ Internal record identifier for a box event. """
+
+    box_help_text = 'Box that was changed, if it still exists.'
+    box = models.ForeignKey(
+        Box,
+        on_delete=models.SET_NULL,
+        verbose_name='Box',
+        null=True,
+        blank=True,
+        help_text=box_help_text,
+    )
+    """ Box that was changed, if it still exists. """
+
+    box_number_help_text = 'Box number on box at time of the event.'
+    box_number = models.CharField(
+        'Visible Box Number',
+        max_length=8,
+        help_text=box_number_help_text,
+    )
+    """ Box number on box at time of the event. """
+
+    event_type_help_text = 'Kind of change made to the box.'
+    event_type = models.CharField(
+        'Event Type',
+        max_length=10,
+        choices=EVENT_TYPE_CHOICES,
+        help_text=event_type_help_text,
+    )
+    """ Kind of change made to the box. """
+
+    event_time_help_text = 'Date and time the change was made.'
+    event_time = models.DateTimeField(
+        'Event Time',
+        default=timezone.now,
+        help_text=event_time_help_text,
+    )
+    """ Date and time the change was made. """
+
+    event_date_help_text = 'Local date the change was made.'
+    event_date = models.DateField(
+        'Event Date',
+        help_text=event_date_help_text,
+    )
+    """ Local date the change was made. """
+
+    loc_row_help_text = 'Row containing the box after the change.'
+    loc_row = models.CharField(
+        'Row Location',
+        max_length=2,
+        null=True,
+        blank=True,
+        help_text=loc_row_help_text,
+    )
+    """ Row containing the box after the change. """
+
+    loc_bin_help_text = 'Bin containing the box after the change.'
+    loc_bin = models.CharField(
+        'Bin Location',
+        max_length=2,
+        null=True,
+        blank=True,
+        help_text=loc_bin_help_text,
+    )
+    """ Bin containing the box after the change. """
+
+    loc_tier_help_text = 'Tier containing the box after the change.'
+    loc_tier = models.CharField(
+        'Tier Location',
+        max_length=2,
+        null=True,
+        blank=True,
+        help_text=loc_tier_help_text,
+    )
+    """ Tier containing the box after the change. """
+
+    prod_name_help_text = 'Product in the box after the change.'
+    prod_name = models.CharField(
+        'Product Name',
+        max_length=30,
+        null=True,
+        blank=True,
+        help_text=prod_name_help_text,
+    )
+    """ Product in the box after the change. """
+
+    quantity_help_text = 'Quantity in the box after the change.'
+    quantity = models.IntegerField(
+        'Quantity in Box',
+        null=True,
+        blank=True,
+        help_text=quantity_help_text,
+    )
+    """ Quantity in the box after the change. """
+
+    changes_help_text = 'Fields changed by this event (old and new values).'
+    changes = JSONField(
+        'Changes',
+        default=dict,
+        blank=True,
+        help_text=changes_help_text,
+    )
+    """ Fields changed by this event (old and new values). """
+
+    # define a default display of BoxEvent
+    def __str__(self):
+        """ Default way to display this box event record. """
+        display = f'{self.box_number} {self.event_type} ' \
+            f'{self.event_time:%Y-%m-%d %H:%M} at ' \
+            f'{self.loc_row}/{self.loc_bin}/{self.loc_tier}'
+        return display
+
+
 @unique
 class CONSTRAINT_NAME_KEYS(Enum):
     """
@@ -615,40 +1024,48 @@ class Constraints(models.Model):
         except Constraints.DoesNotExist:
             return None
 
-        if constraint.constraint_type == Constraints.INT_RANGE:
+        return constraint.valid_values()
+
+    def valid_values(self):
+        """
+        Values of this constraint, converted to the constraint type.
+
+        :return: [min, max] for a range, otherwise the list of valid values
+        """
+        if self.constraint_type == Constraints.INT_RANGE:
             return [
-                int(constraint.constraint_min),
-                int(constraint.constraint_max),
+                int(self.constraint_min),
+                int(self.constraint_max),
             ]
 
-        if constraint.constraint_type == Constraints.CHAR_RANGE:
+        if self.constraint_type == Constraints.CHAR_RANGE:
             return [
-                constraint.constraint_min,
-                constraint.constraint_max,
+                self.constraint_min,
+                self.constraint_max,
             ]
 
-        if constraint.constraint_type == Constraints.INT_LIST:
-            if not constraint.constraint_list:
+        if self.constraint_type == Constraints.INT_LIST:
+            if not self.constraint_list:
                 return []
 
             values = []
-            for piece in constraint.constraint_list.split(','):
+            for piece in self.constraint_list.split(','):
                 piece = piece.strip()
                 values.append(int(piece))
             return values
 
-        if constraint.constraint_type == Constraints.CHAR_LIST:
-            if not constraint.constraint_list:
+        if self.constraint_type == Constraints.CHAR_LIST:
+            if not self.constraint_list:
                 return []
 
             values = []
-            for piece in constraint.constraint_list.split(','):
+            for piece in self.constraint_list.split(','):
                 piece = piece.strip()
                 values.append(piece)
             return values
 
         raise ValueError(
-            f"Unrecognized constraint_type {constraint.constraint_type}")
+            f"Unrecognized constraint_type {self.constraint_type}")
 
 
 class ProductExample(models.Model):
@@ -659,6 +1076,14 @@ class ProductExample(models.Model):
     class Meta:
         ordering = ['prod_example_name']
         app_label = 'fpiweb'
+        indexes = [
+            # trigram index for the product search (see product_search.py)
+            GinIndex(
+                name='product_example_name_trgm',
+                fields=['prod_example_name'],
+                opclasses=['gin_trgm_ops'],
+            ),
+        ]
 
     id_help_text = 'Internal reccord identifier for product example'
     id = models.AutoField(
@@ -691,4 +1116,250 @@ class ProductExample(models.Model):
         display = f'{self.prod_example_name} ({self.prod_id})'
         return display
 
+
+class LabelJob(models.Model):
+    """
+    Request to print the QR code labels of new boxes in the background.
+    """
+
+    class Meta:
+        ordering = ['-created']
+        app_label = 'fpiweb'
+        verbose_name_plural = 'Label Jobs'
+        indexes = [
+            models.Index(
+                fields=['status', 'created'],
+                name='fpiweb_labeljob_status',
+            ),
+        ]
+
+    # Status names
+    PENDING = 'Pending'
+    RUNNING = 'Running'
+    DONE = 'Done'
+    FAILED = 'Failed'
+
+    STATUS_CHOICES = (
+        (PENDING, 'Waiting for a worker'),
+        (RUNNING, 'Being printed'),
+        (DONE, 'Ready to download'),
+        (FAILED, 'Failed'),
+    )
+
+    id_help_text = 'Internal record identifier for a label job.'
+    id = models.AutoField(
+        'Internal Label Job ID',
+        primary_key=True,
+        help_text=id_help_text,
+    )
+    """ Internal record identifier for a label job. """
+
+    status_help_text = 'How far along the job is.'
+    status = models.CharField(
+        'Status',
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        help_text=status_help_text,
+    )
+    """ How far along the job is. """
+
+    requested_by_help_text = 'User who asked for the labels.'
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        verbose_name='Requested By',
+        null=True,
+        blank=True,
+        help_text=requested_by_help_text,
+    )
+    """ User who asked for the labels. """
+
+    layout_help_text = 'Label layout (see StandaloneTools/LabelLayout.py).'
+    layout = models.CharField(
+        'Label Layout',
+        max_length=30,
+        help_text=layout_help_text,
+    )
+    """ Label layout (see StandaloneTools/LabelLayout.py). """
+
+    url_prefix_help_text = 'URL of a box, less the box number.'
+    url_prefix = models.CharField(
+        'URL Prefix',
+        max_length=200,
+        help_text=url_prefix_help_text,
+    )
+    """ URL of a box, less the box number. """
+
+    label_count_help_text = 'Number of labels reserved for the job.'
+    label_count = models.IntegerField(
+        'Label Count',
+        help_text=label_count_help_text,
+    )
+    """ Number of labels reserved for the job. """
+
+    first_box_number_help_text = 'First box number reserved for the job.'
+    first_box_number = models.CharField(
+        'First Box Number',
+        max_length=8,
+        null=True,
+        blank=True,
+        help_text=first_box_number_help_text,
+    )
+    """ First box number reserved for the job. """
+
+    last_box_number_help_text = 'Last box number reserved for the job.'
+    last_box_number = models.CharField(
+        'Last Box Number',
+        max_length=8,
+        null=True,
+        blank=True,
+        help_text=last_box_number_help_text,
+    )
+    """ Last box number reserved for the job. """
+
+    created_help_text = 'Date and time the job was queued.'
+    created = models.DateTimeField(
+        'Created',
+        default=timezone.now,
+        help_text=created_help_text,
+    )
+    """ Date and time the job was queued. """
+
+    started_help_text = 'Date and time a worker started the job.'
+    started = models.DateTimeField(
+        'Started',
+        null=True,
+        blank=True,
+        help_text=started_help_text,
+    )
+    """ Date and time a worker started the job. """
+
+    finished_help_text = 'Date and time the job was done (or failed).'
+    finished = models.DateTimeField(
+        'Finished',
+        null=True,
+        blank=True,
+        help_text=finished_help_text,
+    )
+    """ Date and time the job was done (or failed). """
+
+    error_help_text = 'Why the job failed.'
+    error = models.TextField(
+        'Error',
+        blank=True,
+        default='',
+        help_text=error_help_text,
+    )
+    """ Why the job failed. """
+
+    pdf_help_text = 'The printed labels.'
+    pdf = models.BinaryField(
+        'PDF',
+        null=True,
+        blank=True,
+        help_text=pdf_help_text,
+    )
+    """ The printed labels. """
+
+    def __str__(self):
+        """ Default way to display this label job. """
+        display = f'{self.label_count} labels {self.first_box_number} - ' \
+            f'{self.last_box_number} ({self.status})'
+        return display
+
+
+class ReservedBoxNumber(models.Model):
+    """
+    Box number set aside for a label, so it is not printed twice.
+    """
+
+    class Meta:
+        ordering = ['box_number']
+        app_label = 'fpiweb'
+        verbose_name_plural = 'Reserved Box Numbers'
+
+    id_help_text = 'Internal record identifier for a reserved box number.'
+    id = models.AutoField(
+        'Internal Reserved Box Number ID',
+        primary_key=True,
+        help_text=id_help_text,
+    )
+    """ Internal record identifier for a reserved box number. """
+
+    box_number_help_text = 'Box number printed on a label.'
+    box_number = models.CharField(
+        'Visible Box Number',
+        max_length=8,
+        unique=True,
+        help_text=box_number_help_text,
+    )
+    """ Box number printed on a label. """
+
+    label_job_help_text = 'Label job printing the box number, if any.'
+    label_job = models.ForeignKey(
+        LabelJob,
+        on_delete=models.SET_NULL,
+        verbose_name='Label Job',
+        null=True,
+        blank=True,
+        help_text=label_job_help_text,
+    )
+    """ Label job printing the box number, if any. """
+
+    reserved_help_text = 'Date and time the box number was reserved.'
+    reserved = models.DateTimeField(
+        'Reserved',
+        default=timezone.now,
+        help_text=reserved_help_text,
+    )
+    """ Date and time the box number was reserved. """
+
+    def __str__(self):
+        """ Default way to display this reserved box number. """
+        return self.box_number
+
+
+class CacheVersion(models.Model):
+    """
+    Counter of the changes made to one namespace of the shared cache.
+
+    Each worker keeps recently used cache entries in memory (see
+    fpiweb/tiered_cache.py) and drops those of a namespace when its counter
+    moves.
+    """
+
+    class Meta:
+        app_label = 'fpiweb'
+        verbose_name_plural = 'Cache Versions'
+
+    id_help_text = 'Internal record identifier for a cache version.'
+    id = models.AutoField(
+        'Internal Cache Version ID',
+        primary_key=True,
+        help_text=id_help_text,
+    )
+    """ Internal record identifier for a cache version. """
+
+    name_help_text = 'Name of the cache and namespace counted.'
+    name = models.CharField(
+        'Cache Name',
+        max_length=200,
+        unique=True,
+        help_text=name_help_text,
+    )
+    """ Name of the cache and namespace counted. """
+
+    version_help_text = 'Number of changes made to the cache.'
+    version = models.BigIntegerField(
+        'Version',
+        default=0,
+        help_text=version_help_text,
+    )
+    """ Number of changes made to the cache. """
+
+    def __str__(self):
+        """ Default way to display this cache version. """
+        return f'{self.name}: {self.version}'
+
 # EOF
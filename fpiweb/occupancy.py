@@ -0,0 +1,195 @@
+"""
+occupancy.py - Which warehouse slots hold boxes, and of what?
+
+A slot is one Row/Bin/Tier location.  The occupancy map shows, for every
+slot allowed by the Row, Bin and Tier constraints, how many boxes it holds
+and the product most of them contain.  It is built from one grouped query
+over the filled boxes and the rendered grid is cached (see
+occupancy_map.html) until a box is placed, moved, emptied or deleted.
+
+Rows and bins are compared as numbers, so "1" and "01" are the same row.
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from fpiweb.models import Box, Constraints
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+# fragment name used in the {% cache %} tag of occupancy_map.html
+OCCUPANCY_FRAGMENT = 'occupancy_map'
+
+# seconds the rendered map is kept (it is dropped early when boxes move)
+OCCUPANCY_TIMEOUT = 60 * 60
+
+# (row, bin, tier) of a slot
+SlotKey = Tuple[int, int, str]
+
+
+@dataclass
+class Slot:
+    """
+    Boxes in one Row/Bin/Tier location.
+    """
+    count: int = 0
+    prod_name: Optional[str] = None
+    prod_count: int = 0
+
+
+@dataclass
+class OccupancyMap:
+    """
+    Slots laid out by row, then tier, then bin.
+    """
+    rows: List[int]
+    bins: List[int]
+    tiers: List[str]
+    slots: Dict[SlotKey, Slot]
+
+    # filled boxes whose location is not one of the slots above
+    unplaced: int = 0
+
+    # (row, [(tier, [slot or None for each bin]), ...]) for the template
+    grid: list = field(default_factory=list)
+
+    @property
+    def box_count(self) -> int:
+        return sum(slot.count for slot in self.slots.values())
+
+    @property
+    def slot_count(self) -> int:
+        return len(self.rows) * len(self.bins) * len(self.tiers)
+
+
+def location_number(value: Optional[str]) -> Optional[int]:
+    """
+    Row or bin of a box as a number.
+
+    :param value: e.g. "01" or "1"
+    :return: e.g. 1, or None if the value is not a number
+    """
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_occupancy() -> OccupancyMap:
+    """
+    Count the boxes (and products) in every slot.
+
+    :return: the occupancy map
+    """
+    row_min, row_max = Constraints.get_values('Row')
+    bin_min, bin_max = Constraints.get_values('Bin')
+    occupancy = OccupancyMap(
+        rows=list(range(row_min, row_max + 1)),
+        bins=list(range(bin_min, bin_max + 1)),
+        tiers=Constraints.get_values('Tier'),
+        slots=dict(),
+    )
+
+    counts = Box.objects \
+        .filter(product__isnull=False) \
+        .order_by() \
+        .values_list('loc_row', 'loc_bin', 'loc_tier', 'product__prod_name') \
+        .annotate(boxes=Count('id'))
+
+    valid_rows = set(occupancy.rows)
+    valid_bins = set(occupancy.bins)
+    valid_tiers = set(occupancy.tiers)
+    products: Dict[SlotKey, Counter] = defaultdict(Counter)
+    for loc_row, loc_bin, loc_tier, prod_name, boxes in counts:
+        key = (location_number(loc_row), location_number(loc_bin), loc_tier)
+        if key[0] not in valid_rows or key[1] not in valid_bins or \
+                key[2] not in valid_tiers:
+            occupancy.unplaced += boxes
+            continue
+        products[key][prod_name] += boxes
+
+    for key, boxes_by_product in products.items():
+        # most boxes first, then alphabetical
+        prod_name, prod_count = min(
+            boxes_by_product.items(), key=lambda item: (-item[1], item[0]))
+        occupancy.slots[key] = Slot(
+            count=sum(boxes_by_product.values()),
+            prod_name=prod_name,
+            prod_count=prod_count,
+        )
+
+    occupancy.grid = [
+        (row, [
+            (tier, [occupancy.slots.get((row, bin_, tier)) for bin_ in
+                    occupancy.bins])
+            for tier in occupancy.tiers
+        ])
+        for row in occupancy.rows
+    ]
+    return occupancy
+
+
+def invalidate_occupancy():
+    """
+    Drop the cached occupancy map.
+
+    Called when a box moves.  Code changing locations with
+    QuerySet.update (which sends no signals) must call it too.
+
+    :return:
+    """
+    cache.delete(make_template_fragment_key(OCCUPANCY_FRAGMENT))
+    return
+
+
+def occupied_slot(values: Optional[dict]) -> Optional[tuple]:
+    """
+    The slot and product of a box, as far as the map is concerned.
+
+    :param values: field values of the box (see Box.remembered_values)
+    :return: (row, bin, tier, product id), or None if empty or unknown
+    """
+    if not values or not values.get('product_id'):
+        return None
+    return values.get('loc_row'), values.get('loc_bin'), \
+        values.get('loc_tier'), values['product_id']
+
+
+def box_slot_change(instance: Box, signal, **kwargs) -> tuple:
+    """
+    Slot and product of a box before and after it was saved or deleted.
+
+    :param instance: the box
+    :param signal: post_save or post_delete
+    :return: (previous, current), each as given by occupied_slot
+    """
+    previous = None
+    if not kwargs.get('created'):
+        previous = occupied_slot(instance.loaded_values)
+    current = None
+    if signal is not post_delete:
+        current = occupied_slot(instance.remembered_values())
+    return previous, current
+
+
+@receiver(post_save, sender=Box)
+@receiver(post_delete, sender=Box)
+def invalidate_on_move(sender, instance: Box, signal, **kwargs):
+    """
+    Drop the cached map when a box changed slot or product.
+    """
+    previous, current = box_slot_change(instance, signal, **kwargs)
+    if previous != current:
+        invalidate_occupancy()
+
+
+# EOF
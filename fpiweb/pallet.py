@@ -0,0 +1,213 @@
+"""
+pallet.py - Move a whole pallet (or slot) of boxes in one go.
+
+Moving boxes one at a time means a form post, a save and an audit event
+per box.  A pallet move takes either a source slot or a list of box
+numbers and, in one transaction:
+
+    1. locks the filled boxes being moved (one query)
+    2. changes their location with one UPDATE ... WHERE
+    3. writes a Moved box event for each of them with one bulk insert
+
+Because QuerySet.update sends no signals, the caches kept up to date by
+the Box signals (occupancy map, slot index and box detail fragments) are
+refreshed here once the transaction commits.
+"""
+
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from fpiweb.box_events import LOCATION_FIELDS, get_box_event_settings, \
+    str_or_none
+from fpiweb.fragment_cache import box_detail_key
+from fpiweb.models import Box, BoxEvent
+from fpiweb.occupancy import invalidate_occupancy
+from fpiweb.slotting import box_slot, slot_suggester
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+
+@dataclass
+class PalletMoveResult:
+    """
+    What a pallet move did.
+    """
+    # boxes moved to the new location
+    moved: int = 0
+
+    # boxes that were already in the new location
+    unchanged: int = 0
+
+    # empty boxes left where they were
+    empty: int = 0
+
+    # box numbers asked for that do not exist
+    missing: List[str] = field(default_factory=list)
+
+
+def slot_boxes(loc_row: str, loc_bin: str, loc_tier: str) -> QuerySet:
+    """
+    Boxes in a slot, whether the row and bin were stored as "1" or "01".
+
+    :param loc_row: e.g. "1"
+    :param loc_bin: e.g. "2"
+    :param loc_tier: e.g. "A1"
+    :return: queryset of the boxes
+    """
+    def spellings(value: str) -> List[str]:
+        if not value.isdigit():
+            return [value]
+        return list({str(int(value)), f'{int(value):02}'})
+
+    return Box.objects.filter(
+        loc_row__in=spellings(loc_row),
+        loc_bin__in=spellings(loc_bin),
+        loc_tier=loc_tier,
+    )
+
+
+def numbered_boxes(box_numbers: Iterable[str]) -> QuerySet:
+    """
+    Boxes with the given box numbers.
+
+    :param box_numbers: e.g. ["BOX00001", "BOX00002"]
+    :return: queryset of the boxes
+    """
+    return Box.objects.filter(box_number__in=list(box_numbers))
+
+
+def move_boxes(boxes: QuerySet, loc_row: str, loc_bin: str, loc_tier: str,
+               box_numbers: Optional[Iterable[str]] = None
+               ) -> PalletMoveResult:
+    """
+    Move the filled boxes of a queryset to a new location.
+
+    :param boxes: boxes to move (see slot_boxes and numbered_boxes)
+    :param loc_row: new row
+    :param loc_bin: new bin
+    :param loc_tier: new tier
+    :param box_numbers: box numbers asked for, to report the missing ones
+    :return: counts of the boxes moved and left alone
+    """
+    result = PalletMoveResult()
+    destination = (loc_row, loc_bin, loc_tier)
+    # "01" and "1" are the same row, as in slot_boxes
+    destination_slot = box_slot(*destination)
+
+    with transaction.atomic():
+        found = list(
+            boxes
+            .select_for_update(of=('self',))
+            .order_by('box_number')
+            .values_list(
+                'id', 'box_number', 'loc_row', 'loc_bin', 'loc_tier',
+                'product_id', 'product__prod_name', 'quantity',
+                'last_changed',
+            )
+        )
+        if box_numbers is not None:
+            found_numbers = {row[1] for row in found}
+            result.missing = sorted(set(box_numbers) - found_numbers)
+
+        to_move = list()
+        for row in found:
+            if row[5] is None:
+                result.empty += 1
+            elif box_slot(*row[2:5]) == destination_slot:
+                result.unchanged += 1
+            else:
+                to_move.append(row)
+        result.moved = len(to_move)
+        if not to_move:
+            return result
+
+        now = timezone.now()
+        Box.objects \
+            .filter(pk__in=[row[0] for row in to_move]) \
+            .update(loc_row=loc_row, loc_bin=loc_bin, loc_tier=loc_tier,
+                    last_changed=now)
+
+        event_date = timezone.localdate(now)
+        BoxEvent.objects.bulk_create(
+            [
+                BoxEvent(
+                    box_id=box_id,
+                    box_number=box_number,
+                    event_type=BoxEvent.MOVED,
+                    event_time=now,
+                    event_date=event_date,
+                    loc_row=loc_row,
+                    loc_bin=loc_bin,
+                    loc_tier=loc_tier,
+                    prod_name=prod_name,
+                    quantity=quantity,
+                    changes={
+                        name: [str_or_none(old), str_or_none(new)]
+                        for name, old, new in zip(
+                            LOCATION_FIELDS, (row, bin_, tier), destination)
+                        if old != new
+                    },
+                )
+                for box_id, box_number, row, bin_, tier, _, prod_name,
+                quantity, _ in to_move
+            ],
+            batch_size=get_box_event_settings()['BATCH_SIZE'],
+        )
+
+        transaction.on_commit(lambda: boxes_moved(to_move, destination))
+    return result
+
+
+def move_pallet(cleaned_data: dict) -> PalletMoveResult:
+    """
+    Carry out a pallet move given with PalletMoveForm.
+
+    :param cleaned_data: cleaned data of a valid PalletMoveForm
+    :return: counts of the boxes moved and left alone
+    """
+    box_numbers = cleaned_data['box_numbers']
+    if box_numbers:
+        boxes = numbered_boxes(box_numbers)
+    else:
+        boxes = slot_boxes(
+            cleaned_data['from_row'],
+            cleaned_data['from_bin'],
+            cleaned_data['from_tier'],
+        )
+    return move_boxes(
+        boxes,
+        cleaned_data['loc_row'],
+        cleaned_data['loc_bin'],
+        cleaned_data['loc_tier'],
+        box_numbers=box_numbers or None,
+    )
+
+
+def boxes_moved(moved: list, destination: tuple):
+    """
+    Bring the caches up to date after boxes were moved with an UPDATE.
+
+    :param moved: (id, box number, row, bin, tier, product id, product
+        name, quantity, last changed) of each box before the move
+    :param destination: (row, bin, tier) the boxes were moved to
+    :return:
+    """
+    invalidate_occupancy()
+    cache.delete_many([
+        box_detail_key(box_id, Box.version_of(last_changed))
+        for box_id, *_, last_changed in moved
+    ])
+    for _, _, row, bin_, tier, product_id, *_ in moved:
+        slot_suggester.box_changed(
+            (row, bin_, tier, product_id), destination + (product_id,))
+    return
+
+
+# EOF
@@ -0,0 +1,113 @@
+"""
+product_search.py - Typo tolerant, prefix ranked search for products.
+
+A product matches the text typed so far when its name (or the name of one
+of its product examples) either contains the text or has a word that is
+similar to it, e.g. "spagheti" finds "Spaghetti".  Both tests are served
+by the trigram (pg_trgm) GIN indexes on Product.prod_name and
+ProductExample.prod_example_name.
+
+Matches are ranked by:
+
+    1. names starting with the text
+    2. names containing the text
+    3. everything else (matched by similarity or through an example)
+
+and then by how similar the name is to the text.
+"""
+
+from django.db.models import Case, CharField, F, FloatField, Func, \
+    IntegerField, Lookup, Q, QuerySet, Value, When
+
+from fpiweb.models import Product, ProductExample
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+# most products returned by one search
+PRODUCT_SEARCH_LIMIT = 20
+
+
+@CharField.register_lookup
+class TrigramIContains(Lookup):
+    """
+    field__trigram_icontains=text - same as icontains, but written as ILIKE.
+
+    Django writes icontains as UPPER(field) LIKE UPPER(...), which cannot
+    use a trigram index on the field.
+    """
+    lookup_name = 'trigram_icontains'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        rhs_params = [
+            f'%{connection.ops.prep_for_like_query(param)}%'
+            for param in rhs_params
+        ]
+        return f'{lhs} ILIKE {rhs}', lhs_params + rhs_params
+
+
+@CharField.register_lookup
+class TrigramWordSimilar(Lookup):
+    """
+    field__trigram_word_similar=text - the field has a word like the text.
+    """
+    lookup_name = 'trigram_word_similar'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} %%> {rhs}', lhs_params + rhs_params
+
+
+class TrigramWordSimilarity(Func):
+    """
+    How similar the text is to the most similar word in the field (0 - 1).
+    """
+    function = 'WORD_SIMILARITY'
+    output_field = FloatField()
+
+    def __init__(self, text: str, expression, **extra):
+        super().__init__(Value(text), expression, **extra)
+
+
+def search_products(text: str,
+                    limit: int = PRODUCT_SEARCH_LIMIT) -> QuerySet:
+    """
+    Find the products best matching the text typed so far.
+
+    :param text: part of a product (or product example) name
+    :param limit: most products to return
+    :return: the products, best match first
+    """
+    text = text.strip()
+    if not text:
+        return Product.objects.none()
+
+    # Each half of the union is answered from its own trigram index.
+    by_name = Product.objects.filter(
+        Q(prod_name__trigram_icontains=text) |
+        Q(prod_name__trigram_word_similar=text)
+    ).order_by().values('id')
+    by_example = ProductExample.objects.filter(
+        Q(prod_example_name__trigram_icontains=text) |
+        Q(prod_example_name__trigram_word_similar=text)
+    ).order_by().values('prod_id')
+
+    products = Product.objects.filter(
+        id__in=by_name.union(by_example)
+    ).annotate(
+        prefix_rank=Case(
+            When(prod_name__istartswith=text, then=Value(0)),
+            When(prod_name__icontains=text, then=Value(1)),
+            default=Value(2),
+            output_field=IntegerField(),
+        ),
+        similarity=TrigramWordSimilarity(text, F('prod_name')),
+    ).order_by('prefix_rank', '-similarity', 'prod_name')
+    return products[:limit]
+
+
+# EOF
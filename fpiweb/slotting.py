@@ -0,0 +1,340 @@
+"""
+slotting.py - Suggest where to put a newly filled box.
+
+Boxes of the same product (or at least the same product category) are
+best kept together, close to the pantry and low down.  The suggestion for
+a product is, in order of preference:
+
+    1. the nearest slot with room that already holds the product
+    2. the nearest slot with room that holds its product category
+    3. the nearest empty slot
+    4. the nearest slot with room
+
+"Nearest" follows the Row and Bin constraint descriptions: row 01 is
+nearest the pantry, odd rows number their bins from the pantry end and
+even rows from the far end.  Each level of a tier above the ground (the
+digit of the tier, 1 being the ground) counts as LEVEL_COST extra bins.
+
+The occupancy of every slot is kept in memory.  It is built with one
+query on first use and then updated from the box signals (once the
+transaction commits) as boxes are filled, moved and emptied in this
+process.  Other processes' changes are picked up when the index is older
+than REFRESH_SECONDS.
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from re import compile as re_compile
+from threading import RLock
+from time import monotonic
+from typing import Dict, List, Optional, Set
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from fpiweb.models import Box, Constraints, Product
+from fpiweb.occupancy import SlotKey, box_slot_change, location_number
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+DEFAULT_SLOTTING = {
+    # boxes that fit in one slot
+    'SLOT_CAPACITY': 30,
+
+    # extra cost (in bins) of each level above the ground
+    'LEVEL_COST': 2,
+}
+
+# seconds after which the index is rebuilt even if no change was seen here
+REFRESH_SECONDS = 5 * 60
+
+# level of a tier, e.g. the 2 of B2
+TIER_LEVEL_REGEX = re_compile(r'(\d+)')
+
+# why a slot was suggested
+SAME_PRODUCT = 'product'
+SAME_CATEGORY = 'category'
+EMPTY_SLOT = 'empty'
+FREE_SPACE = 'space'
+
+
+def get_slotting_settings() -> dict:
+    """
+    Combine the SLOTTING setting with the defaults.
+
+    :return: dictionary of slotting settings
+    """
+    config = dict(DEFAULT_SLOTTING)
+    config.update(getattr(settings, 'SLOTTING', {}))
+    return config
+
+
+def tier_level(tier: str) -> int:
+    """
+    Level of a tier, 1 being the ground.
+
+    :param tier: e.g. "B2"
+    :return: e.g. 2
+    """
+    match = TIER_LEVEL_REGEX.search(tier)
+    return int(match.group(1)) if match else 1
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    """
+    A slot suggested for a box, in the form MoveBoxForm accepts.
+    """
+    loc_row: str
+    loc_bin: str
+    loc_tier: str
+    reason: str
+    boxes: int
+
+
+class SlotIndex:
+    """
+    Number of boxes of each product in every slot.
+    """
+
+    def __init__(self, rows: List[int], bins: List[int], tiers: List[str],
+                 product_categories: Dict[int, int], level_cost: int):
+        self.product_categories = product_categories
+
+        # every slot, nearest the pantry first
+        bin_min, bin_max = min(bins), max(bins)
+
+        def distance(slot: SlotKey) -> tuple:
+            row, bin_, tier = slot
+            if row % 2:
+                bin_distance = bin_ - bin_min
+            else:
+                bin_distance = bin_max - bin_
+            walk = (row - rows[0]) + bin_distance
+            return walk + level_cost * (tier_level(tier) - 1), row, bin_, tier
+
+        self.ordered: List[SlotKey] = sorted(
+            ((row, bin_, tier) for row in rows for bin_ in bins
+             for tier in tiers),
+            key=distance,
+        )
+        self.rank: Dict[SlotKey, int] = {
+            slot: rank for rank, slot in enumerate(self.ordered)
+        }
+
+        self.boxes: Counter = Counter()
+        self.products: Dict[SlotKey, Counter] = defaultdict(Counter)
+        self.product_slots: Dict[int, Set[SlotKey]] = defaultdict(set)
+        self.category_slots: Dict[int, Counter] = defaultdict(Counter)
+
+    def add(self, slot: SlotKey, product_id: int, boxes: int = 1):
+        """
+        Record boxes of a product placed in a slot.
+
+        :param slot: (row, bin, tier)
+        :param product_id: product in the boxes
+        :param boxes: number of boxes
+        :return:
+        """
+        if slot not in self.rank:
+            return
+        self.boxes[slot] += boxes
+        self.products[slot][product_id] += boxes
+        self.product_slots[product_id].add(slot)
+        category_id = self.product_categories.get(product_id)
+        self.category_slots[category_id][slot] += boxes
+        return
+
+    def remove(self, slot: SlotKey, product_id: int, boxes: int = 1):
+        """
+        Record boxes of a product taken out of a slot.
+
+        :param slot: (row, bin, tier)
+        :param product_id: product in the boxes
+        :param boxes: number of boxes
+        :return:
+        """
+        if self.products.get(slot, {}).get(product_id, 0) < boxes:
+            return
+        self.boxes[slot] -= boxes
+        self.products[slot][product_id] -= boxes
+        if not self.products[slot][product_id]:
+            del self.products[slot][product_id]
+            self.product_slots[product_id].discard(slot)
+        category_id = self.product_categories.get(product_id)
+        self.category_slots[category_id][slot] -= boxes
+        if not self.category_slots[category_id][slot]:
+            del self.category_slots[category_id][slot]
+        return
+
+    def nearest(self, slots, capacity: int) -> Optional[SlotKey]:
+        """
+        The nearest of the slots that still has room.
+        """
+        with_room = [slot for slot in slots if self.boxes[slot] < capacity]
+        if not with_room:
+            return None
+        return min(with_room, key=self.rank.__getitem__)
+
+    def suggest(self, product_id: int, capacity: int,
+                limit: int = 3) -> List[Suggestion]:
+        """
+        Slots for a box of the product, best first.
+
+        :param product_id: product going into the box
+        :param capacity: boxes that fit in one slot
+        :param limit: most suggestions to return
+        :return: the suggested slots
+        """
+        suggestions: List[Suggestion] = list()
+        chosen: Set[SlotKey] = set()
+
+        def offer(slot: SlotKey, reason: str):
+            chosen.add(slot)
+            row, bin_, tier = slot
+            suggestions.append(Suggestion(
+                loc_row=str(row),
+                loc_bin=str(bin_),
+                loc_tier=tier,
+                reason=reason,
+                boxes=self.boxes[slot],
+            ))
+
+        category_id = self.product_categories.get(product_id)
+        for reason, slots in (
+                (SAME_PRODUCT, self.product_slots.get(product_id, ())),
+                (SAME_CATEGORY, self.category_slots.get(category_id, ()))):
+            slots = set(slots) - chosen
+            while slots and len(suggestions) < limit:
+                slot = self.nearest(slots, capacity)
+                if slot is None:
+                    break
+                offer(slot, reason)
+                slots.discard(slot)
+
+        # then the nearest slots with room, preferring empty ones
+        for reason, wanted in ((EMPTY_SLOT, 1), (FREE_SPACE, capacity)):
+            for slot in self.ordered:
+                if len(suggestions) >= limit:
+                    return suggestions
+                if slot not in chosen and self.boxes[slot] < wanted:
+                    offer(slot, reason)
+        return suggestions
+
+
+class SlotSuggester:
+    """
+    Process wide holder of the slot index.
+    """
+
+    def __init__(self):
+        self._index: Optional[SlotIndex] = None
+        self._built_at: float = 0.0
+        self._lock = RLock()
+
+    def invalidate(self):
+        """
+        Rebuild the index before the next suggestion.
+
+        :return:
+        """
+        self._index = None
+        return
+
+    def index(self) -> SlotIndex:
+        """
+        The current index, built from the database if need be.
+
+        :return: the index
+        """
+        with self._lock:
+            if self._index is None or \
+                    monotonic() - self._built_at > REFRESH_SECONDS:
+                self._index = self._build()
+                self._built_at = monotonic()
+            return self._index
+
+    @staticmethod
+    def _build() -> SlotIndex:
+        row_min, row_max = Constraints.get_values('Row')
+        bin_min, bin_max = Constraints.get_values('Bin')
+        index = SlotIndex(
+            rows=list(range(row_min, row_max + 1)),
+            bins=list(range(bin_min, bin_max + 1)),
+            tiers=Constraints.get_values('Tier'),
+            product_categories=dict(
+                Product.objects.order_by().values_list('id', 'prod_cat_id')),
+            level_cost=get_slotting_settings()['LEVEL_COST'],
+        )
+        counts = Box.objects \
+            .filter(product__isnull=False) \
+            .order_by() \
+            .values_list('loc_row', 'loc_bin', 'loc_tier', 'product_id') \
+            .annotate(boxes=Count('id'))
+        for loc_row, loc_bin, loc_tier, product_id, boxes in counts:
+            index.add(box_slot(loc_row, loc_bin, loc_tier), product_id, boxes)
+        return index
+
+    def suggest(self, product_id: int, limit: int = 3) -> List[Suggestion]:
+        """
+        Suggest slots for a newly filled box.
+
+        :param product_id: product in the box
+        :param limit: most suggestions to return
+        :return: the suggested slots, best first
+        """
+        capacity = get_slotting_settings()['SLOT_CAPACITY']
+        with self._lock:
+            return self.index().suggest(product_id, capacity, limit)
+
+    def box_changed(self, previous: Optional[tuple], current: Optional[tuple]):
+        """
+        Move a box in the index, if the index has been built.
+
+        :param previous: (row, bin, tier, product id) before, or None
+        :param current: (row, bin, tier, product id) now, or None
+        :return:
+        """
+        with self._lock:
+            index = self._index
+            if index is None or previous == current:
+                return
+            if previous:
+                index.remove(box_slot(*previous[:3]), previous[3])
+            if current:
+                if current[3] not in index.product_categories:
+                    # a product added since the index was built
+                    self.invalidate()
+                    return
+                index.add(box_slot(*current[:3]), current[3])
+        return
+
+
+def box_slot(loc_row, loc_bin, loc_tier) -> SlotKey:
+    """
+    Slot of a box location, with the row and bin as numbers.
+    """
+    return location_number(loc_row), location_number(loc_bin), loc_tier
+
+
+slot_suggester = SlotSuggester()
+
+
+@receiver(post_save, sender=Box)
+@receiver(post_delete, sender=Box)
+def update_slot_index(sender, instance: Box, signal, **kwargs):
+    """
+    Keep the slot index up to date as boxes are filled, moved and emptied.
+    """
+    previous, current = box_slot_change(instance, signal, **kwargs)
+    if previous != current:
+        transaction.on_commit(
+            lambda: slot_suggester.box_changed(previous, current))
+
+
+# EOF
@@ -0,0 +1,70 @@
+/*
+ * product_autocomplete.js - search for a product as the user types.
+ *
+ * Used by fpiweb.forms.ProductAutocompleteWidget.  The visible text input
+ * offers the best matches from the product search API in a datalist and
+ * copies the id of the chosen product into the hidden input that is
+ * submitted with the form.
+ */
+(function () {
+    'use strict';
+
+    // wait this long (ms) after the last key press before searching
+    var DELAY = 200;
+
+    // shortest text worth searching for
+    var MIN_LENGTH = 2;
+
+    function attach(input) {
+        var valueInput = document.getElementById(input.dataset.productValue);
+        var list = document.getElementById(input.getAttribute('list'));
+        var ids = {};
+        var timer = null;
+
+        function choose() {
+            var id = ids[input.value];
+            valueInput.value = id === undefined ? '' : id;
+        }
+
+        function show(products) {
+            ids = {};
+            list.innerHTML = '';
+            products.forEach(function (product) {
+                var option = document.createElement('option');
+                option.value = product.name;
+                list.appendChild(option);
+                ids[product.name] = product.id;
+            });
+            choose();
+        }
+
+        function search() {
+            var text = input.value.trim();
+            if (text.length < MIN_LENGTH) {
+                show([]);
+                return;
+            }
+            var url = input.dataset.productSearch +
+                '?q=' + encodeURIComponent(text);
+            fetch(url, {credentials: 'same-origin'})
+                .then(function (response) { return response.json(); })
+                .then(function (data) {
+                    // ignore answers to text the user has since changed
+                    if (input.value.trim() === text) {
+                        show(data.products || []);
+                    }
+                });
+        }
+
+        input.addEventListener('input', function () {
+            choose();
+            clearTimeout(timer);
+            timer = setTimeout(search, DELAY);
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        var inputs = document.querySelectorAll('[data-product-search]');
+        Array.prototype.forEach.call(inputs, attach);
+    });
+})();
@@ -0,0 +1,104 @@
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+from collections import Counter
+from datetime import date, timedelta
+
+from django.test import TestCase
+
+from fpiweb.activity_stats import percentile, rebuild_activity_stats, \
+    turnover_report, week_start
+from fpiweb.models import Activity, ActivityDuration, ActivityWeek
+
+# a Wednesday
+TODAY = date(2026, 10, 21)
+
+
+def consume(prod_name, prod_cat_name, days_ago, duration, quantity=10):
+    date_consumed = TODAY - timedelta(days=days_ago)
+    return Activity.objects.create(
+        box_number='BOX00001',
+        box_type='Evans',
+        loc_row='1',
+        loc_bin='1',
+        loc_tier='A1',
+        prod_name=prod_name,
+        prod_cat_name=prod_cat_name,
+        date_filled=date_consumed - timedelta(days=duration),
+        date_consumed=date_consumed,
+        duration=duration,
+        exp_year=2027,
+        quantity=quantity,
+    )
+
+
+def totals():
+    weeks = sorted(ActivityWeek.objects.filter(boxes__gt=0).values_list(
+        'week_start', 'prod_name', 'boxes', 'quantity', 'duration_total'))
+    durations = sorted(ActivityDuration.objects.filter(boxes__gt=0)
+                       .values_list('prod_name', 'duration', 'boxes'))
+    return weeks, durations
+
+
+class ActivityStatsTest(TestCase):
+
+    def test_percentile(self):
+        self.assertIsNone(percentile(Counter(), 90))
+        histogram = Counter({1: 5, 10: 4, 100: 1})
+        self.assertEqual(1, percentile(histogram, 50))
+        self.assertEqual(10, percentile(histogram, 90))
+        self.assertEqual(100, percentile(histogram, 91))
+        self.assertEqual(date(2026, 10, 19), week_start(TODAY))
+
+    def test_running_totals(self):
+        soup = consume('Tomato Soup', 'Soups', 2, 30)
+        consume('Tomato Soup', 'Soups', 1, 10, quantity=5)
+        beans = consume('Green Beans', 'Vegetables', 9, 20)
+        monday = date(2026, 10, 19)
+        self.assertEqual((
+            [
+                (monday - timedelta(weeks=1), 'Green Beans', 1, 10, 20),
+                (monday, 'Tomato Soup', 2, 15, 40),
+            ],
+            [
+                ('Green Beans', 20, 1),
+                ('Tomato Soup', 10, 1),
+                ('Tomato Soup', 30, 1),
+            ],
+        ), totals())
+
+        # edited and deleted activities are taken back out
+        soup.duration = 10
+        soup.save()
+        beans.delete()
+        self.assertEqual(
+            [('Tomato Soup', 10, 2)], totals()[1])
+
+        # rebuilding from the history gives the same totals
+        incremental = totals()
+        self.assertEqual(2, rebuild_activity_stats())
+        self.assertEqual(incremental, totals())
+
+    def test_report(self):
+        for duration in (5, 5, 5, 5, 5, 5, 5, 5, 5, 50):
+            consume('Tomato Soup', 'Soups', 7, duration)
+        consume('Chicken Soup', 'Soups', 14, 9)
+        consume('Green Beans', 'Vegetables', 100, 20)
+        # this week is not complete, so it is not averaged
+        consume('Green Beans', 'Vegetables', 0, 1)
+
+        with self.assertNumQueries(2):
+            products, categories = turnover_report(weeks=2, today=TODAY)
+        soup = products[0]
+        self.assertEqual(
+            ('Tomato Soup', 10, 9.5, 5, 5.0),
+            (soup.name, soup.boxes, soup.mean_days, soup.shelf_days,
+             soup.boxes_per_week),
+        )
+        self.assertEqual(
+            ['Soups', 'Vegetables'], [category.name for category in categories])
+        self.assertEqual(
+            (11, 9, 5.5), (categories[0].boxes, categories[0].shelf_days,
+                            categories[0].boxes_per_week))
+        self.assertEqual(0.0, categories[1].boxes_per_week)
@@ -0,0 +1,179 @@
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from fpiweb.models import Activity, Box, BoxType, Product, ProductExample
+
+
+class ApiTestCase(TestCase):
+
+    fixtures = ('Constraints', 'BoxType', 'ProductCategory', 'Product')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            'scanner', 'scanner@example.com', 'abc123')
+        box_type = BoxType.objects.get(box_type_code='Evans')
+        cls.empty_box = Box.objects.create(
+            box_number='BOX00001',
+            box_type=box_type,
+            quantity=box_type.box_type_qty,
+        )
+        cls.product = Product.objects.order_by('prod_name').first()
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def fill(self, box_number='BOX00001', **fields):
+        data = {
+            'product': self.product.pk,
+            # one of the years of the Expiration Year constraint
+            'exp_year': 2023,
+            'loc_row': '1',
+            'loc_bin': '2',
+            'loc_tier': 'A1',
+        }
+        data.update(fields)
+        return self.client.post(
+            reverse('fpiweb:api_box_fill', args=(box_number,)),
+            json.dumps(data),
+            content_type='application/json',
+        )
+
+
+class ApiBoxTest(ApiTestCase):
+
+    def test_lookup(self):
+        url = reverse('fpiweb:api_box', args=('box00001',))
+        response = self.client.get(url)
+        self.assertEqual(200, response.status_code)
+        box = response.json()['box']
+        self.assertEqual('BOX00001', box['box_number'])
+        self.assertEqual('Evans', box['box_type'])
+        self.assertIsNone(box['product'])
+
+        # the client already has this version of the box
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b'', response.content)
+
+    def test_lookup_errors(self):
+        response = self.client.get(
+            reverse('fpiweb:api_box', args=('BOX99999',)))
+        self.assertEqual(404, response.status_code)
+
+        response = self.client.get(reverse('fpiweb:api_box', args=('BOX1',)))
+        self.assertEqual(400, response.status_code)
+        self.assertIn('__all__', response.json()['errors'])
+
+        self.client.logout()
+        response = self.client.get(
+            reverse('fpiweb:api_box', args=('BOX00001',)))
+        self.assertEqual(401, response.status_code)
+
+    def test_fill_move_empty(self):
+        response = self.fill()
+        self.assertEqual(200, response.status_code)
+        box = response.json()['box']
+        self.assertEqual(self.product.pk, box['product'])
+        self.assertEqual('1', box['loc_row'])
+        self.assertIsNotNone(box['date_filled'])
+
+        response = self.client.post(
+            reverse('fpiweb:api_box_move', args=('BOX00001',)),
+            {'loc_row': '3', 'loc_bin': '4', 'loc_tier': 'B2'},
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('3', response.json()['box']['loc_row'])
+
+        response = self.client.post(
+            reverse('fpiweb:api_box_empty', args=('BOX00001',)))
+        self.assertEqual(200, response.status_code)
+        box = response.json()['box']
+        self.assertIsNone(box['product'])
+        self.assertIsNone(box['loc_row'])
+
+        activity = Activity.objects.get(box_number='BOX00001')
+        self.assertEqual(self.product.prod_name, activity.prod_name)
+        self.assertEqual('3', activity.loc_row)
+        self.assertEqual(0, activity.duration)
+
+    def test_no_precondition_on_changes(self):
+        self.fill()
+        # the move is saved, so its response is never a 412
+        response = self.client.post(
+            reverse('fpiweb:api_box_move', args=('BOX00001',)),
+            {'loc_row': '3', 'loc_bin': '4', 'loc_tier': 'B2'},
+            HTTP_IF_MATCH='"stale"',
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn('ETag', response)
+        self.assertEqual('3', Box.objects.get(box_number='BOX00001').loc_row)
+
+    def test_fill_uses_form_validation(self):
+        response = self.fill(
+            loc_row='99', exp_month_start=6, exp_month_end=2)
+        self.assertEqual(400, response.status_code)
+        errors = response.json()['errors']
+        self.assertIn('loc_row', errors)
+        self.assertIn('__all__', errors)
+        self.assertIsNone(Box.objects.get(pk=self.empty_box.pk).product)
+
+    def test_wrong_box_state(self):
+        response = self.client.post(
+            reverse('fpiweb:api_box_empty', args=('BOX00001',)))
+        self.assertEqual(400, response.status_code)
+
+        self.fill()
+        self.assertEqual(400, self.fill().status_code)
+
+
+class ApiListTest(ApiTestCase):
+
+    def test_product_search(self):
+        name = self.product.prod_name
+        response = self.client.get(
+            reverse('fpiweb:api_products'), {'q': name[1:4].lower()})
+        self.assertEqual(200, response.status_code)
+        self.assertIn(
+            {'id': self.product.pk, 'name': name},
+            response.json()['products'],
+        )
+
+        response = self.client.get(reverse('fpiweb:api_products'))
+        self.assertEqual([], response.json()['products'])
+
+    def search(self, text):
+        response = self.client.get(reverse('fpiweb:api_products'), {'q': text})
+        return [product['name'] for product in response.json()['products']]
+
+    def test_product_search_ranking(self):
+        names = self.search('tomato')
+        # names starting with the text come first
+        self.assertEqual(
+            ['Tomato Paste', 'Tomato Sauce', 'Tomato Soup'], names[:3])
+        self.assertIn('Crushed Tomatoes', names[3:])
+
+    def test_product_search_typo(self):
+        self.assertIn('Spaghetti', self.search('spagheti'))
+
+    def test_product_search_examples(self):
+        ProductExample.objects.create(
+            prod_example_name='Chunky Sirloin Burger',
+            prod_id=Product.objects.get(prod_name='Vegetable Beef Soup'),
+        )
+        self.assertEqual(['Vegetable Beef Soup'], self.search('sirloin'))
+
+    def test_constraints(self):
+        response = self.client.get(reverse('fpiweb:api_constraints'))
+        self.assertEqual(200, response.status_code)
+        constraints = response.json()['constraints']
+        self.assertEqual(2, len(constraints['Row']))
+        self.assertIn('A1', constraints['Tier'])
@@ -0,0 +1,120 @@
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+from unittest import mock
+
+from django.db import OperationalError, transaction
+from django.test import TransactionTestCase, override_settings
+
+from fpiweb.box_events import box_event_writer
+from fpiweb.models import Box, BoxEvent, BoxType, Product
+
+
+# Events are only queued once a transaction commits, so these tests need a
+# TransactionTestCase (a plain TestCase never commits).  They also write
+# the events at the end of the "request" rather than from the background
+# thread so the results can be checked right away.
+@override_settings(BOX_EVENT_LOG={'ASYNC': False, 'BATCH_SIZE': 100})
+class BoxEventTest(TransactionTestCase):
+
+    fixtures = ('BoxType', 'ProductCategory', 'Product')
+
+    def setUp(self):
+        box_event_writer.flush()
+        self.box = Box.objects.create(
+            box_number='BOX00001',
+            box_type=BoxType.objects.get(box_type_code='Evans'),
+        )
+
+    def test_events_are_queued_until_flushed(self):
+        self.assertFalse(BoxEvent.objects.exists())
+        self.assertEqual(1, box_event_writer.flush())
+
+        event = BoxEvent.objects.get()
+        self.assertEqual(self.box.pk, event.box_id)
+        self.assertEqual(BoxEvent.CREATED, event.event_type)
+
+    def test_failed_flush_kept_for_next(self):
+        with mock.patch.object(
+                BoxEvent.objects, 'bulk_create',
+                side_effect=OperationalError('connection lost')):
+            with self.assertLogs('fpiweb', 'ERROR'):
+                self.assertEqual(0, box_event_writer.flush())
+        self.assertFalse(BoxEvent.objects.exists())
+
+        self.assertEqual(1, box_event_writer.flush())
+        self.assertEqual(BoxEvent.CREATED, BoxEvent.objects.get().event_type)
+
+    def test_fill_move_empty(self):
+        product = Product.objects.get(prod_name='Corn')
+
+        box = Box.objects.get(pk=self.box.pk)
+        box.product = product
+        box.quantity = 20
+        box.save()
+
+        box.loc_row = '01'
+        box.loc_bin = '02'
+        box.loc_tier = 'A1'
+        box.save()
+
+        # saving again without changes is not logged
+        box.save()
+
+        box.product = None
+        box.save()
+
+        box_event_writer.flush()
+        events = list(
+            BoxEvent.objects
+            .filter(box_number=box.box_number)
+            .order_by('id')
+        )
+        self.assertEqual(
+            [
+                BoxEvent.CREATED,
+                BoxEvent.FILLED,
+                BoxEvent.MOVED,
+                BoxEvent.EMPTIED,
+            ],
+            [event.event_type for event in events],
+        )
+
+        filled = events[1]
+        self.assertEqual('Corn', filled.prod_name)
+        self.assertEqual([None, product.pk], filled.changes['product_id'])
+        self.assertEqual([None, 20], filled.changes['quantity'])
+
+        moved = events[2]
+        self.assertEqual(('01', '02', 'A1'),
+                         (moved.loc_row, moved.loc_bin, moved.loc_tier))
+
+    def test_rolled_back_changes_are_not_logged(self):
+        box_event_writer.flush()
+        try:
+            with transaction.atomic():
+                box = Box.objects.get(pk=self.box.pk)
+                box.loc_row = '03'
+                box.save()
+                raise RuntimeError('abandon the move')
+        except RuntimeError:
+            pass
+
+        self.assertEqual(0, box_event_writer.flush())
+
+    def test_delete(self):
+        box_number = self.box.box_number
+        self.box.delete()
+
+        box_event_writer.flush()
+        event_types = BoxEvent.objects \
+            .filter(box_number=box_number) \
+            .order_by('id') \
+            .values_list('event_type', flat=True)
+        self.assertEqual(
+            [BoxEvent.CREATED, BoxEvent.DELETED],
+            list(event_types),
+        )
+        self.assertFalse(
+            BoxEvent.objects.filter(box_id__isnull=False).exists())
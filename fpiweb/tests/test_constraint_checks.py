@@ -0,0 +1,89 @@
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TransactionTestCase
+
+from fpiweb.constraint_checks import drop_checks, existing_checks
+from fpiweb.models import Box, BoxType, Constraints
+
+
+# The checks are added with ALTER TABLE, which a TestCase would roll back
+# along with everything else but a TransactionTestCase does not, so they
+# are dropped after each test.
+class ConstraintChecksTest(TransactionTestCase):
+
+    fixtures = ('Constraints', 'BoxType')
+
+    def setUp(self):
+        cache.clear()
+        cache.check_version(force=True)
+        self.box_type = BoxType.objects.get(box_type_code='Evans')
+
+    def tearDown(self):
+        drop_checks()
+
+    def create_box(self, number, **fields):
+        return Box.objects.create(
+            box_number=f'BOX{number:05}', box_type=self.box_type, **fields)
+
+    def test_checks(self):
+        self.create_box(1, quantity=150)
+        out = StringIO()
+        call_command('constraint_checks', stdout=out)
+        self.assertIn('"quantity" BETWEEN 0 AND 100 (NOT VALID, 1 rows',
+                      out.getvalue())
+        self.assertIn('"exp_month_start" BETWEEN 1 AND 12 (valid)',
+                      out.getvalue())
+        self.assertEqual(8, len(existing_checks()))
+
+        for fields in ({'quantity': 101},
+                       {'exp_month_start': 5, 'exp_month_end': 3},
+                       {'exp_month_start': 5},
+                       {'exp_month_start': 12, 'exp_month_end': 13}):
+            with self.assertRaises(IntegrityError):
+                with transaction.atomic():
+                    self.create_box(2, **fields)
+        self.create_box(2, quantity=24, exp_month_start=3, exp_month_end=5)
+
+        # the checks follow the constraint once it is committed
+        quantity = Constraints.objects.get(constraint_name='Quantity Limit')
+        quantity.constraint_max = '200'
+        quantity.save()
+        self.create_box(3, quantity=180)
+        self.assertEqual(8, len(existing_checks()))
+
+        call_command('constraint_checks', stdout=StringIO())
+        self.assertTrue(all(
+            valid for _, valid in existing_checks().values()))
+
+    def test_narrowed_constraint_broken_by_existing_rows(self):
+        box = self.create_box(1, quantity=60)
+        call_command('constraint_checks', stdout=StringIO())
+        box_checks = {
+            name for name, (table, _) in existing_checks().items()
+            if table == 'fpiweb_box'}
+
+        quantity = Constraints.objects.get(constraint_name='Quantity Limit')
+        quantity.constraint_max = '50'
+        with self.assertLogs('fpiweb', 'WARNING'):
+            quantity.save()
+        # the old check of the box quantity is kept, so the box can still
+        # be moved
+        self.assertEqual(box_checks, {
+            name for name, (table, _) in existing_checks().items()
+            if table == 'fpiweb_box'})
+        box.loc_row = '02'
+        box.save()
+
+        box.quantity = 40
+        box.save()
+        call_command('constraint_checks', stdout=StringIO())
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                self.create_box(2, quantity=60)
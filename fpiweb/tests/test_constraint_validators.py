@@ -0,0 +1,106 @@
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from fpiweb.constraint_validators import QUANTITY, RangeValidator, \
+    SetValidator, constraint_validators, invalidate_constraint_validators
+from fpiweb.forms import BoxBulkEditForm, FillBoxForm, MoveBoxForm
+from fpiweb.models import Constraints, Product
+
+
+class ConstraintValidatorsTest(TestCase):
+
+    fixtures = ('Constraints', 'BoxType', 'ProductCategory', 'Product')
+
+    def setUp(self):
+        cache.clear()
+        cache.check_version(force=True)
+
+    def test_compiled_once(self):
+        with self.assertNumQueries(1):
+            validators = constraint_validators()
+        with self.assertNumQueries(0):
+            self.assertIs(validators, constraint_validators())
+
+        row = validators.get('row')
+        self.assertIsInstance(row, RangeValidator)
+        self.assertIn('04', row)
+        self.assertIn(1, row)
+        self.assertNotIn('05', row)
+        self.assertNotIn('A', row)
+
+        tier = validators.get('Tier')
+        self.assertIsInstance(tier, SetValidator)
+        self.assertEqual(frozenset(('A1', 'A2', 'B1', 'B2', 'C1', 'C2')),
+                         tier.members)
+        self.assertEqual([('1', '1'), ('2', '2'), ('3', '3'), ('4', '4')],
+                         validators.choices('Row'))
+
+        self.assertEqual(
+            {'quantity': 'Quantity Limit must be from 0 to 100',
+             'exp_month_end': 'Expiration Month must be from 1 to 12'},
+            validators.box_errors({
+                'quantity': 101, 'exp_year': 2020, 'exp_month_start': 1,
+                'exp_month_end': 13, 'loc_tier': None}),
+        )
+
+    def test_forms(self):
+        product = Product.objects.first()
+        form = FillBoxForm({'product': product.pk, 'exp_year': 2030})
+        self.assertFalse(form.is_valid())
+        self.assertIn('exp_year', form.errors)
+        form = FillBoxForm({'product': product.pk, 'exp_year': 2021})
+        self.assertTrue(form.is_valid(), form.errors)
+
+        form = MoveBoxForm({'loc_row': '5', 'loc_bin': '1', 'loc_tier': 'A1'})
+        self.assertEqual(['loc_row'], list(form.errors))
+
+        form = BoxBulkEditForm({'quantity': 120, 'exp_year': 2018})
+        self.assertFalse(form.is_valid())
+        self.assertEqual(
+            [QUANTITY + ' must be from 0 to 100'], form.errors['quantity'])
+        self.assertIn('exp_year', form.errors)
+
+
+class ConstraintChangeTest(TransactionTestCase):
+
+    fixtures = ('Constraints',)
+
+    def setUp(self):
+        cache.clear()
+        cache.check_version(force=True)
+
+    def test_recompiled_on_change(self):
+        validators = constraint_validators()
+        self.assertNotIn(150, validators.get(QUANTITY))
+
+        quantity = Constraints.objects.get(constraint_name=QUANTITY)
+        quantity.constraint_max = '200'
+        quantity.save()
+
+        validators = constraint_validators()
+        self.assertIn(150, validators.get(QUANTITY))
+        self.assertEqual({}, validators.box_errors({'quantity': 150}))
+
+    def test_change_committed_while_read(self):
+        def commit_change(execute, sql, params, many, context):
+            result = execute(sql, params, many, context)
+            if 'FROM "fpiweb_constraints"' in sql:
+                # another process commits a change once the rows are read
+                Constraints.objects.filter(constraint_name=QUANTITY) \
+                    .update(constraint_max='200')
+                invalidate_constraint_validators()
+            return result
+
+        with connection.execute_wrapper(commit_change):
+            validators = constraint_validators()
+        self.assertNotIn(150, validators.get(QUANTITY))
+        # the rows read before the change were not kept
+        self.assertIn(150, constraint_validators().get(QUANTITY))
+
+
+# EOF
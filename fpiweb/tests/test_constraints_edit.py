@@ -0,0 +1,172 @@
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from fpiweb.constraints_edit import apply_constraints, check_constraints
+from fpiweb.models import Box, BoxType, Constraints
+from fpiweb.occupancy import OCCUPANCY_FRAGMENT
+
+
+def create_boxes():
+    box_type = BoxType.objects.get(box_type_code='Evans')
+    placed = (
+        ('01', '02', 'A1'),
+        ('04', '09', 'C2'),
+        ('4', '01', 'B1'),
+        ('03', '05', 'B2'),
+        (None, None, None),
+    )
+    Box.objects.bulk_create([
+        Box(
+            box_number=f'BOX{number:05}',
+            box_type=box_type,
+            loc_row=loc_row,
+            loc_bin=loc_bin,
+            loc_tier=loc_tier,
+        )
+        for number, (loc_row, loc_bin, loc_tier) in enumerate(placed, 1)
+    ])
+    return
+
+
+class ConstraintsEditTest(TestCase):
+
+    fixtures = ('Constraints', 'BoxType')
+
+    @classmethod
+    def setUpTestData(cls):
+        create_boxes()
+        cls.user = User.objects.create_user(
+            'constraints', 'constraints@example.com', 'abc123')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = reverse('fpiweb:constraints_bulk_edit')
+        self.constraints = list(Constraints.objects.order_by('pk'))
+
+    def post_data(self, **changes):
+        """
+        The rows of the page as posted, with changes by constraint name.
+        """
+        data = {
+            'form-TOTAL_FORMS': len(self.constraints),
+            'form-INITIAL_FORMS': len(self.constraints),
+            'form-MIN_NUM_FORMS': 0,
+            'form-MAX_NUM_FORMS': 1000,
+        }
+        for number, constraint in enumerate(self.constraints):
+            values = {
+                'constraint_type': constraint.constraint_type,
+                'constraint_min': constraint.constraint_min or '',
+                'constraint_max': constraint.constraint_max or '',
+                'constraint_list': constraint.constraint_list or '',
+            }
+            values.update(changes.get(constraint.constraint_name, {}))
+            data[f'form-{number}-id'] = constraint.pk
+            for name, value in values.items():
+                data[f'form-{number}-{name}'] = value
+        return data
+
+    def test_check_one_query_per_constraint(self):
+        row = Constraints.objects.get(constraint_name='Row')
+        row.constraint_max = '03'
+        tier = Constraints.objects.get(constraint_name='Tier')
+        tier.constraint_list = 'A1, A2, B1, B2'
+        year = Constraints.objects.get(constraint_name='Expiration Year')
+        year.constraint_list = '2020'
+
+        with self.assertNumQueries(2):
+            impacts = check_constraints([row, tier, year])
+
+        self.assertEqual(['Row', 'Tier'],
+                         [impact.constraint_name for impact in impacts])
+        self.assertEqual(2, impacts[0].boxes)
+        self.assertEqual(['BOX00002', 'BOX00003'], impacts[0].box_numbers)
+        self.assertEqual(['04', '4'], impacts[0].values)
+        self.assertEqual(['BOX00002'], impacts[1].box_numbers)
+
+    def test_check_box_values(self):
+        Box.objects.filter(box_number='BOX00001').update(quantity=60)
+        Box.objects.filter(box_number='BOX00002').update(
+            quantity=20, exp_month_start=2, exp_month_end=11)
+        quantity = Constraints.objects.get(constraint_name='Quantity Limit')
+        quantity.constraint_max = '50'
+        month = Constraints.objects.get(constraint_name='Expiration Month')
+        month.constraint_min = '3'
+
+        with self.assertNumQueries(2):
+            impacts = check_constraints([quantity, month])
+
+        self.assertEqual(['BOX00001'], impacts[0].box_numbers)
+        self.assertEqual([60], impacts[0].values)
+        self.assertEqual(['BOX00002'], impacts[1].box_numbers)
+        self.assertEqual([2], impacts[1].values)
+
+    def test_preview_and_refuse_stranded(self):
+        changes = {'Row': {'constraint_max': '03'}}
+
+        response = self.client.post(self.url, self.post_data(**changes))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, response.context['impacts'][0].boxes)
+        self.assertContains(response, 'BOX00003')
+
+        # applying needs the stranded boxes to be accepted
+        data = self.post_data(**changes)
+        data['apply'] = 'Apply Changes'
+        response = self.client.post(self.url, data)
+        self.assertIsNone(response.context['saved'])
+        self.assertEqual(
+            '04', Constraints.objects.get(constraint_name='Row').constraint_max)
+
+        data['accept_stranded'] = 'on'
+        response = self.client.post(self.url, data)
+        self.assertEqual(1, response.context['saved'])
+        self.assertEqual(
+            '03', Constraints.objects.get(constraint_name='Row').constraint_max)
+
+    def test_dependency_validation(self):
+        response = self.client.post(self.url, self.post_data(
+            Row={'constraint_type': Constraints.CHAR_LIST,
+                 'constraint_list': '01, 02'},
+            Bin={'constraint_min': '09', 'constraint_max': '01'},
+        ))
+        self.assertFalse(response.context['formset'].is_valid())
+        self.assertContains(response, 'Row must stay')
+        self.assertContains(
+            response, 'The minimum must not be more than the maximum')
+        self.assertEqual(
+            Constraints.INT_RANGE,
+            Constraints.objects.get(constraint_name='Row').constraint_type)
+
+
+class ConstraintsApplyTest(TransactionTestCase):
+
+    fixtures = ('Constraints', 'BoxType')
+
+    def setUp(self):
+        create_boxes()
+        cache.clear()
+        cache.check_version(force=True)
+
+    def test_apply_refreshes_occupancy(self):
+        key = make_template_fragment_key(OCCUPANCY_FRAGMENT)
+        cache.set(key, 'map')
+        bin_ = Constraints.objects.get(constraint_name='Bin')
+        bin_.constraint_max = '12'
+        tier = Constraints.objects.get(constraint_name='Tier')
+        tier.constraint_list = 'A1, A2, B1, B2, C1, C2, D1'
+
+        saved, impacts = apply_constraints([bin_, tier])
+
+        self.assertEqual((2, []), (saved, impacts))
+        self.assertEqual(
+            '12', Constraints.objects.get(constraint_name='Bin').constraint_max)
+        self.assertIsNone(cache.get(key))
+
+# EOF
@@ -0,0 +1,35 @@
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TransactionTestCase
+
+from fpiweb.db_connections import check_persistent_connections
+
+
+# A TestCase runs in a transaction, where the check is never made.
+class HealthCheckTest(TransactionTestCase):
+
+    def test_checked_before_first_use(self):
+        connection.ensure_connection()
+        with mock.patch.object(
+                connection, 'is_usable', return_value=True) as is_usable:
+            check_persistent_connections(sender=None)
+            # nothing is sent to the database at the start of a request
+            self.assertEqual(0, is_usable.call_count)
+            User.objects.count()
+            User.objects.count()
+        self.assertEqual(1, is_usable.call_count)
+
+    def test_unusable_connection_replaced(self):
+        connection.ensure_connection()
+        broken = connection.connection
+        with mock.patch.object(connection, 'is_usable', return_value=False):
+            check_persistent_connections(sender=None)
+            with self.assertLogs('fpiweb', 'WARNING'):
+                self.assertEqual(0, User.objects.count())
+        self.assertIsNot(broken, connection.connection)
@@ -0,0 +1,89 @@
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+from django.test import TestCase, TransactionTestCase
+
+from fpiweb.example_lookup import example_lookup, name_words
+from fpiweb.models import Product, ProductExample
+
+
+def create_examples():
+    soup = Product.objects.get(prod_name='Tomato Soup')
+    sauce = Product.objects.get(prod_name='Tomato Sauce')
+    ProductExample.objects.bulk_create([
+        ProductExample(
+            prod_example_name="Campbell's Tomato", prod_id=soup),
+        ProductExample(
+            prod_example_name='Hunts Tomato Sauce', prod_id=sauce),
+        ProductExample(
+            prod_example_name='Tomato Bisque', prod_id=soup),
+    ])
+    return soup, sauce
+
+
+def names(text):
+    return [
+        example.prod_example_name
+        for example in example_lookup.lookup(text)
+    ]
+
+
+class ExampleLookupTest(TestCase):
+
+    fixtures = ('ProductCategory', 'Product')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.soup, cls.sauce = create_examples()
+
+    def setUp(self):
+        example_lookup.invalidate()
+
+    def test_name_words(self):
+        self.assertEqual(
+            ['campbells', 'chicken', 'stars'],
+            name_words("Campbell's Chicken & Stars"),
+        )
+
+    def test_lookup(self):
+        # names starting with the text come first
+        self.assertEqual(
+            ['Tomato Bisque', "Campbell's Tomato", 'Hunts Tomato Sauce'],
+            names('tom'),
+        )
+        self.assertEqual(["Campbell's Tomato"], names('CAMPBELLS'))
+        self.assertEqual(['Hunts Tomato Sauce'], names('sau tom'))
+        self.assertEqual([], names('beans'))
+
+        match = example_lookup.lookup('bisque')[0]
+        self.assertEqual(self.soup.pk, match.prod_id)
+        self.assertEqual('Tomato Soup', match.prod_name)
+
+
+# The trie is rebuilt once a change is committed, which a plain TestCase
+# never does.
+class ExampleLookupChangeTest(TransactionTestCase):
+
+    fixtures = ('ProductCategory', 'Product')
+
+    def setUp(self):
+        self.soup, self.sauce = create_examples()
+        example_lookup.invalidate()
+
+    def tearDown(self):
+        example_lookup.invalidate()
+
+    def test_refreshed_on_change(self):
+        self.assertEqual([], names('progresso'))
+        example = ProductExample.objects.create(
+            prod_example_name='Progresso Tomato', prod_id=self.soup)
+        self.assertEqual(['Progresso Tomato'], names('progresso'))
+
+        example.prod_id = self.sauce
+        example.save()
+        self.assertEqual(
+            'Tomato Sauce', example_lookup.lookup('progresso')[0].prod_name)
+
+        example.delete()
+        self.assertEqual([], names('progresso'))
@@ -0,0 +1,93 @@
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+from datetime import date, timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.test import TransactionTestCase
+
+from fpiweb.forecast import build_forecast, demand_forecast, fit_forecast
+from fpiweb.models import Activity, ActivityWeek
+
+# a Monday in November, so the forecast is for December
+TODAY = date(2026, 11, 2)
+
+
+def weekly(prod_name, boxes_for_week, weeks=104):
+    """
+    Weekly totals of a product for the weeks before TODAY.
+    """
+    rows = list()
+    for week in range(1, weeks + 1):
+        week_start = TODAY - timedelta(weeks=week)
+        boxes = boxes_for_week(week_start)
+        if boxes:
+            rows.append(ActivityWeek(
+                week_start=week_start,
+                prod_cat_name='Soups',
+                prod_name=prod_name,
+                boxes=boxes,
+            ))
+    ActivityWeek.objects.bulk_create(rows)
+
+
+class DemandForecastTest(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        cache.check_version(force=True)
+
+    def test_fit(self):
+        # two products, 24 weeks, the second busy in month 11 (December)
+        week_months = np.repeat(np.arange(6, 12), 4)
+        boxes = np.vstack([
+            np.full(24, 2.0),
+            np.where(week_months == 11, 6.0, 1.0),
+        ])
+        forecast, level, factor = fit_forecast(boxes, week_months, 11, 4.0)
+        self.assertAlmostEqual(8.0, forecast[0])
+        self.assertEqual(1.0, factor[0])
+        self.assertGreater(factor[1], 1.5)
+        self.assertGreater(forecast[1], 4 * 2.0)
+
+        # a product first used two weeks ago is not averaged with zeros
+        boxes = np.hstack([np.zeros(22), [3.0, 3.0]])[np.newaxis, :]
+        forecast, level, factor = fit_forecast(boxes, week_months, 0, 4.0)
+        self.assertAlmostEqual(3.0, level[0])
+
+    def test_forecast(self):
+        weekly('Tomato Soup', lambda week: 3)
+        weekly('Chicken Soup', lambda week: 10 if week.month == 12 else 1)
+        weekly('New Soup', lambda week: 2, weeks=4)
+
+        with self.assertNumQueries(1):
+            forecast = build_forecast(TODAY)
+        self.assertEqual(date(2026, 12, 1), forecast.month)
+        self.assertEqual(104, forecast.history_weeks)
+
+        products = {
+            product.prod_name: product for product in forecast.products}
+        self.assertEqual(['Chicken Soup', 'Tomato Soup', 'New Soup'], [
+            product.prod_name for product in forecast.products])
+        # 31 days of December
+        self.assertEqual(14, products['Tomato Soup'].boxes_needed)
+        self.assertEqual(9, products['New Soup'].boxes_needed)
+        self.assertGreater(products['Chicken Soup'].seasonal_factor, 3)
+
+    def test_cached_until_activity(self):
+        weekly('Tomato Soup', lambda week: 3)
+        today = date.today()
+        forecast = demand_forecast(today)
+        with self.assertNumQueries(0):
+            self.assertEqual(forecast, demand_forecast(today))
+
+        Activity.objects.create(
+            box_number='BOX00001', box_type='Evans', loc_row='1',
+            loc_bin='1', loc_tier='A1', prod_name='Tomato Soup',
+            prod_cat_name='Soups', date_filled=today, date_consumed=today,
+            duration=0, exp_year=2027)
+        # the weekly totals only, caching it again moves no counter
+        with self.assertNumQueries(1):
+            demand_forecast(today)
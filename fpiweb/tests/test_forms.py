@@ -5,8 +5,8 @@ __creation_date__ = "06/03/2019"
 
 from django.test import TestCase
 
-from fpiweb.forms import NewBoxForm
-from fpiweb.models import Box, BoxType
+from fpiweb.forms import FillBoxForm, NewBoxForm
+from fpiweb.models import Box, BoxType, Product
 
 
 class NewBoxFormTest(TestCase):
@@ -35,8 +35,17 @@ class NewBoxFormTest(TestCase):
         self.assertEqual(box_type.box_type_qty, box.quantity)
 
 
+class FillBoxFormTest(TestCase):
 
+    fixtures = ('BoxType', 'Constraints', 'ProductCategory', 'Product')
 
+    def test_product_widget(self):
+        product = Product.objects.get(prod_name='Tomato Soup')
+        form = FillBoxForm(initial={'product': product.pk})
+        html = str(form['product'])
 
-
-
+        # only the chosen product is rendered, not a list of every product
+        self.assertNotIn('<option', html)
+        self.assertIn('value="Tomato Soup"', html)
+        self.assertIn(f'value="{product.pk}"', html)
+        self.assertIn('fpiweb/product_autocomplete.js', str(form.media))
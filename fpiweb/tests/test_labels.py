@@ -0,0 +1,170 @@
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+import re
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from fpiweb.labels import claim_label_job, free_box_numbers, \
+    process_label_jobs, queue_label_job, requeue_abandoned_label_jobs, \
+    reserve_box_numbers
+from fpiweb.models import Box, BoxNumber, BoxType, LabelJob, \
+    ReservedBoxNumber
+
+
+def pdf_pages(data: bytes) -> int:
+    """ Number of pages of a PDF. """
+    return len(re.findall(rb'/Type /Page\b(?!s)', data))
+
+
+class LabelPrintTest(TestCase):
+
+    fixtures = ('BoxType',)
+
+    def setUp(self):
+        user = User.objects.create_user(
+            'labels', 'labels@example.com', 'abc123')
+        self.client.force_login(user)
+        box_type = BoxType.objects.get(box_type_code='Evans')
+        for number in (2, 3, 5):
+            Box.objects.create(
+                box_number=BoxNumber.format_box_number(number),
+                box_type=box_type)
+        self.url = reverse('fpiweb:label_print')
+
+    def test_free_box_numbers(self):
+        self.assertEqual([1, 4, 6, 7], list(free_box_numbers(1, 4)))
+        self.assertEqual([99998, 99999], list(free_box_numbers(99998, 3)))
+
+    def test_reserve_box_numbers(self):
+        self.assertEqual([1, 4], reserve_box_numbers(1, 2))
+        # reserved numbers are not handed out again
+        self.assertEqual([6, 7], reserve_box_numbers(1, 2))
+        self.assertEqual([8], list(free_box_numbers(1, 1)))
+        self.assertEqual(4, ReservedBoxNumber.objects.count())
+
+    def test_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(6, response.context['form'].initial['start'])
+
+    def test_streams_pdf(self):
+        response = self.client.post(
+            self.url, {'start': 1, 'count': 13, 'layout': 'letter-3x4'})
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.streaming)
+        self.assertEqual('application/pdf', response['Content-Type'])
+
+        chunks = list(response.streaming_content)
+        # the first page is sent on its own, as soon as it is full
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(1, pdf_pages(chunks[0]))
+        data = b''.join(chunks)
+        self.assertTrue(data.startswith(b'%PDF-'))
+        self.assertTrue(data.rstrip().endswith(b'%%EOF'))
+        self.assertEqual(2, pdf_pages(data))
+        # the QR codes are drawn, not embedded as images
+        self.assertNotIn(b'/Subtype /Image', data)
+        # and every label shares one frame
+        self.assertEqual(1, data.count(b'/Subtype /Form'))
+
+    def test_roll(self):
+        response = self.client.post(
+            self.url, {'start': 1, 'count': 3, 'layout': 'thermal-2x2'})
+        self.assertEqual(3, pdf_pages(b''.join(response.streaming_content)))
+
+    def test_print_reserves_numbers(self):
+        response = self.client.post(
+            self.url, {'start': 1, 'count': 2, 'layout': 'letter-3x4'})
+        b''.join(response.streaming_content)
+        self.assertEqual(
+            ['BOX00001', 'BOX00004'],
+            list(ReservedBoxNumber.objects.values_list(
+                'box_number', flat=True)))
+
+    def test_invalid(self):
+        response = self.client.post(
+            self.url, {'start': 1, 'count': 0, 'layout': 'letter-3x4'})
+        self.assertEqual(200, response.status_code)
+        self.assertIn('count', response.context['form'].errors)
+
+
+class LabelJobTest(TestCase):
+
+    fixtures = ('BoxType',)
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'labeljobs', 'label.jobs@example.com', 'abc123')
+        self.client.force_login(self.user)
+        box_type = BoxType.objects.get(box_type_code='Evans')
+        Box.objects.create(box_number='BOX00002', box_type=box_type)
+
+    def test_background_job(self):
+        response = self.client.post(reverse('fpiweb:label_print'), {
+            'start': 1, 'count': 13, 'layout': 'letter-3x4',
+            'background': 'Print in the Background',
+        })
+        self.assertRedirects(response, reverse('fpiweb:label_jobs'))
+
+        label_job = LabelJob.objects.get()
+        self.assertEqual(LabelJob.PENDING, label_job.status)
+        self.assertEqual(self.user, label_job.requested_by)
+        self.assertEqual(
+            (13, 'BOX00001', 'BOX00014'),
+            (label_job.label_count, label_job.first_box_number,
+             label_job.last_box_number))
+        self.assertEqual(
+            13, ReservedBoxNumber.objects.filter(label_job=label_job).count())
+
+        response = self.client.get(reverse('fpiweb:label_jobs'))
+        self.assertContains(response, 'Waiting for a worker')
+
+        self.assertEqual(1, process_label_jobs())
+        self.assertEqual(0, process_label_jobs())
+        label_job.refresh_from_db()
+        self.assertEqual(LabelJob.DONE, label_job.status)
+        self.assertIsNotNone(label_job.finished)
+
+        download = reverse('fpiweb:label_job_download', args=(label_job.pk,))
+        response = self.client.get(reverse('fpiweb:label_jobs'))
+        self.assertContains(response, download)
+        response = self.client.get(download)
+        self.assertEqual('application/pdf', response['Content-Type'])
+        self.assertEqual(2, pdf_pages(response.content))
+
+    def test_jobs_do_not_share_numbers(self):
+        first = queue_label_job(1, 3, 'letter-3x4', 'http://x/box')
+        second = queue_label_job(1, 3, 'letter-3x4', 'http://x/box')
+        self.assertEqual(('BOX00001', 'BOX00004'),
+                         (first.first_box_number, first.last_box_number))
+        self.assertEqual(('BOX00005', 'BOX00007'),
+                         (second.first_box_number, second.last_box_number))
+
+    def test_failed_job(self):
+        label_job = queue_label_job(1, 1, 'no-such-layout', 'http://x/box')
+        self.assertEqual(1, process_label_jobs())
+        label_job.refresh_from_db()
+        self.assertEqual(LabelJob.FAILED, label_job.status)
+        self.assertIn('no-such-layout', label_job.error)
+        response = self.client.get(
+            reverse('fpiweb:label_job_download', args=(label_job.pk,)))
+        self.assertEqual(404, response.status_code)
+
+    def test_requeue_abandoned(self):
+        label_job = queue_label_job(1, 1, 'letter-3x4', 'http://x/box')
+        self.assertEqual(label_job, claim_label_job())
+        self.assertIsNone(claim_label_job())
+        self.assertEqual(0, requeue_abandoned_label_jobs())
+
+        LabelJob.objects.update(started=timezone.now() - timedelta(hours=1))
+        self.assertEqual(1, requeue_abandoned_label_jobs())
+        self.assertEqual(label_job, claim_label_job())
+
+
+# EOF
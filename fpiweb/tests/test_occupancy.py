@@ -0,0 +1,101 @@
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from fpiweb.models import Box, BoxType, Product
+from fpiweb.occupancy import build_occupancy
+
+
+class OccupancyTest(TestCase):
+
+    fixtures = ('Constraints', 'BoxType', 'ProductCategory', 'Product')
+
+    @classmethod
+    def setUpTestData(cls):
+        box_type = BoxType.objects.get(box_type_code='Evans')
+        cls.soup = Product.objects.get(prod_name='Tomato Soup')
+        cls.corn = Product.objects.get(prod_name='Corn')
+        placed = (
+            # the same slot written two ways
+            ('01', '02', 'A1', cls.soup),
+            ('1', '2', 'A1', cls.soup),
+            ('01', '02', 'A1', cls.corn),
+            ('04', '09', 'C2', cls.corn),
+            # not a valid slot
+            ('99', '02', 'A1', cls.corn),
+            # empty box
+            (None, None, None, None),
+        )
+        Box.objects.bulk_create([
+            Box(
+                box_number=f'BOX{number:05}',
+                box_type=box_type,
+                loc_row=loc_row,
+                loc_bin=loc_bin,
+                loc_tier=loc_tier,
+                product=product,
+            )
+            for number, (loc_row, loc_bin, loc_tier, product)
+            in enumerate(placed, 1)
+        ])
+        cls.user = User.objects.create_user(
+            'manager', 'manager@example.com', 'abc123')
+
+    def setUp(self):
+        cache.clear()
+        cache.check_version(force=True)
+
+    def test_build_occupancy(self):
+        with self.assertNumQueries(4):
+            occupancy = build_occupancy()
+
+        self.assertEqual(4 * 9 * 6, occupancy.slot_count)
+        self.assertEqual(4, occupancy.box_count)
+        self.assertEqual(1, occupancy.unplaced)
+
+        slot = occupancy.slots[(1, 2, 'A1')]
+        self.assertEqual(3, slot.count)
+        self.assertEqual('Tomato Soup', slot.prod_name)
+        self.assertEqual('Corn', occupancy.slots[(4, 9, 'C2')].prod_name)
+
+        row, tiers = occupancy.grid[0]
+        tier, slots = tiers[0]
+        self.assertEqual((1, 'A1'), (row, tier))
+        self.assertIsNone(slots[0])
+        self.assertIs(slot, slots[1])
+
+    def test_deferred_load_runs_one_query(self):
+        # the values remembered for the signal receivers are only those
+        # loaded, so deferred fields are not read one box at a time
+        with self.assertNumQueries(1):
+            boxes = list(Box.objects.only('box_number'))
+        self.assertEqual({'box_number'}, set(boxes[0].loaded_values))
+
+    def test_view_cached_until_move(self):
+        self.client.force_login(self.user)
+        url = reverse('fpiweb:occupancy_map')
+
+        response = self.client.get(url)
+        self.assertContains(response, 'title="Tomato Soup"')
+
+        # the grid comes from the cache
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+        # editing a box without moving it keeps the cached grid
+        box = Box.objects.get(box_number='BOX00004')
+        box.quantity = 12
+        box.save()
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+        box.loc_tier = 'B1'
+        box.save()
+        response = self.client.get(url)
+        self.assertNotIn((4, 9, 'C2'), build_occupancy().slots)
+        self.assertContains(response, '4 boxes in 2 of 216 slots')
@@ -0,0 +1,142 @@
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+import json
+
+from django.contrib.auth.models import User
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from fpiweb.box_events import box_event_writer
+from fpiweb.forms import PalletMoveForm
+from fpiweb.models import Box, BoxEvent, BoxType, Product
+from fpiweb.occupancy import build_occupancy
+from fpiweb.pallet import move_pallet
+from fpiweb.slotting import SAME_PRODUCT, slot_suggester
+
+
+class PalletMoveTest(TransactionTestCase):
+
+    fixtures = ('Constraints', 'BoxType', 'ProductCategory', 'Product')
+
+    def setUp(self):
+        slot_suggester.invalidate()
+        box_type = BoxType.objects.get(box_type_code='Evans')
+        self.product = Product.objects.get(prod_name='Tomato Soup')
+        for number, row in enumerate(('01', '1', '1', '2'), 1):
+            Box.objects.create(
+                box_number=f'BOX0000{number}', box_type=box_type,
+                product=self.product, loc_row=row, loc_bin='2',
+                loc_tier='A1')
+        Box.objects.create(box_number='BOX00005', box_type=box_type)
+        # only the events of the moves are checked
+        box_event_writer.flush()
+        BoxEvent.objects.all().delete()
+
+    def tearDown(self):
+        slot_suggester.invalidate()
+
+    def move(self, **data):
+        form = PalletMoveForm(data)
+        self.assertTrue(form.is_valid(), form.errors)
+        return move_pallet(form.cleaned_data)
+
+    def locations(self):
+        return list(
+            Box.objects
+            .filter(product__isnull=False)
+            .values_list('box_number', 'loc_row', 'loc_bin', 'loc_tier')
+        )
+
+    def test_form(self):
+        destination = {'loc_row': '3', 'loc_bin': '4', 'loc_tier': 'B1'}
+        for data in (
+                destination,
+                dict(destination, from_row='1'),
+                dict(destination, from_row='1', from_bin='2',
+                     from_tier='A1', box_numbers='BOX00001'),
+                dict(destination, box_numbers='BOX00001 BOX1')):
+            self.assertFalse(PalletMoveForm(data).is_valid(), data)
+
+        form = PalletMoveForm(
+            dict(destination, box_numbers='box00001,BOX00002\nbox00001'))
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(
+            ['BOX00001', 'BOX00002'], form.cleaned_data['box_numbers'])
+
+    def test_move_slot(self):
+        self.assertEqual(
+            SAME_PRODUCT, slot_suggester.suggest(self.product.pk)[0].reason)
+        build_occupancy()
+
+        result = self.move(from_row='1', from_bin='2', from_tier='A1',
+                           loc_row='3', loc_bin='4', loc_tier='B1')
+        self.assertEqual((3, 0, 0, []), (
+            result.moved, result.unchanged, result.empty, result.missing))
+        self.assertEqual([
+            ('BOX00001', '3', '4', 'B1'),
+            ('BOX00002', '3', '4', 'B1'),
+            ('BOX00003', '3', '4', 'B1'),
+            ('BOX00004', '2', '2', 'A1'),
+        ], self.locations())
+
+        events = BoxEvent.objects.order_by('box_number')
+        self.assertEqual(3, len(events))
+        self.assertEqual(BoxEvent.MOVED, events[0].event_type)
+        self.assertEqual('Tomato Soup', events[0].prod_name)
+        self.assertEqual({
+            'loc_row': ['01', '3'],
+            'loc_bin': ['2', '4'],
+            'loc_tier': ['A1', 'B1'],
+        }, events[0].changes)
+
+        # the occupancy map and slot index follow the move
+        slots = build_occupancy().slots
+        self.assertEqual(3, slots[(3, 4, 'B1')].count)
+        self.assertNotIn((1, 2, 'A1'), slots)
+        slot = slot_suggester.suggest(self.product.pk)[0]
+        self.assertEqual(('3', '4', 'B1'), (
+            slot.loc_row, slot.loc_bin, slot.loc_tier))
+        self.assertEqual(3, slot.boxes)
+
+    def test_move_box_numbers(self):
+        result = self.move(
+            box_numbers='BOX00002 BOX00004 BOX00005 BOX00009',
+            loc_row='2', loc_bin='2', loc_tier='A1')
+        self.assertEqual((1, 1, 1, ['BOX00009']), (
+            result.moved, result.unchanged, result.empty, result.missing))
+        self.assertEqual(['BOX00002'], list(
+            BoxEvent.objects.values_list('box_number', flat=True)))
+
+    def test_move_onto_same_slot(self):
+        # "01" and "1" are the same row, so nothing moves
+        result = self.move(from_row='1', from_bin='2', from_tier='A1',
+                           loc_row='1', loc_bin='2', loc_tier='A1')
+        self.assertEqual((0, 3), (result.moved, result.unchanged))
+        self.assertEqual('01', Box.objects.get(box_number='BOX00001').loc_row)
+        self.assertFalse(BoxEvent.objects.exists())
+
+    def test_api(self):
+        user = User.objects.create_user(
+            'scanner', 'scanner@example.com', 'abc123')
+        self.client.force_login(user)
+        url = reverse('fpiweb:api_pallet_move')
+
+        response = self.client.post(
+            url,
+            json.dumps({
+                'box_numbers': ['BOX00001', 'BOX00004'],
+                'loc_row': '1', 'loc_bin': '1', 'loc_tier': 'A2',
+            }),
+            content_type='application/json',
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            {'moved': 2, 'unchanged': 0, 'empty': 0, 'missing': []},
+            response.json()['pallet'],
+        )
+
+        response = self.client.post(url, {'loc_row': '1'})
+        self.assertEqual(400, response.status_code)
+        self.assertIn('loc_bin', response.json()['errors'])
@@ -0,0 +1,380 @@
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+from random import Random
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from fpiweb.example_lookup import example_lookup
+from fpiweb.labels import process_label_jobs, queue_label_job
+from fpiweb.management.commands.seed_boxes import Command as SeedBoxes
+from fpiweb.models import Activity, Box, BoxNumber, BoxType, Constraints, \
+    Product, ProductExample
+from fpiweb.slotting import slot_suggester
+from fpiweb.urls import urlpatterns
+
+
+class QueryCountTestCase(TestCase):
+    """
+    Pin the number of SQL queries each page runs against realistic data.
+
+    If one of these tests fails because a page now runs more queries, look
+    for a missing select_related/prefetch_related in the SQL listed in the
+    failure.  If a page legitimately needs a different number of queries
+    (or got cheaper), update the expected count in the test.
+    """
+
+    fixtures = ('Constraints', 'BoxType', 'ProductCategory', 'Product')
+
+    # Enough boxes and products that an N+1 query problem in a page shows
+    # up as dozens of extra queries rather than one or two.
+    box_count = 500
+
+    @classmethod
+    def setUpTestData(cls):
+        SeedBoxes.create_boxes(1, cls.box_count, 0.5, Random(0))
+
+        products = list(Product.objects.all()[:60])
+        ProductExample.objects.bulk_create([
+            ProductExample(
+                prod_example_name=f'Example {number}',
+                prod_id=product,
+            )
+            for number, product in enumerate(products)
+        ])
+
+        filled = Box.objects.filter(product__isnull=False) \
+            .select_related('box_type', 'product__prod_cat')[:100]
+        Activity.objects.bulk_create([
+            Activity(
+                box_number=box.box_number,
+                box_type=box.box_type.box_type_code,
+                loc_row=box.loc_row,
+                loc_bin=box.loc_bin,
+                loc_tier=box.loc_tier,
+                prod_name=box.product.prod_name,
+                prod_cat_name=box.product.prod_cat.prod_cat_name,
+                date_filled=box.date_filled.date(),
+                date_consumed=box.date_filled.date(),
+                duration=0,
+                exp_year=box.exp_year,
+            )
+            for box in filled
+        ])
+
+        cls.user = User.objects.create_superuser(
+            'qcount', 'qcount@example.com', 'abc123')
+        cls.full_box = Box.objects.filter(product__isnull=False).first()
+        cls.empty_box = Box.objects.filter(product__isnull=True).first()
+
+    def setUp(self):
+        # start each test with an empty cache, and read the cache version
+        # now rather than in the middle of a page
+        cache.clear()
+        cache.check_version(force=True)
+        self.client.force_login(self.user)
+
+    def assertNumQueriesWithSql(self, expected, url, method='get',
+                                data=None, status=200):
+        """
+        Request a page and check how many queries it ran.
+
+        :param expected: number of queries the page should run
+        :param url: page to request
+        :param method: 'get' or 'post'
+        :param data: data to send with the request
+        :param status: expected HTTP status code
+        :return: the response
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(self.client, method)(url, data or {})
+        self.assertEqual(status, response.status_code, url)
+
+        queries = context.captured_queries
+        if len(queries) != expected:
+            sql = '\n'.join(
+                f'{number:>3}. {query["sql"]}'
+                for number, query in enumerate(queries, 1)
+            )
+            self.fail(
+                f'{method.upper()} {url} ran {len(queries)} queries, '
+                f'expected {expected}:\n{sql}'
+            )
+        return response
+
+
+class ViewQueryCountTest(QueryCountTestCase):
+
+    # url names of fpiweb/urls.py covered below
+    covered = {
+        'index',
+        'about',
+        'login',
+        'logout',
+        'constraints_view',
+        'constraint_new',
+        'constraint_update',
+        'constraint_delete',
+        'constraints_bulk_edit',
+        'box_new',
+        'box_edit',
+        'box_bulk_edit',
+        'box_details',
+        'box_scanned',
+        'box_empty_move',
+        'box_move',
+        'box_fill',
+        'box_empty',
+        'test_scan',
+        'occupancy_map',
+        'activity_stats',
+        'demand_forecast',
+        'pallet_move',
+        'label_print',
+        'label_jobs',
+        'label_job_download',
+        'api_box',
+        'api_box_fill',
+        'api_box_move',
+        'api_box_empty',
+        'api_products',
+        'api_examples',
+        'api_slots',
+        'api_pallet_move',
+        'api_constraints',
+    }
+
+    def test_every_url_is_covered(self):
+        names = {pattern.name for pattern in urlpatterns}
+        self.assertEqual(set(), names - self.covered)
+
+    def test_index(self):
+        self.assertNumQueriesWithSql(0, reverse('fpiweb:index'))
+
+    def test_about(self):
+        self.assertNumQueriesWithSql(0, reverse('fpiweb:about'))
+
+    def test_login(self):
+        self.assertNumQueriesWithSql(0, reverse('fpiweb:login'))
+
+    def test_logout(self):
+        self.assertNumQueriesWithSql(3, reverse('fpiweb:logout'))
+
+    def test_constraints_view(self):
+        self.assertNumQueriesWithSql(2, reverse('fpiweb:constraints_view'))
+
+    def test_constraint_new(self):
+        self.assertNumQueriesWithSql(1, reverse('fpiweb:constraint_new'))
+
+    def test_constraint_update(self):
+        constraint = Constraints.objects.get(constraint_name='Row')
+        self.assertNumQueriesWithSql(
+            2, reverse('fpiweb:constraint_update', args=(constraint.pk,)))
+
+    def test_constraint_delete(self):
+        constraint = Constraints.objects.get(constraint_name='Row')
+        self.assertNumQueriesWithSql(
+            2, reverse('fpiweb:constraint_delete', args=(constraint.pk,)))
+
+    def test_constraints_bulk_edit(self):
+        self.assertNumQueriesWithSql(
+            2, reverse('fpiweb:constraints_bulk_edit'))
+
+    def test_box_new(self):
+        box_number = BoxNumber.format_box_number(self.box_count + 1)
+        url = reverse('fpiweb:box_new', args=(box_number,))
+        self.assertNumQueriesWithSql(2, url)
+
+        box_type = BoxType.objects.get(box_type_code='Evans')
+        self.assertNumQueriesWithSql(
+            6, url, 'post', {'box_type': box_type.pk}, status=302)
+
+    def test_box_edit(self):
+        url = reverse('fpiweb:box_edit', args=(self.full_box.pk,))
+        self.assertNumQueriesWithSql(3, url)
+        self.assertNumQueriesWithSql(
+            7, url, 'post', {'box_type': self.full_box.box_type_id},
+            status=302)
+
+    def test_box_bulk_edit(self):
+        url = reverse('fpiweb:box_bulk_edit')
+        self.assertNumQueriesWithSql(4, url, data={'page': 2})
+        box = self.full_box
+        # one query saves the changed boxes and one logs the changes
+        self.assertNumQueriesWithSql(8, url, 'post', {
+            'form-TOTAL_FORMS': 1,
+            'form-INITIAL_FORMS': 1,
+            'form-0-id': box.pk,
+            'form-0-quantity': box.quantity + 1,
+            'form-0-exp_year': box.exp_year,
+        })
+
+    def test_box_details(self):
+        self.assertNumQueriesWithSql(
+            3, reverse('fpiweb:box_details', args=(self.full_box.pk,)))
+
+    def test_box_scanned(self):
+        for box in (self.full_box, self.empty_box):
+            number = int(box.box_number[3:])
+            self.assertNumQueriesWithSql(
+                2, reverse('fpiweb:box_scanned', args=(number,)), status=302)
+
+    def test_box_empty_move(self):
+        for name in ('box_empty_move', 'box_move', 'box_fill', 'box_empty'):
+            self.assertNumQueriesWithSql(
+                1, reverse(f'fpiweb:{name}', args=(self.full_box.pk,)))
+
+    def test_test_scan(self):
+        self.assertNumQueriesWithSql(4, reverse('fpiweb:test_scan'))
+
+    def test_occupancy_map(self):
+        # the grid is built from one grouped query (and the constraints)
+        cache.clear()
+        self.assertNumQueriesWithSql(6, reverse('fpiweb:occupancy_map'))
+        self.assertNumQueriesWithSql(1, reverse('fpiweb:occupancy_map'))
+
+    def test_label_print(self):
+        url = reverse('fpiweb:label_print')
+        self.assertNumQueriesWithSql(2, url)
+        # the box numbers are reserved in one transaction (savepoint, lock,
+        # numbers in use, reservations, release) before the PDF is sent
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                url, {'start': 1, 'count': 24, 'layout': 'letter-3x4'})
+            b''.join(response.streaming_content)
+        self.assertEqual(6, len(context.captured_queries))
+
+    def test_label_jobs(self):
+        for _ in range(3):
+            label_job = queue_label_job(
+                1, 2, 'letter-3x4', 'http://x/box', self.user)
+        process_label_jobs()
+        self.assertNumQueriesWithSql(3, reverse('fpiweb:label_jobs'))
+        self.assertNumQueriesWithSql(2, reverse(
+            'fpiweb:label_job_download', args=(label_job.pk,)))
+
+    def test_pallet_move(self):
+        url = reverse('fpiweb:pallet_move')
+        self.assertNumQueriesWithSql(2, url)
+        box = self.full_box
+        # one query locks the boxes, one moves them and one logs the moves
+        self.assertNumQueriesWithSql(6, url, 'post', {
+            'from_row': int(box.loc_row),
+            'from_bin': int(box.loc_bin),
+            'from_tier': box.loc_tier,
+            'loc_row': '1', 'loc_bin': '1', 'loc_tier': 'A1',
+        })
+
+    def test_activity_stats(self):
+        # read from the running totals, not the activity history
+        self.assertNumQueriesWithSql(3, reverse('fpiweb:activity_stats'))
+
+    def test_demand_forecast(self):
+        # fitted from the weekly totals, then cached
+        cache.clear()
+        self.assertNumQueriesWithSql(3, reverse('fpiweb:demand_forecast'))
+        self.assertNumQueriesWithSql(1, reverse('fpiweb:demand_forecast'))
+
+    def test_api_box(self):
+        self.assertNumQueriesWithSql(
+            2, reverse('fpiweb:api_box', args=(self.full_box.box_number,)))
+
+    def test_api_box_fill_move_empty(self):
+        box_number = self.empty_box.box_number
+        location = {'loc_row': '1', 'loc_bin': '2', 'loc_tier': 'A1'}
+        self.assertNumQueriesWithSql(
+            6, reverse('fpiweb:api_box_fill', args=(box_number,)), 'post',
+            dict(location, product=self.full_box.product_id,
+                 exp_year=2023),
+        )
+        self.assertNumQueriesWithSql(
+            3, reverse('fpiweb:api_box_move', args=(box_number,)), 'post',
+            location,
+        )
+        # includes the savepoint around the activity record, the running
+        # activity totals and the update
+        self.assertNumQueriesWithSql(
+            8, reverse('fpiweb:api_box_empty', args=(box_number,)), 'post')
+
+    def test_api_products(self):
+        self.assertNumQueriesWithSql(
+            2, reverse('fpiweb:api_products'), data={'q': 'bean'})
+
+    def test_api_examples(self):
+        url = reverse('fpiweb:api_examples')
+        example_lookup.invalidate()
+        # the first lookup builds the trie, the next ones use it
+        self.assertNumQueriesWithSql(2, url, data={'q': 'example 1'})
+        self.assertNumQueriesWithSql(1, url, data={'q': 'example 2'})
+
+    def test_api_slots(self):
+        url = reverse('fpiweb:api_slots')
+        data = {'product': self.full_box.product_id}
+        slot_suggester.invalidate()
+        # the first suggestion builds the slot index, the next ones use it
+        self.assertNumQueriesWithSql(6, url, data=data)
+        self.assertNumQueriesWithSql(1, url, data=data)
+
+    def test_api_pallet_move(self):
+        self.assertNumQueriesWithSql(
+            7, reverse('fpiweb:api_pallet_move'), 'post', {
+                'box_numbers': self.full_box.box_number,
+                'loc_row': '1', 'loc_bin': '1', 'loc_tier': 'A1',
+            })
+
+    def test_api_constraints(self):
+        self.assertNumQueriesWithSql(2, reverse('fpiweb:api_constraints'))
+
+
+class AdminQueryCountTest(QueryCountTestCase):
+
+    # queries of the changelist of each fpiweb model registered in the admin
+    changelist_queries = {
+        'boxtype': 4,
+        'productcategory': 4,
+        'product': 4,
+        'productexample': 4,
+        'activity': 4,
+        # list_filter on box type
+        'box': 5,
+        'constraints': 4,
+        # list_filter and date_hierarchy on event date
+        'boxevent': 6,
+        # the users who asked for the labels come with the jobs
+        'labeljob': 4,
+    }
+
+    def test_every_admin_model_is_covered(self):
+        registered = {
+            model._meta.model_name for model in admin.site._registry
+            if model._meta.app_label == 'fpiweb'}
+        self.assertEqual(
+            set(), registered - set(self.changelist_queries))
+
+    def test_changelists(self):
+        for _ in range(3):
+            queue_label_job(1, 2, 'letter-3x4', 'http://x/box', self.user)
+        for model_name, expected in self.changelist_queries.items():
+            with self.subTest(model_name):
+                self.assertNumQueriesWithSql(
+                    expected,
+                    reverse(f'admin:fpiweb_{model_name}_changelist'),
+                )
+
+    def test_box_change(self):
+        self.assertNumQueriesWithSql(
+            7, reverse('admin:fpiweb_box_change', args=(self.full_box.pk,)))
+
+    def test_product_example_change(self):
+        example = ProductExample.objects.first()
+        self.assertNumQueriesWithSql(
+            6,
+            reverse('admin:fpiweb_productexample_change', args=(example.pk,))
+        )
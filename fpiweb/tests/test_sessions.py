@@ -0,0 +1,50 @@
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+
+class SessionTest(TestCase):
+
+    def test_scan_reads_session_from_cache(self):
+        user = User.objects.create_user(
+            'scanner', 'scanner@example.com', 'abc123')
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse('fpiweb:box_scanned', args=(1,)))
+        self.assertEqual(302, response.status_code)
+        self.assertFalse([
+            query['sql'] for query in context.captured_queries
+            if 'django_session' in query['sql']
+        ])
+
+    def test_prune_sessions(self):
+        now = timezone.now()
+        Session.objects.bulk_create([
+            Session(session_key=f'expired{number:05}', session_data='',
+                    expire_date=now - timedelta(days=1))
+            for number in range(25)
+        ] + [
+            Session(session_key='current', session_data='',
+                    expire_date=now + timedelta(days=1))
+        ])
+        out = StringIO()
+        call_command('prune_sessions', batch_size=10, stdout=out)
+        self.assertIn('Removed 25 expired sessions', out.getvalue())
+        self.assertEqual(
+            ['current'],
+            list(Session.objects.values_list('session_key', flat=True)))
+
+# EOF
@@ -0,0 +1,115 @@
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+from django.test import TransactionTestCase, override_settings
+
+from fpiweb.models import Box, BoxType, Product
+from fpiweb.slotting import EMPTY_SLOT, SAME_CATEGORY, SAME_PRODUCT, \
+    SlotIndex, slot_suggester, tier_level
+
+
+def slots(suggestions):
+    return [
+        (s.loc_row, s.loc_bin, s.loc_tier, s.reason) for s in suggestions
+    ]
+
+
+class SlotIndexTest(TransactionTestCase):
+
+    def index(self):
+        return SlotIndex(
+            rows=[1, 2],
+            bins=[1, 2, 3],
+            tiers=['A1', 'A2', 'B1', 'B2'],
+            product_categories={10: 1, 11: 1, 20: 2},
+            level_cost=2,
+        )
+
+    def test_tier_level(self):
+        self.assertEqual(1, tier_level('A1'))
+        self.assertEqual(2, tier_level('C2'))
+
+    def test_nearest_first(self):
+        index = self.index()
+        # row 1 counts bins from the pantry, row 2 from the far end
+        self.assertEqual(
+            [(1, 1, 'A1'), (1, 1, 'B1'), (1, 2, 'A1'), (1, 2, 'B1'),
+             (2, 3, 'A1'), (2, 3, 'B1'), (1, 1, 'A2')],
+            index.ordered[:7],
+        )
+        self.assertEqual(
+            [('1', '1', 'A1', EMPTY_SLOT), ('1', '1', 'B1', EMPTY_SLOT)],
+            slots(index.suggest(10, capacity=2, limit=2)),
+        )
+
+    def test_same_product_then_category(self):
+        index = self.index()
+        index.add((2, 1, 'B2'), 10)
+        index.add((2, 2, 'A1'), 11)
+        index.add((1, 3, 'A1'), 11)
+        index.add((1, 1, 'A1'), 20)
+        self.assertEqual(
+            [('2', '1', 'B2', SAME_PRODUCT),
+             ('1', '3', 'A1', SAME_CATEGORY),
+             ('2', '2', 'A1', SAME_CATEGORY),
+             ('1', '1', 'B1', EMPTY_SLOT)],
+            slots(index.suggest(10, capacity=2, limit=4)),
+        )
+
+        # a full slot is skipped
+        index.add((2, 1, 'B2'), 10)
+        self.assertEqual(
+            ('1', '3', 'A1', SAME_CATEGORY),
+            slots(index.suggest(10, capacity=2, limit=1))[0],
+        )
+
+        index.remove((2, 1, 'B2'), 10, boxes=2)
+        self.assertNotIn(
+            SAME_PRODUCT,
+            [s.reason for s in index.suggest(10, capacity=2, limit=3)],
+        )
+
+
+@override_settings(SLOTTING={'SLOT_CAPACITY': 2, 'LEVEL_COST': 2})
+class SlotSuggesterTest(TransactionTestCase):
+
+    fixtures = ('Constraints', 'BoxType', 'ProductCategory', 'Product')
+
+    def setUp(self):
+        slot_suggester.invalidate()
+        self.box_type = BoxType.objects.get(box_type_code='Evans')
+        self.soup = Product.objects.get(prod_name='Tomato Soup')
+
+    def tearDown(self):
+        slot_suggester.invalidate()
+
+    def test_follows_box_moves(self):
+        Box.objects.create(
+            box_number='BOX00001', box_type=self.box_type, product=self.soup,
+            loc_row='03', loc_bin='04', loc_tier='A1')
+        self.assertEqual(
+            ('3', '4', 'A1', SAME_PRODUCT),
+            slots(slot_suggester.suggest(self.soup.pk))[0],
+        )
+
+        # the index is updated as boxes are moved, filled and emptied
+        box = Box.objects.create(
+            box_number='BOX00002', box_type=self.box_type, product=self.soup,
+            loc_row='3', loc_bin='4', loc_tier='A1')
+        self.assertNotEqual(
+            SAME_PRODUCT, slot_suggester.suggest(self.soup.pk)[0].reason)
+
+        box.loc_tier = 'B1'
+        box.save()
+        self.assertEqual(
+            [('3', '4', 'A1', SAME_PRODUCT), ('3', '4', 'B1', SAME_PRODUCT)],
+            slots(slot_suggester.suggest(self.soup.pk))[:2],
+        )
+
+        box.empty()
+        self.assertEqual(
+            ['A1'],
+            [s.loc_tier for s in slot_suggester.suggest(self.soup.pk)
+             if s.reason == SAME_PRODUCT],
+        )
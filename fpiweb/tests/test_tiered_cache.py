@@ -0,0 +1,165 @@
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+from django.core.cache import cache, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from fpiweb.models import Box, BoxType, CacheVersion, Product
+from fpiweb.occupancy import OCCUPANCY_FRAGMENT
+from fpiweb.tiered_cache import LocalTier, TieredCache, key_namespace
+
+
+def worker_cache(check_interval: float = 0.0,
+                 max_entries: int = 100) -> TieredCache:
+    """
+    Tiered cache with memory of its own, as in another worker process.
+    """
+    tiered = TieredCache('shared', {'OPTIONS': {
+        'NAME': 'test',
+        'MAX_ENTRIES': max_entries,
+        'VERSION_CHECK_INTERVAL': check_interval,
+    }})
+    tiered.local = LocalTier()
+    return tiered
+
+
+class TieredCacheTest(TransactionTestCase):
+
+    def setUp(self):
+        caches['shared'].clear()
+
+    def test_key_namespace(self):
+        self.assertEqual('demand_forecast',
+                         key_namespace('demand_forecast:2026-10-19'))
+        self.assertEqual('template.cache.box_detail',
+                         key_namespace('template.cache.box_detail.0a1b'))
+        self.assertEqual('', key_namespace('key'))
+
+    def test_change_seen_by_other_worker(self):
+        first = worker_cache()
+        second = worker_cache()
+        first.set('box:1', 'old')
+        # nobody had the entry, so no counter was needed
+        self.assertFalse(CacheVersion.objects.exists())
+        self.assertEqual('old', second.get('box:1'))
+
+        first.set('box:1', 'new')
+        self.assertEqual(1, CacheVersion.objects.get(name='test:box').version)
+        # the counter moved, so the second worker reads the shared cache
+        self.assertEqual('new', second.get('box:1'))
+
+        second.delete('box:1')
+        self.assertIsNone(first.get('box:1'))
+
+    def test_other_namespaces_kept(self):
+        first = worker_cache()
+        second = worker_cache(check_interval=60)
+        first.set_many({'box:1': 'box', 'pallet:1': 'pallet'})
+        self.assertEqual('box', second.get('box:1'))
+        self.assertEqual('pallet', second.get('pallet:1'))
+
+        first.set('box:1', 'new box')
+        second.check_version(force=True)
+        self.assertEqual(
+            ['pallet:1'],
+            [key.split(':', 2)[-1] for key in second.local.entries])
+
+        second.clear()
+        first.check_version(force=True)
+        self.assertEqual({}, dict(first.local.entries))
+
+    def test_unknown_key_deleted_without_queries(self):
+        tiered = worker_cache(check_interval=60)
+        with self.assertNumQueries(0):
+            tiered.delete('box:1')
+            tiered.delete_many(['box:2', 'box:3'])
+
+    def test_written_on_commit(self):
+        first = worker_cache()
+        second = worker_cache()
+        first.set('box:1', 'old')
+        second.get('box:1')
+
+        with transaction.atomic():
+            first.set('box:1', 'new')
+            first.delete('box:2')
+            self.assertEqual('new', first.get('box:1'))
+            self.assertEqual('old', caches['shared'].get('box:1'))
+            self.assertEqual('old', second.get('box:1'))
+        self.assertEqual('new', caches['shared'].get('box:1'))
+        self.assertEqual('new', second.get('box:1'))
+
+    def test_rolled_back_write_dropped(self):
+        first = worker_cache()
+        first.set('box:1', 'old')
+
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                first.set('box:1', 'new')
+                first.clear()
+                self.assertIsNone(first.get('box:1'))
+                raise ValueError('rolled back')
+        self.assertEqual('old', caches['shared'].get('box:1'))
+        self.assertEqual('old', first.get('box:1'))
+        self.assertFalse(CacheVersion.objects.exists())
+
+    def test_memory_read_without_queries(self):
+        tiered = worker_cache(check_interval=60)
+        tiered.set('key', {'boxes': 3})
+        tiered.check_version(force=True)
+        with self.assertNumQueries(0):
+            self.assertEqual({'boxes': 3}, tiered.get('key'))
+        # changing the value read does not change the cached one
+        tiered.get('key')['boxes'] = 4
+        self.assertEqual({'boxes': 3}, tiered.get('key'))
+
+    def test_least_recently_used_dropped(self):
+        tiered = worker_cache(check_interval=60, max_entries=2)
+        tiered.set_many({'a': 1, 'b': 2})
+        tiered.get('a')
+        tiered.set('c', 3)
+        self.assertEqual(['a', 'c'], [
+            key.split(':')[-1] for key in tiered.local.entries])
+        # still in the shared cache
+        self.assertEqual(2, tiered.get('b'))
+
+
+class BoxSaveQueriesTest(TransactionTestCase):
+    """
+    Queries of a box save, with the commit hooks run as in production.
+    """
+
+    fixtures = ('Constraints', 'BoxType', 'ProductCategory', 'Product')
+
+    def setUp(self):
+        cache.clear()
+        self.box = Box.objects.create(
+            box_number='BOX00001',
+            box_type=BoxType.objects.get(box_type_code='Evans'),
+            loc_row='01', loc_bin='02', loc_tier='A1',
+            product=Product.objects.get(prod_name='Corn'),
+            quantity=20,
+        )
+        cache.check_version(force=True)
+
+    def test_save_with_nothing_cached(self):
+        box = Box.objects.get(pk=self.box.pk)
+        versions = list(CacheVersion.objects.values_list('name', 'version'))
+        with self.assertNumQueries(1):
+            box.loc_row = '02'
+            box.save()
+        self.assertEqual(versions, list(
+            CacheVersion.objects.values_list('name', 'version')))
+
+    def test_save_with_map_cached(self):
+        cache.set(make_template_fragment_key(OCCUPANCY_FRAGMENT), 'map')
+        box = Box.objects.get(pk=self.box.pk)
+        # the update, and the counter of the dropped map
+        with self.assertNumQueries(2):
+            box.loc_row = '02'
+            box.save()
+
+# EOF
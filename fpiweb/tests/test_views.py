@@ -6,10 +6,12 @@ __creation_date__ = "04/01/2019"
 from bs4 import BeautifulSoup
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 
-from fpiweb.models import Box, BoxNumber, BoxType
+from fpiweb.fragment_cache import box_detail_key
+from fpiweb.models import Box, BoxEvent, BoxNumber, BoxType, Product
 
 
 class BoxNewViewTest(TestCase):
@@ -156,4 +158,156 @@ class LogoutViewTest(TestCase):
     def test_get(self):
         client = Client()
         response = client.get(reverse('fpiweb:logout'))
-        self.assertEqual(200, response.status_code)
\ No newline at end of file
+        self.assertEqual(200, response.status_code)
+
+
+class BoxDetailsViewTest(TestCase):
+
+    fixtures = ('BoxType', 'ProductCategory', 'Product')
+
+    def test_cached_details_follow_changes(self):
+        user = User.objects.create_user(
+            'awesterville',
+            'alice.westerville@example.com',
+            'abc123')
+        client = Client()
+        client.force_login(user)
+
+        box = Box.objects.create(
+            box_number=BoxNumber.format_box_number(12),
+            box_type=BoxType.objects.get(box_type_code='Evans'),
+            loc_row='01',
+        )
+        url = reverse('fpiweb:box_details', args=(box.pk,))
+
+        # The box details are rendered once and then served from the cache
+        # until the box changes.
+        response = client.get(url)
+        self.assertEqual(200, response.status_code)
+        first_version = box.cache_version
+        self.assertIsNotNone(
+            cache.get(box_detail_key(box.pk, first_version)))
+
+        box.loc_row = '04'
+        box.save()
+        self.assertIsNone(cache.get(box_detail_key(box.pk, first_version)))
+
+        response = client.get(url)
+        soup = BeautifulSoup(response.content, 'html.parser')
+        self.assertEqual(
+            ['04', '\xa0', '\xa0'],
+            [cell.get_text() for cell in soup.find_all('td')],
+        )
+
+    def test_cached_details_follow_product(self):
+        user = User.objects.create_user(
+            'awesterville',
+            'alice.westerville@example.com',
+            'abc123')
+        self.client.force_login(user)
+        product = Product.objects.get(prod_name='Corn')
+        box = Box.objects.create(
+            box_number=BoxNumber.format_box_number(12),
+            box_type=BoxType.objects.get(box_type_code='Evans'),
+            product=product,
+        )
+        url = reverse('fpiweb:box_details', args=(box.pk,))
+        self.assertContains(self.client.get(url), 'Corn')
+
+        product.prod_name = 'Sweet Corn'
+        product.save()
+        self.assertContains(self.client.get(url), 'Sweet Corn')
+
+
+class BoxBulkEditViewTest(TestCase):
+
+    fixtures = ('Constraints', 'BoxType', 'ProductCategory', 'Product')
+
+    def setUp(self):
+        user = User.objects.create_user(
+            'bulkedit', 'bulk.edit@example.com', 'abc123')
+        self.client.force_login(user)
+        box_type = BoxType.objects.get(box_type_code='Evans')
+        product = Product.objects.get(prod_name='Tomato Soup')
+        self.boxes = [
+            Box.objects.create(
+                box_number=BoxNumber.format_box_number(number),
+                box_type=box_type,
+                product=product,
+                quantity=24,
+                exp_year=2020,
+            )
+            for number in range(1, 4)
+        ]
+        self.url = reverse('fpiweb:box_bulk_edit')
+
+    def post_data(self, **changes):
+        """
+        The rows of the page as posted, with changes by form number.
+        """
+        data = {
+            'form-TOTAL_FORMS': len(self.boxes),
+            'form-INITIAL_FORMS': len(self.boxes),
+            'form-MIN_NUM_FORMS': 0,
+            'form-MAX_NUM_FORMS': 1000,
+        }
+        for number, box in enumerate(self.boxes):
+            data.update({
+                f'form-{number}-id': box.pk,
+                f'form-{number}-quantity': box.quantity,
+                f'form-{number}-exp_year': box.exp_year,
+                f'form-{number}-exp_month_start': '',
+                f'form-{number}-exp_month_end': '',
+            })
+        for name, value in changes.items():
+            data[name.replace('_', '-', 2)] = value
+        return data
+
+    def test_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(3, len(response.context['formset'].forms))
+
+    def test_saves_changed_rows(self):
+        unchanged = self.boxes[1].last_changed
+
+        # nothing is saved while a row breaks the expiration rules
+        response = self.client.post(self.url, self.post_data(
+            form_0_quantity=12, form_2_exp_month_start=5))
+        self.assertEqual(200, response.status_code)
+        self.assertIsNone(response.context['saved'])
+        self.assertEqual(24, Box.objects.get(pk=self.boxes[0].pk).quantity)
+
+        response = self.client.post(self.url, self.post_data(
+            form_0_quantity=12, form_2_exp_month_start=5,
+            form_2_exp_month_end=7))
+        self.assertEqual(2, response.context['saved'])
+        boxes = Box.objects.order_by('box_number')
+        self.assertEqual([12, 24, 24], [box.quantity for box in boxes])
+        self.assertEqual(
+            [None, None, 5], [box.exp_month_start for box in boxes])
+        self.assertEqual(unchanged, boxes[1].last_changed)
+
+        events = BoxEvent.objects.order_by('box_number')
+        self.assertEqual(
+            [BoxEvent.EDITED, BoxEvent.EDITED],
+            [event.event_type for event in events],
+        )
+        self.assertEqual({'quantity': [24, 12]}, events[0].changes)
+        self.assertEqual('Tomato Soup', events[0].prod_name)
+
+    def test_unchanged_rows_not_checked(self):
+        # packed in a year no longer offered for new boxes
+        Box.objects.filter(pk=self.boxes[1].pk).update(exp_year=2025)
+        self.boxes[1].exp_year = 2025
+
+        response = self.client.post(self.url, self.post_data(
+            form_0_quantity=12))
+        self.assertEqual(1, response.context['saved'])
+
+        response = self.client.post(self.url, self.post_data(
+            form_0_quantity=120, form_1_quantity=12))
+        self.assertIsNone(response.context['saved'])
+        formset = response.context['formset']
+        self.assertEqual(['quantity'], list(formset.forms[0].errors))
+        self.assertEqual({}, formset.forms[1].errors)
@@ -0,0 +1,473 @@
+"""
+tiered_cache.py - Cache kept in each worker's memory in front of a shared one.
+
+Every gunicorn worker keeps the cache entries it used last in its own
+memory (a least recently used list), in front of a cache shared by all the
+workers of the server (a file cache, see CACHES in settings).  Most reads
+are answered from memory.
+
+The keys are grouped in namespaces: a key up to its last "." or ":", e.g.
+"demand_forecast" for "demand_forecast:2026-10-19" or
+"template.cache.box_detail" for the box detail fragments.  Each namespace
+has a counter in the database (CacheVersion).  A worker replacing or
+removing an entry of the shared cache adds one to the counter of its
+namespace; the other workers read all the counters at most once every
+VERSION_CHECK_INTERVAL seconds (one query) and drop what they keep in
+memory of the namespaces whose counter moved.  No Redis or Memcached is
+needed, and a change made by one worker is seen by all the others within
+that interval.
+
+Only a change to an entry the shared cache holds moves a counter: an
+entry added after a miss, or the removal of an entry nobody cached, cannot
+leave another worker with an old value.  Most saves therefore change no
+counter at all.
+
+Inside a transaction the changes are kept aside (for the thread making
+them) and made to the shared cache, and the counters, when the
+transaction commits.  They are dropped if it rolls back, so the other
+workers never see a value the database does not have.  A savepoint rolled
+back inside the transaction does not undo the changes made in it.
+
+Entries set with a timeout shorter than LOCAL_TIMEOUT may be served from
+memory for up to LOCAL_TIMEOUT after another worker replaced them once
+they had expired from the shared cache.
+
+Configured in settings like:
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'fpiweb.tiered_cache.TieredCache',
+            'LOCATION': 'shared',       # alias of the shared cache
+            'OPTIONS': {
+                'MAX_ENTRIES': 1000,            # kept in memory
+                'LOCAL_TIMEOUT': 300,           # seconds kept in memory
+                'VERSION_CHECK_INTERVAL': 1.0,  # seconds
+            },
+        },
+        'shared': {...},
+    }
+"""
+
+import pickle
+from collections import OrderedDict
+from hashlib import sha1
+from threading import RLock, local
+from time import monotonic, time
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+from django.db import connection, transaction
+
+__author__ = '(Multiple)'
+__project__ = "Food-Pantry-Inventory"
+__creation_date__ = "10/19/2026"
+
+# marks a key missing from the shared cache (None is a valid value)
+MISSING = object()
+
+# longest counter name (CacheVersion.name), longer ones are hashed
+COUNTER_NAME_LENGTH = 200
+
+
+def key_namespace(key: str) -> str:
+    """
+    Namespace of a cache key: the key up to its last "." or ":".
+
+    :param key: key as given to the cache
+    :return: the namespace ('' for a key without "." or ":")
+    """
+    end = max(key.rfind('.'), key.rfind(':'))
+    return key[:end] if end > 0 else ''
+
+
+class LocalTier:
+    """
+    Cache entries kept in the memory of one worker, shared by its threads.
+    """
+
+    def __init__(self):
+        # key: (pickled value, expiry time or None, counter name), least
+        # recently used first
+        self.entries: OrderedDict = OrderedDict()
+        self.lock: RLock = RLock()
+
+        # counters the entries belong to, by counter name
+        self.versions: Dict[str, int] = dict()
+
+        # when the counters were last read (time.monotonic)
+        self.checked: float = float('-inf')
+
+
+# one local tier per cache (by name), like the local memory cache
+_local_tiers: Dict[str, LocalTier] = dict()
+_local_tiers_lock = RLock()
+
+
+class PendingChanges:
+    """
+    Changes made to a cache inside a transaction, made when it commits.
+    """
+
+    def __init__(self, tiered: 'TieredCache'):
+        self.tiered = tiered
+
+        # the shared cache is cleared first
+        self.cleared: bool = False
+
+        # local key: (key, version, pickled value or None to delete,
+        # timeout), in the order made
+        self.changes: OrderedDict = OrderedDict()
+
+    def lookup(self, local_key: str):
+        """
+        Value given to a key in this transaction.
+
+        :param local_key: key of the entry
+        :return: a tuple of the value (MISSING if deleted), or None if the
+            entry was not changed in this transaction
+        """
+        if local_key in self.changes:
+            pickled = self.changes[local_key][2]
+            return (MISSING if pickled is None else pickle.loads(pickled),)
+        if self.cleared:
+            return (MISSING,)
+        return None
+
+    def __call__(self):
+        """ Make the changes, once the transaction committed. """
+        self.tiered._commit(self)
+
+
+class TieredCache(BaseCache):
+    """
+    Cache answering from memory, backed by a shared cache.
+    """
+
+    def __init__(self, location: str, params: dict):
+        """
+        Prepare the cache.
+
+        :param location: alias of the shared cache
+        :param params: the settings of the cache
+        """
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias: str = location
+        self.local_timeout: float = options.get('LOCAL_TIMEOUT', 300)
+        self.check_interval: float = \
+            options.get('VERSION_CHECK_INTERVAL', 1.0)
+        self.name: str = options.get('NAME', location)
+        with _local_tiers_lock:
+            self.local: LocalTier = \
+                _local_tiers.setdefault(self.name, LocalTier())
+        self._thread = local()
+        return
+
+    @property
+    def shared(self) -> BaseCache:
+        """ The cache shared by all the workers. """
+        return caches[self.shared_alias]
+
+    # reading
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_key(key, version)
+        self.validate_key(local_key)
+        pending = self._pending()
+        if pending is not None:
+            changed = pending.lookup(local_key)
+            if changed is not None:
+                return default if changed[0] is MISSING else changed[0]
+        self.check_version()
+        counter = self._counter(key)
+        with self.local.lock:
+            entry = self.local.entries.get(local_key)
+            if entry is not None:
+                pickled, expires, _ = entry
+                if expires is None or expires > time():
+                    self.local.entries.move_to_end(local_key)
+                    return pickle.loads(pickled)
+                del self.local.entries[local_key]
+            seen = self._seen(counter)
+        value = self.shared.get(key, MISSING, version=version)
+        if value is MISSING:
+            return default
+        # not kept if the entry changed while the shared cache was read
+        self._keep(local_key, value, DEFAULT_TIMEOUT, counter, seen)
+        return value
+
+    def has_key(self, key, version=None):
+        return self.get(key, MISSING, version=version) is not MISSING
+
+    # changing
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        pending = self._pending()
+        if pending is not None:
+            if self.has_key(key, version=version):
+                return False
+            self.set(key, value, timeout, version=version)
+            return True
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            # nobody had the entry, so no counter to change
+            self._keep(self.make_key(key, version), value, timeout,
+                       self._counter(key))
+        return added
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_key(key, version)
+        self.validate_key(local_key)
+        pending = self._pending(create=True)
+        if pending is not None:
+            pending.changes[local_key] = (
+                key, version, pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                timeout)
+            self._forget(local_key)
+            return
+        self._set_now(key, value, timeout, version)
+        return
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        for key, value in data.items():
+            self.set(key, value, timeout, version=version)
+        return []
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        pending = self._pending()
+        if pending is not None:
+            value = self.get(key, MISSING, version=version)
+            if value is MISSING:
+                return False
+            self.set(key, value, timeout, version=version)
+            return True
+        # the value does not change, only how long it is kept
+        self._forget(self.make_key(key, version))
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.delete_many([key], version=version)
+        return
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        pending = self._pending(create=bool(keys))
+        if pending is not None:
+            for key in keys:
+                local_key = self.make_key(key, version)
+                pending.changes[local_key] = (key, version, None, None)
+                self._forget(local_key)
+            return
+        self._delete_now(keys, version)
+        return
+
+    def incr(self, key, delta=1, version=None):
+        value = self.get(key, MISSING, version=version)
+        if value is MISSING:
+            raise ValueError(f"Key '{key}' not found")
+        value += delta
+        self.set(key, value, DEFAULT_TIMEOUT, version=version)
+        return value
+
+    def clear(self):
+        pending = self._pending(create=True)
+        with self.local.lock:
+            self.local.entries.clear()
+        if pending is not None:
+            pending.cleared = True
+            pending.changes.clear()
+            return
+        self._clear_now()
+        return
+
+    # changes made to the shared cache
+
+    def _set_now(self, key, value, timeout, version):
+        counter = self._counter(key)
+        replaced = self.shared.has_key(key, version=version)
+        self.shared.set(key, value, timeout, version=version)
+        if replaced:
+            self._bump_versions([counter])
+        self._keep(self.make_key(key, version), value, timeout, counter)
+        return
+
+    def _delete_now(self, keys: Iterable, version):
+        counters = set()
+        for key in keys:
+            self._forget(self.make_key(key, version))
+            if self.shared.has_key(key, version=version):
+                self.shared.delete(key, version=version)
+                counters.add(self._counter(key))
+        self._bump_versions(sorted(counters))
+        return
+
+    def _clear_now(self):
+        with self.local.lock:
+            self.local.entries.clear()
+        self.shared.clear()
+        self._bump_versions([self.name])
+        return
+
+    def _pending(self, create: bool = False) -> Optional[PendingChanges]:
+        """
+        Changes made by this thread in the current transaction.
+
+        :param create: start them if there are none yet
+        :return: the changes, or None outside a transaction
+        """
+        if not connection.in_atomic_block:
+            return None
+        pending = getattr(self._thread, 'pending', None)
+        # dropped from the commit hooks once committed or rolled back
+        if pending is not None and not any(
+                hook is pending for _, hook in connection.run_on_commit):
+            pending = None
+        if pending is None and create:
+            pending = PendingChanges(self)
+            transaction.on_commit(pending)
+        self._thread.pending = pending
+        return pending
+
+    def _commit(self, pending: PendingChanges):
+        """
+        Make the changes of a committed transaction.
+        """
+        if getattr(self._thread, 'pending', None) is pending:
+            self._thread.pending = None
+        if pending.cleared:
+            self._clear_now()
+        deleted = list()
+        for key, version, pickled, timeout in pending.changes.values():
+            if pickled is None:
+                deleted.append((key, version))
+                continue
+            self._set_now(key, pickle.loads(pickled), timeout, version)
+        for key, version in deleted:
+            self._delete_now([key], version)
+        return
+
+    # the local tier
+
+    def _keep(self, local_key: str, value, timeout, counter: str,
+              seen=MISSING):
+        """
+        Keep an entry in memory, dropping the least recently used.
+
+        :param local_key: key of the entry
+        :param value: value of the entry
+        :param timeout: timeout given for the entry (or DEFAULT_TIMEOUT)
+        :param counter: counter of the namespace of the entry
+        :param seen: when given, the entry is kept only if the counters
+            have not moved since (see _seen)
+        :return:
+        """
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is not None and timeout <= time():
+            # asked to expire at once (timeout 0)
+            self._forget(local_key)
+            return
+        expires = time() + self.local_timeout
+        if timeout is not None:
+            expires = min(expires, timeout)
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.local.lock:
+            if seen is not MISSING and seen != self._seen(counter):
+                return
+            self.local.entries[local_key] = (pickled, expires, counter)
+            self.local.entries.move_to_end(local_key)
+            while len(self.local.entries) > self._max_entries:
+                self.local.entries.popitem(last=False)
+        return
+
+    def _forget(self, local_key: str):
+        with self.local.lock:
+            self.local.entries.pop(local_key, None)
+        return
+
+    def _drop(self, counters: Iterable[str]):
+        """ Drop the entries kept in memory of some namespaces. """
+        counters = set(counters)
+        with self.local.lock:
+            if self.name in counters:
+                self.local.entries.clear()
+                return
+            for local_key in [
+                    local_key for local_key, (_, _, counter)
+                    in self.local.entries.items() if counter in counters]:
+                del self.local.entries[local_key]
+        return
+
+    # the version counters
+
+    def _counter(self, key) -> str:
+        """
+        Name of the counter of the namespace of a key.
+
+        The counter named after the cache itself is moved by clear.
+        """
+        name = f'{self.name}:{key_namespace(str(key))}'
+        if len(name) > COUNTER_NAME_LENGTH:
+            name = f'{self.name}:{sha1(name.encode()).hexdigest()}'
+        return name
+
+    def _seen(self, counter: str) -> Tuple[int, int]:
+        """ Counters an entry read now depends on. """
+        return self.local.versions.get(counter, 0), \
+            self.local.versions.get(self.name, 0)
+
+    def check_version(self, force: bool = False):
+        """
+        Drop the entries of the namespaces other workers changed.
+
+        :param force: read the counters even if read recently
+        :return:
+        """
+        now = monotonic()
+        if not force and now - self.local.checked < self.check_interval:
+            return
+        from fpiweb.models import CacheVersion
+        from django.db.models import Q
+        versions = dict(
+            CacheVersion.objects
+            .filter(Q(name=self.name) | Q(name__startswith=self.name + ':'))
+            .values_list('name', 'version')
+        )
+        with self.local.lock:
+            self.local.checked = now
+            changed = [
+                counter
+                for counter in set(versions) | set(self.local.versions)
+                if versions.get(counter, 0) !=
+                self.local.versions.get(counter, 0)
+            ]
+            self._drop(changed)
+            self.local.versions = versions
+        return
+
+    def _bump_versions(self, counters: Iterable[str]):
+        """
+        Add one to counters, telling the other workers of the change.
+
+        The entries in memory of a namespace are kept unless another worker
+        changed it since they were read.
+        """
+        from fpiweb.models import CacheVersion
+        table = CacheVersion._meta.db_table
+        for counter in counters:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {table} (name, version) VALUES (%s, 1) '
+                    f'ON CONFLICT (name) DO UPDATE '
+                    f'SET version = {table}.version + 1 RETURNING version',
+                    [counter],
+                )
+                version = cursor.fetchone()[0]
+            with self.local.lock:
+                if self.local.versions.get(counter, 0) != version - 1:
+                    self._drop([counter])
+                self.local.versions[counter] = version
+        return
+
+
+# EOF
@@ -8,13 +8,32 @@ from django.views.generic import TemplateView
 
 from fpiweb.views import \
     AboutView, \
+    ActivityStatsView, \
+    BoxBulkEditView, \
     BoxEditView, \
     BoxEmptyMoveView, \
     BoxScannedView, \
+    DemandForecastView, \
     IndexView, LoginView, ConstraintsListView, \
+    LabelJobDownloadView, \
+    LabelJobListView, \
+    LabelPrintView, \
     ConstraintCreateView, ConstraintUpdateView, ConstraintDeleteView, \
+    ConstraintsBulkEditView, \
     LogoutView, BoxNewView, BoxDetailsView, \
+    OccupancyMapView, \
+    PalletMoveView, \
     TestScanView
+from fpiweb.api import \
+    ApiBoxEmptyView, \
+    ApiBoxFillView, \
+    ApiBoxLookupView, \
+    ApiBoxMoveView, \
+    ApiConstraintsView, \
+    ApiPalletMoveView, \
+    ApiProductExampleView, \
+    ApiProductSearchView, \
+    ApiSlotSuggestionView
 
 # from fpiweb.views import ConstraintDetailView
 
@@ -65,12 +84,19 @@ urlpatterns = [
     path('constraint/delete/<int:pk>/', ConstraintDeleteView.as_view(),
         name='constraint_delete', ),
 
+    # e.g. /fpiweb/constraints/bulk_edit/ = change many constraints at once
+    path('constraints/bulk_edit/', ConstraintsBulkEditView.as_view(),
+         name='constraints_bulk_edit'),
+
     # e.g.  /fpiweb/box/add/ = add a box to inventory
     path('box/new/<str:box_number>/', BoxNewView.as_view(), name='box_new'),
 
     # e.g. /fpiweb/box/<pk>/edit = edit a box in inventory
     path('box/<int:pk>/edit/', BoxEditView.as_view(), name='box_edit'),
 
+    # e.g. /fpiweb/box/bulk_edit/?page=2 = edit quantities and expirations
+    path('box/bulk_edit/', BoxBulkEditView.as_view(), name='box_bulk_edit'),
+
     # e.g. /fpiweb/box/<pk>/ = view the information about a box
     path('box/<int:pk>/', BoxDetailsView.as_view(), name='box_details'),
 
@@ -90,6 +116,67 @@ urlpatterns = [
     # e.g. /fpiweb/box/<pk>/empty = consume the product in a box
     path('box/<int:pk>/empty/', BoxEmptyMoveView.as_view(), name='box_empty'),
 
+    # e.g. /fpiweb/box/pallet_move/ = move all the boxes of a pallet
+    path('box/pallet_move/', PalletMoveView.as_view(), name='pallet_move'),
+
+    # e.g. /fpiweb/box/labels/ = print QR code labels for new boxes
+    path('box/labels/', LabelPrintView.as_view(), name='label_print'),
+
+    # e.g. /fpiweb/box/labels/jobs/ = label jobs printed in the background
+    path('box/labels/jobs/', LabelJobListView.as_view(), name='label_jobs'),
+
+    # e.g. /fpiweb/box/labels/jobs/<pk>/pdf/ = download the labels of a job
+    path('box/labels/jobs/<int:pk>/pdf/', LabelJobDownloadView.as_view(),
+         name='label_job_download'),
+
+    # e.g. /fpiweb/occupancy/ = which slots of the warehouse hold boxes
+    path('occupancy/', OccupancyMapView.as_view(), name='occupancy_map'),
+
+    # e.g. /fpiweb/activity/stats/?weeks=12 = turnover of products
+    path('activity/stats/', ActivityStatsView.as_view(),
+         name='activity_stats'),
+
+    # e.g. /fpiweb/activity/forecast/ = boxes needed next month
+    path('activity/forecast/', DemandForecastView.as_view(),
+         name='demand_forecast'),
+
     # e.g. /fpiweb/test_scan/ = ???
     path('test_scan/', TestScanView.as_view(), name='test_scan'),
+
+    # JSON API for the scanner app (see fpiweb/api.py)
+
+    # e.g. /fpiweb/api/box/BOX12345/ = look up a box
+    path('api/box/<str:box_number>/', ApiBoxLookupView.as_view(),
+         name='api_box'),
+
+    # e.g. /fpiweb/api/box/BOX12345/fill/ = fill an empty box
+    path('api/box/<str:box_number>/fill/', ApiBoxFillView.as_view(),
+         name='api_box_fill'),
+
+    # e.g. /fpiweb/api/box/BOX12345/move/ = move a filled box
+    path('api/box/<str:box_number>/move/', ApiBoxMoveView.as_view(),
+         name='api_box_move'),
+
+    # e.g. /fpiweb/api/box/BOX12345/empty/ = consume the product in a box
+    path('api/box/<str:box_number>/empty/', ApiBoxEmptyView.as_view(),
+         name='api_box_empty'),
+
+    # e.g. /fpiweb/api/products/?q=tomato = search for products
+    path('api/products/', ApiProductSearchView.as_view(),
+         name='api_products'),
+
+    # e.g. /fpiweb/api/examples/?q=campbells = which product is this item
+    path('api/examples/', ApiProductExampleView.as_view(),
+         name='api_examples'),
+
+    # e.g. /fpiweb/api/slots/?product=12 = where to put a box of product 12
+    path('api/slots/', ApiSlotSuggestionView.as_view(), name='api_slots'),
+
+    # e.g. /fpiweb/api/pallet/move/ = move all the boxes of a pallet
+    path('api/pallet/move/', ApiPalletMoveView.as_view(),
+         name='api_pallet_move'),
+
+    # e.g. /fpiweb/api/constraints/ = valid values of the constraints
+    path('api/constraints/', ApiConstraintsView.as_view(),
+         name='api_constraints'),
 ]
@@ -3,7 +3,9 @@ views.py - establish the views (pages) for the F. P. I. web application.
 """
 from logging import getLogger, debug
 
-from django.shortcuts import redirect, render
+from django.core.paginator import Paginator
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse, reverse_lazy
@@ -11,8 +13,21 @@ from django.views import View
 from django.views.generic import TemplateView, ListView, DetailView, \
     CreateView, UpdateView, DeleteView, FormView
 
-from fpiweb.models import Box, BoxNumber, Constraints
-from fpiweb.forms import NewBoxForm, LoginForm, ConstraintsForm, LogoutForm
+from fpiweb.models import Box, BoxNumber, Constraints, LabelJob
+from fpiweb.activity_stats import REPORT_WEEKS, SHELF_PERCENTILE, \
+    turnover_report
+from fpiweb.bulk_edit import BULK_EDIT_PAGE_SIZE, save_changed_boxes
+from fpiweb.constraints_edit import apply_constraints, changed_constraints, \
+    check_constraints
+from fpiweb.forecast import demand_forecast
+from fpiweb.forms import NewBoxForm, LoginForm, ConstraintsForm, LogoutForm, \
+    BoxBulkEditFormSet, ConstraintsBulkFormSet, LabelPrintForm, PalletMoveForm
+from fpiweb.fragment_cache import BOX_DETAIL_TIMEOUT, related_version
+from fpiweb.labels import box_labels, box_url_prefix, label_pdf_response, \
+    queue_label_job, reserve_box_numbers
+from fpiweb.occupancy import OCCUPANCY_TIMEOUT, build_occupancy
+from fpiweb.pallet import move_pallet
+from StandaloneTools.LabelLayout import get_layout
 
 __author__ = '(Multiple)'
 __project__ = "Food-Pantry-Inventory"
@@ -173,7 +188,7 @@ class ConstraintUpdateView(LoginRequiredMixin, UpdateView):
 
         context = super(ConstraintUpdateView, self).get_context_data(**kwargs)
         context['action'] = reverse('fpiweb:constraint_update',
-                                    kwargs={'pk': self.get_object().id})
+                                    kwargs={'pk': self.object.id})
         return context
 
     def get_success_url(self):
@@ -186,6 +201,50 @@ class ConstraintUpdateView(LoginRequiredMixin, UpdateView):
         return results
 
 
+class ConstraintsBulkEditView(LoginRequiredMixin, View):
+    """
+    Change many constraints at once, after seeing which boxes are affected.
+    """
+    template_name = 'fpiweb/constraints_bulk_edit.html'
+
+    def render_formset(self, request, formset, **extra):
+        context = {
+            'formset': formset,
+            'impacts': None,
+            'saved': None,
+        }
+        context.update(extra)
+        return render(request, self.template_name, context)
+
+    def get(self, request, *args, **kwargs):
+        formset = ConstraintsBulkFormSet(queryset=Constraints.objects.all())
+        return self.render_formset(request, formset)
+
+    def post(self, request, *args, **kwargs):
+        formset = ConstraintsBulkFormSet(
+            request.POST, queryset=Constraints.objects.all())
+        if not formset.is_valid():
+            return self.render_formset(request, formset)
+
+        constraints = changed_constraints(formset.initial_forms)
+        if 'apply' not in request.POST:
+            # report the boxes affected, nothing is saved yet
+            return self.render_formset(
+                request, formset,
+                impacts=check_constraints(constraints),
+                checked=True,
+            )
+
+        saved, impacts = apply_constraints(
+            constraints, accept_stranded='accept_stranded' in request.POST)
+        if constraints and not saved:
+            # boxes were stranded (or moved since the report)
+            return self.render_formset(
+                request, formset, impacts=impacts, checked=True)
+        formset = ConstraintsBulkFormSet(queryset=Constraints.objects.all())
+        return self.render_formset(request, formset, saved=saved)
+
+
 class ConstraintDeleteView(LoginRequiredMixin, DeleteView):
     """
     Delete an animal or daily quest using a generic DeleteView.
@@ -273,15 +332,80 @@ class BoxEditView(LoginRequiredMixin, UpdateView):
     success_url = reverse_lazy('fpiweb:index')
 
 
+class BoxBulkEditView(LoginRequiredMixin, View):
+    """
+    Edit the quantity and expiration of many filled boxes at once.
+    """
+    template_name = 'fpiweb/box_bulk_edit.html'
+
+    @staticmethod
+    def get_queryset():
+        # the table shows the product and location of each box
+        return Box.objects \
+            .filter(product__isnull=False) \
+            .select_related('product') \
+            .order_by('box_number')
+
+    def render_page(self, request, saved=None):
+        paginator = Paginator(self.get_queryset(), BULK_EDIT_PAGE_SIZE)
+        page = paginator.get_page(request.GET.get('page'))
+        formset = BoxBulkEditFormSet(queryset=page.object_list)
+        return self.render_formset(request, page, formset, saved)
+
+    def render_formset(self, request, page, formset, saved=None):
+        return render(
+            request,
+            self.template_name,
+            {
+                'page': page,
+                'formset': formset,
+                'saved': saved,
+            },
+        )
+
+    def get(self, request, *args, **kwargs):
+        return self.render_page(request)
+
+    def post(self, request, *args, **kwargs):
+        # Look the boxes up by the ids posted rather than by page number,
+        # so boxes emptied meanwhile don't shift the rows of the page.
+        ids = [
+            value for name, value in request.POST.items()
+            if name.endswith('-id') and value.isdigit()
+        ]
+        formset = BoxBulkEditFormSet(
+            request.POST,
+            queryset=self.get_queryset().filter(pk__in=ids),
+        )
+        if not formset.is_valid():
+            page = Paginator(self.get_queryset(), BULK_EDIT_PAGE_SIZE) \
+                .get_page(request.GET.get('page'))
+            return self.render_formset(request, page, formset)
+
+        # only existing boxes can be edited here, never added
+        saved = save_changed_boxes(formset.initial_forms)
+        return self.render_page(request, saved=saved)
+
+
 class BoxDetailsView(LoginRequiredMixin, DetailView):
 
     model = Box
     template_name = 'fpiweb/box_detail.html'
     context_object_name = 'box'
 
+    # the template shows the box type and product
+    queryset = Box.objects.select_related('box_type', 'product')
+
+    def get_object(self, queryset=None):
+        # read before the box and its product (see fragment_cache.py)
+        self.related_version = related_version()
+        return super().get_object(queryset)
+
     def get_context_data(self, **kwargs):
         debug(f"kwargs are {kwargs}")
         context = super().get_context_data(**kwargs)
+        context['box_detail_timeout'] = BOX_DETAIL_TIMEOUT
+        context['related_version'] = self.related_version
         return context
 
 
@@ -312,12 +436,141 @@ class BoxScannedView(LoginRequiredMixin, View):
         except Box.DoesNotExist:
             return redirect('fpiweb:box_new', box_number=box_number)
 
-        if not box.product:
+        if not box.product_id:
             return redirect('fpiweb:box_edit', pk=box.pk)
 
         return redirect('fpiweb:box_empty_move', pk=box.pk)
 
 
+class PalletMoveView(LoginRequiredMixin, FormView):
+    """
+    Move every box of a slot (or a list of boxes) to a new location.
+    """
+    template_name = 'fpiweb/pallet_move.html'
+    form_class = PalletMoveForm
+
+    def form_valid(self, form):
+        result = move_pallet(form.cleaned_data)
+
+        # start over with the destination, ready for the next pallet
+        form = self.form_class(initial={
+            name: form.cleaned_data[name]
+            for name in ('loc_row', 'loc_bin', 'loc_tier')
+        })
+        return self.render_to_response(
+            self.get_context_data(form=form, result=result))
+
+
+class LabelPrintView(LoginRequiredMixin, FormView):
+    """
+    PDF of QR code labels for boxes not yet in use.
+
+    The PDF is sent right away, or made by a label worker when the
+    "background" button is used (see LabelJobListView).
+    """
+    template_name = 'fpiweb/label_print.html'
+    form_class = LabelPrintForm
+
+    def get_initial(self):
+        initial = super().get_initial()
+        if self.request.method == 'GET':
+            # start after the highest box number in use
+            initial['start'] = int(BoxNumber.get_next_box_number()[3:])
+        return initial
+
+    def form_valid(self, form):
+        start = form.cleaned_data['start']
+        count = form.cleaned_data['count']
+        if 'background' in self.request.POST:
+            queue_label_job(
+                start, count, form.cleaned_data['layout'],
+                box_url_prefix(self.request), self.request.user)
+            return redirect('fpiweb:label_jobs')
+
+        numbers = reserve_box_numbers(start, count)
+        labels = box_labels(box_url_prefix(self.request), numbers)
+        return label_pdf_response(
+            labels,
+            get_layout(form.cleaned_data['layout']),
+            filename=f'labels {BoxNumber.format_box_number(start)}.pdf',
+        )
+
+
+class LabelJobListView(LoginRequiredMixin, ListView):
+    """
+    Label jobs queued lately, with a link to each finished PDF.
+    """
+    template_name = 'fpiweb/label_jobs.html'
+    context_object_name = 'label_jobs'
+    queryset = LabelJob.objects \
+        .select_related('requested_by') \
+        .defer('pdf') \
+        .order_by('-created')
+    paginate_by = 20
+
+
+class LabelJobDownloadView(LoginRequiredMixin, View):
+    """
+    Send the PDF of a finished label job.
+    """
+
+    def get(self, request, pk):
+        label_job = get_object_or_404(
+            LabelJob, pk=pk, status=LabelJob.DONE)
+        response = HttpResponse(
+            bytes(label_job.pdf), content_type='application/pdf')
+        response['Content-Disposition'] = \
+            f'attachment; filename="labels {label_job.first_box_number}.pdf"'
+        return response
+
+
+class OccupancyMapView(LoginRequiredMixin, TemplateView):
+    """
+    Grid of the warehouse slots showing the boxes in each.
+    """
+    template_name = 'fpiweb/occupancy_map.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        # The template calls build_occupancy only when the cached grid
+        # has been dropped.
+        context['occupancy'] = build_occupancy
+        context['occupancy_timeout'] = OCCUPANCY_TIMEOUT
+        return context
+
+
+class ActivityStatsView(LoginRequiredMixin, TemplateView):
+    """
+    How quickly each product and category is used (?weeks=<n>).
+    """
+    template_name = 'fpiweb/activity_stats.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        weeks = self.request.GET.get('weeks', '')
+        weeks = int(weeks) if weeks.isdigit() and int(weeks) else \
+            REPORT_WEEKS
+        products, categories = turnover_report(weeks)
+        context['weeks'] = weeks
+        context['percentile'] = SHELF_PERCENTILE
+        context['products'] = products
+        context['categories'] = categories
+        return context
+
+
+class DemandForecastView(LoginRequiredMixin, TemplateView):
+    """
+    Boxes of each product expected to be needed next month.
+    """
+    template_name = 'fpiweb/demand_forecast.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['forecast'] = demand_forecast()
+        return context
+
+
 class TestScanView(LoginRequiredMixin, TemplateView):
 
     template_name = 'fpiweb/test_scan.html'
@@ -330,34 +583,25 @@ class TestScanView(LoginRequiredMixin, TemplateView):
         return reverse('fpiweb:box_scanned', args=(box_number,))
 
     @staticmethod
-    def get_box_url_by_filters(**filters):
-        box_number = Box.objects \
-            .filter(**filters) \
-            .values_list('box_number', flat=True) \
-            .first()
-        if box_number is None:
+    def get_box_url(box):
+        if box is None:
             return ""
-        return TestScanView.get_box_scanned_url(box_number)
+        return TestScanView.get_box_scanned_url(box.box_number)
 
     def get_context_data(self, **kwargs):
 
-        full_box_url = self.get_box_url_by_filters(product__isnull=False)
-        empty_box_url = self.get_box_url_by_filters(product__isnull=True)
-
-        new_box_url = self.get_box_scanned_url(
-            BoxNumber.get_next_box_number()
-        )
-
         empty_box = Box.objects.filter(product__isnull=True).first()
         full_box = Box.objects.filter(product__isnull=False).first()
 
+        next_box_number = BoxNumber.get_next_box_number()
+
         return {
-            'full_box_url': full_box_url,
-            'empty_box_url': empty_box_url,
-            'new_box_url': new_box_url,
+            'full_box_url': self.get_box_url(full_box),
+            'empty_box_url': self.get_box_url(empty_box),
+            'new_box_url': self.get_box_scanned_url(next_box_number),
             'empty_box': empty_box,
             'full_box': full_box,
-            'next_box_number': BoxNumber.get_next_box_number()
+            'next_box_number': next_box_number,
         }
 
 